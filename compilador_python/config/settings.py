@@ -8,12 +8,131 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEMP_DIR = os.path.join(BASE_DIR, "temp_compilation")
 OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
 
 # Configuración del compilador
 COMPILER_CONFIG = {
     "compiler": "g++",
     "flags": ["-Wall", "-std=c++11"],
-    "timeout": 999999  # Efectivamente infinito
+    "timeout": 10,       # Límite de tiempo de reloj por ejecución (segundos)
+    "cpu_timeout": 5,    # Límite de tiempo de CPU por ejecución (segundos)
+    "jobs": os.cpu_count() or 1  # Compilaciones simultáneas (-j/--jobs)
+}
+
+# Configuración de la ejecución de programas
+EXECUTION_CONFIG = {
+    # "terminal": abre la Terminal de macOS y toma una captura (interactivo)
+    # "pipe": ejecuta el binario directamente y captura stdout/stderr (sin interfaz)
+    # "pty": ejecuta el binario en una pseudo-terminal y registra la transcripción
+    # "auto": "terminal" en macOS con sesión gráfica, "pty" en cualquier otro caso
+    "mode": "auto",
+    # Captura de salida acotada: se conservan el inicio y el final de cada flujo
+    "capture_head_bytes": 16 * 1024,
+    "capture_tail_bytes": 16 * 1024,
+    "spill_output": True,  # Guardar la salida completa comprimida en TEMP_DIR si se trunca
+    # Pseudo-terminal (modo "pty")
+    "pty_columns": 120,
+    "pty_rows": 40,
+    "pty_term": "dumb",           # Sin colores ni borrados de pantalla
+    "pty_input_delay": 0.05,      # Silencio (s) antes de escribir la siguiente línea de entrada
+    # Tiempo (s) bloqueado leyendo con la entrada agotada antes de terminar el programa (ILE)
+    "input_wait_grace": 0.5,
+    "transcript_max_bytes": 64 * 1024,
+    "transcript_max_events": 2000
+}
+
+# Límites (rlimit) aplicados a cada programa ejecutado en modo sin terminal.
+# Cada tipo de EXERCISE_TYPES puede sobrescribirlos con su clave "limits".
+SANDBOX_CONFIG = {
+    "enabled": True,
+    "memory_mb": 512,          # Memoria máxima (MLE si el pico de memoria virtual o residente la supera)
+    "address_space_factor": 8, # RLIMIT_AS = memory_mb × este factor: respaldo para poder medir las reservas grandes
+    "max_processes": 64,       # RLIMIT_NPROC: procesos del usuario (evita fork bombs)
+    "max_file_size_mb": 16,    # RLIMIT_FSIZE: tamaño máximo de los archivos que escribe (OLE)
+    "stack_mb": 64,            # RLIMIT_STACK: tamaño de la pila (recursión profunda)
+    "max_output_mb": 64        # Salida estándar máxima antes de terminar el programa (OLE)
+}
+
+# Sonda del sandbox (Linux con glibc): shim que informa el pico exacto de
+# memoria al terminar y distingue un desbordamiento de pila de otro SIGSEGV
+PROBE_CONFIG = {
+    "enabled": True,
+    "shim_dir": os.path.join(CACHE_DIR, "probe")  # Sonda compilada (una por versión y compilador)
+}
+
+# Configuración de la entrada generada automáticamente (modo sin terminal)
+INPUT_CONFIG = {
+    "enabled": True,
+    "seed": 12345,             # Semilla fija: la misma entrada en cada ejecución (--seed)
+    "count_range": (3, 5),     # Valores para contadores y tamaños (n, filas, cantidad...)
+    "value_range": (1, 20)     # Valores para el resto de lecturas numéricas (pequeños: factorial, fibonacci...)
+}
+
+# Configuración del modo de calificación con casos de prueba (--grade)
+GRADING_CONFIG = {
+    # Una subcarpeta por programa con pares <caso>.in / <caso>.out, por ejemplo
+    # casos/pregunta-1/01.in y casos/pregunta-1/01.out (también se busca casos/
+    # junto al archivo fuente)
+    "cases_dir": os.path.join(BASE_DIR, "casos"),
+    "jobs": os.cpu_count() or 1  # Casos ejecutados simultáneamente
+}
+
+# Configuración del modo de medición de rendimiento (--benchmark)
+BENCHMARK_CONFIG = {
+    "enabled": False,
+    "runs": 10,            # Ejecuciones medidas, todas con la misma entrada
+    "warmups": 2,          # Ejecuciones previas que no se cuentan
+    "cpu": None,           # Núcleo al que se fija cada ejecución (None = sin fijar; solo Linux)
+    "pdf_section": True    # Agregar la tabla de rendimiento al PDF
+}
+
+# Configuración de la estimación empírica de complejidad (--complexity)
+COMPLEXITY_CONFIG = {
+    "enabled": False,
+    # Barrido geométrico de tamaños por categoría: (inicial, factor, máximo).
+    # Los programas recursivos usan un factor pequeño porque pueden ser O(2^n)
+    "sweeps": {
+        "vector": (16, 2, 65536),
+        "matriz": (4, 2, 1024),
+        "recursion": (2, 1.25, 64)
+    },
+    "runs": 3,             # Ejecuciones medidas por tamaño (se usa la mediana del tiempo de CPU)
+    "warmups": 1,
+    "run_timeout": 2.0,    # Límite de cada ejecución del barrido (s)
+    "time_budget": 0.5,    # El barrido se detiene cuando la mediana supera este tiempo (s)
+    "min_points": 4,       # Tamaños medidos necesarios para ajustar los modelos
+    "min_signal": 0.002,   # Variación mínima del tiempo (s) para distinguir de O(1)
+    "min_r2": 0.8          # Bondad de ajuste mínima de un modelo con crecimiento
+}
+
+# Conteo de memoria dinámica con un shim cargado por LD_PRELOAD (--track-alloc, solo Linux)
+ALLOC_CONFIG = {
+    "enabled": False,
+    "shim_dir": os.path.join(CACHE_DIR, "alloc")  # Shim compilado (uno por versión y compilador)
+}
+
+# Detección de programas casi idénticos con MinHash y LSH (--similarity)
+SIMILARITY_CONFIG = {
+    "threshold": 0.8,       # Similitud de Jaccard estimada mínima para agrupar dos programas
+    "shingle_size": 8,      # Tokens consecutivos por shingle (identificadores y literales generalizados)
+    "num_perm": 128,        # Largo de la firma MinHash
+    "bands": 32,            # Bandas de LSH (num_perm / bands filas por banda)
+    "max_bucket_pairs": 32, # Cubos más grandes se comparan con un representante de cada grupo en lugar de todos los pares
+    "index_dir": os.path.join(CACHE_DIR, "similarity")  # Índice persistente de firmas
+}
+
+# Configuración de las cachés persistentes
+CACHE_CONFIG = {
+    "enabled": True,
+    "compile_dir": os.path.join(CACHE_DIR, "compile"),
+    "compile_max_size_mb": 512,  # Al superarlo se expulsan los ejecutables menos usados
+    "cache_failures": True,      # Recordar errores de compilación junto con su stderr
+    "run_dir": os.path.join(CACHE_DIR, "run"),
+    "run_max_size_mb": 256,      # Resultados de ejecución (salida, estado y recursos)
+    "analysis_dir": os.path.join(CACHE_DIR, "analysis"),
+    "analysis_max_size_mb": 32,  # Resultados del analizador (JSON comprimido)
+    "fragments_dir": os.path.join(CACHE_DIR, "fragments"),
+    "fragments_max_size_mb": 256  # Fragmentos del PDF ya renderizados (uno por programa y sección)
 }
 
 # Configuración de la interfaz gráfica
@@ -58,7 +177,11 @@ PDF_CONFIG = {
     "margin": 0.5,         # pulgadas (reducido de 0.75)
     "title_font_size": 16, # reducido de 18
     "body_font_size": 10,  # reducido de 12
-    "code_font_size": 9    # reducido de 11
+    "code_font_size": 9,   # reducido de 11
+    "min_code_font_size": 7,  # Letra mínima del código al reducirla para que quepan las líneas largas
+    "jobs": os.cpu_count() or 1,  # Procesos que renderizan los fragmentos del informe (requiere pypdf)
+    "chunk_programs": 4,  # Programas por fragmento: cada fragmento empieza en una página nueva
+    "streaming": False  # Volcar a disco los programas y sus elementos en lugar de guardarlos en memoria
 }
 
 # Tipos de ejercicios y sus estilos
@@ -71,7 +194,8 @@ EXERCISE_TYPES = {
     "matriz": {
         "icon": "🔢",
         "color": GUI_CONFIG["theme"]["success"],
-        "bg_color": "#32D74B20"  # Success con transparencia
+        "bg_color": "#32D74B20",  # Success con transparencia
+        "limits": {"memory_mb": 1024}  # Matrices grandes declaradas en memoria dinámica
     },
     "cadena": {
         "icon": "📝",
@@ -0,0 +1,265 @@
+"""
+Módulo para contar las reservas de memoria dinámica con un shim cargado por LD_PRELOAD.
+"""
+
+import os
+import json
+import platform
+import threading
+
+from config.settings import ALLOC_CONFIG, COMPILER_CONFIG, TEMP_DIR
+from core.shim import build_shim, preload_env
+
+# Shim en C: reemplaza malloc/calloc/realloc/free y las variantes alineadas.
+# operator new/delete de libstdc++ llaman a malloc/free, así que también se
+# cuentan sin alterar el bad_alloc de las reservas que fallan. Solo se
+# cuenta desde __libc_start_main, para no incluir las reservas internas de
+# las bibliotecas compartidas (por ejemplo, la reserva de emergencia de
+# libstdc++), ni las llamadas hechas desde la propia libc (los búferes de
+# stdio nunca se liberan y parecerían fugas). El resultado se escribe en
+# ALLOC_TRACE_FILE al terminar.
+SHIM_SOURCE = r'''
+#define _GNU_SOURCE
+#include <stddef.h>
+#include <stdio.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <dlfcn.h>
+#include <link.h>
+#include <stdint.h>
+
+extern void *__libc_malloc(size_t size);
+extern void *__libc_calloc(size_t count, size_t size);
+extern void *__libc_realloc(void *pointer, size_t size);
+extern void *__libc_memalign(size_t alignment, size_t size);
+extern void __libc_free(void *pointer);
+extern size_t malloc_usable_size(void *pointer);
+extern char *getenv(const char *name);
+extern int unsetenv(const char *name);
+
+static int counting;
+static char trace_path[4096];
+static unsigned long allocations, frees, bytes_requested;
+static long live_bytes, live_blocks, peak_bytes;
+static uintptr_t libc_start, libc_end;
+
+#define FROM_LIBC(caller) ((uintptr_t)(caller) - libc_start < libc_end - libc_start)
+
+static int find_libc(struct dl_phdr_info *info, size_t size, void *base)
+{
+    int i;
+    if (info->dlpi_addr != (uintptr_t)base)
+        return 0;
+    for (i = 0; i < info->dlpi_phnum; i++) {
+        if (info->dlpi_phdr[i].p_type == PT_LOAD) {
+            uintptr_t start = info->dlpi_addr + info->dlpi_phdr[i].p_vaddr;
+            uintptr_t end = start + info->dlpi_phdr[i].p_memsz;
+            if (!libc_start || start < libc_start)
+                libc_start = start;
+            if (end > libc_end)
+                libc_end = end;
+        }
+    }
+    return 1;
+}
+
+static void count_allocation(void *pointer, size_t size, void *caller)
+{
+    long live, peak;
+    if (!pointer || !__atomic_load_n(&counting, __ATOMIC_RELAXED) || FROM_LIBC(caller))
+        return;
+    __atomic_add_fetch(&allocations, 1, __ATOMIC_RELAXED);
+    __atomic_add_fetch(&bytes_requested, size, __ATOMIC_RELAXED);
+    __atomic_add_fetch(&live_blocks, 1, __ATOMIC_RELAXED);
+    live = __atomic_add_fetch(&live_bytes, (long)malloc_usable_size(pointer), __ATOMIC_RELAXED);
+    peak = __atomic_load_n(&peak_bytes, __ATOMIC_RELAXED);
+    while (live > peak && !__atomic_compare_exchange_n(&peak_bytes, &peak, live, 0,
+                                                       __ATOMIC_RELAXED, __ATOMIC_RELAXED))
+        ;
+}
+
+static void count_release(size_t usable, void *caller)
+{
+    if (!__atomic_load_n(&counting, __ATOMIC_RELAXED) || FROM_LIBC(caller))
+        return;
+    __atomic_add_fetch(&frees, 1, __ATOMIC_RELAXED);
+    __atomic_sub_fetch(&live_blocks, 1, __ATOMIC_RELAXED);
+    __atomic_sub_fetch(&live_bytes, (long)usable, __ATOMIC_RELAXED);
+}
+
+void *malloc(size_t size)
+{
+    void *pointer = __libc_malloc(size);
+    count_allocation(pointer, size, __builtin_return_address(0));
+    return pointer;
+}
+
+void *calloc(size_t count, size_t size)
+{
+    void *pointer = __libc_calloc(count, size);
+    count_allocation(pointer, count * size, __builtin_return_address(0));
+    return pointer;
+}
+
+void *realloc(void *old, size_t size)
+{
+    size_t old_usable = old ? malloc_usable_size(old) : 0;
+    void *pointer = __libc_realloc(old, size);
+    if (old && (pointer || size == 0))
+        count_release(old_usable, __builtin_return_address(0));
+    count_allocation(pointer, size, __builtin_return_address(0));
+    return pointer;
+}
+
+void free(void *pointer)
+{
+    if (pointer)
+        count_release(malloc_usable_size(pointer), __builtin_return_address(0));
+    __libc_free(pointer);
+}
+
+static void *aligned_allocation(size_t alignment, size_t size, void *caller)
+{
+    void *pointer = __libc_memalign(alignment, size);
+    count_allocation(pointer, size, caller);
+    return pointer;
+}
+
+void *memalign(size_t alignment, size_t size)
+{
+    return aligned_allocation(alignment, size, __builtin_return_address(0));
+}
+
+void *aligned_alloc(size_t alignment, size_t size)
+{
+    return aligned_allocation(alignment, size, __builtin_return_address(0));
+}
+
+int posix_memalign(void **result, size_t alignment, size_t size)
+{
+    void *pointer = aligned_allocation(alignment, size, __builtin_return_address(0));
+    if (!pointer)
+        return 12; /* ENOMEM */
+    *result = pointer;
+    return 0;
+}
+
+typedef int (*main_function)(int, char **, char **);
+typedef int (*start_function)(main_function, int, char **, void (*)(void), void (*)(void),
+                              void (*)(void), void *);
+
+int __libc_start_main(main_function main, int argc, char **argv, void (*init)(void),
+                      void (*fini)(void), void (*rtld_fini)(void), void *stack_end)
+{
+    start_function real_start = (start_function)dlsym(RTLD_NEXT, "__libc_start_main");
+    const char *path = getenv("ALLOC_TRACE_FILE");
+    Dl_info libc_info;
+    if (dladdr((void *)__libc_malloc, &libc_info))
+        dl_iterate_phdr(find_libc, libc_info.dli_fbase);
+    if (path && strlen(path) < sizeof(trace_path)) {
+        strcpy(trace_path, path);
+        /* Los procesos hijos (system("clear")...) no deben sobrescribir el informe */
+        unsetenv("ALLOC_TRACE_FILE");
+        __atomic_store_n(&counting, 1, __ATOMIC_RELAXED);
+    }
+    return real_start(main, argc, argv, init, fini, rtld_fini, stack_end);
+}
+
+__attribute__((destructor)) static void write_report(void)
+{
+    char report[512];
+    int length, fd;
+    if (!__atomic_exchange_n(&counting, 0, __ATOMIC_RELAXED))
+        return;
+    length = snprintf(report, sizeof(report),
+                      "{\"allocations\": %lu, \"frees\": %lu, \"bytes\": %lu, "
+                      "\"peak_bytes\": %ld, \"leaked_bytes\": %ld, \"leaked_blocks\": %ld}\n",
+                      allocations, frees, bytes_requested, peak_bytes,
+                      live_bytes > 0 ? live_bytes : 0, live_blocks > 0 ? live_blocks : 0);
+    fd = open(trace_path, O_WRONLY | O_CREAT | O_TRUNC, 0644);
+    if (fd >= 0) {
+        if (write(fd, report, length) < 0)
+            ;
+        close(fd);
+    }
+}
+'''
+
+def format_bytes(value):
+    """Devuelve un tamaño legible, por ejemplo "1.5 KB"."""
+    for unit in ("B", "KB", "MB"):
+        if abs(value) < 1024 or unit == "MB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+def format_allocations(allocations):
+    """Resume los contadores del shim en una línea para la consola y el informe."""
+    return (f"{allocations['allocations']} reservas, {allocations['frees']} liberaciones, "
+            f"{format_bytes(allocations['bytes'])} reservados, "
+            f"pico {format_bytes(allocations['peak_bytes'])}, "
+            f"{format_bytes(allocations['leaked_bytes'])} sin liberar "
+            f"({allocations['leaked_blocks']} bloques)")
+
+class AllocationTracker:
+    """Construye el shim de conteo de memoria dinámica y lee sus informes.
+
+    El shim se compila una sola vez con el compilador configurado y se guarda
+    en ALLOC_CONFIG['shim_dir'] con un nombre que depende de su código y del
+    compilador. Solo funciona en Linux con glibc (usa __libc_malloc).
+    """
+
+    def __init__(self, compiler=None):
+        self.compiler = compiler or COMPILER_CONFIG['compiler']
+        self.shim_path = None
+        self._build_failed = False
+        self._lock = threading.Lock()
+
+    def is_supported(self):
+        """Indica si la plataforma admite el shim (Linux con glibc)."""
+        return platform.system() == "Linux" and platform.libc_ver()[0] == "glibc"
+
+    def build(self):
+        """Compila el shim si hace falta y devuelve su ruta, o None si no está disponible."""
+        with self._lock:
+            if self.shim_path or self._build_failed:
+                return self.shim_path
+            if not self.is_supported():
+                print("Advertencia: El conteo de memoria dinámica solo está disponible en Linux con glibc")
+                self._build_failed = True
+                return None
+
+            shim_path, errors = build_shim(self.compiler, SHIM_SOURCE, ALLOC_CONFIG['shim_dir'], "alloc_shim")
+            if shim_path is None:
+                print(f"Advertencia: No se pudo compilar el shim de memoria dinámica:\n{errors}")
+                self._build_failed = True
+                return None
+
+            self.shim_path = shim_path
+            return shim_path
+
+    def prepare(self, executable):
+        """Devuelve (variables de entorno, ruta del informe) para ejecutar con el shim, o (None, None)."""
+        shim_path = self.build()
+        if shim_path is None:
+            return None, None
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        trace_path = os.path.join(
+            TEMP_DIR, f"{os.path.basename(executable)}_{os.getpid()}_{threading.get_ident()}_alloc.json"
+        )
+        if os.path.exists(trace_path):
+            os.remove(trace_path)
+        return preload_env(shim_path, {"ALLOC_TRACE_FILE": trace_path}), trace_path
+
+    def read(self, trace_path):
+        """Lee y elimina el informe del shim; None si el programa no terminó normalmente."""
+        try:
+            with open(trace_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+        finally:
+            try:
+                os.remove(trace_path)
+            except OSError:
+                pass
@@ -4,15 +4,51 @@ Módulo para analizar el código fuente C++.
 
 import re
 import os
+import json
+import hashlib
 import traceback
-from nltk.tokenize import word_tokenize
-from nltk.tag import pos_tag
+
+from core import lexer
+from core.lexer import code_view, summarize
+from core.tagger import DescriptionTagger
+
+# Expresiones que no dependen de las reglas del analizador (compiladas una vez)
+MAIN_REGEX = re.compile(r'int\s+main\s*\([^)]*\)')
+CLASS_REGEX = re.compile(r'class\s+\w+')
+STRUCT_REGEX = re.compile(r'struct\s+\w+')
+FUNCTION_REGEX = re.compile(r'(?:void|int|float|double|char|bool|string)\s+(\w+)\s*\([^)]*\)')
+FUNCTION_HEADER_REGEX = re.compile(r'\b(\w+)\s*\([^;{}()]*\)\s*(?:const\s*)?\{')
+CIN_REGEX = re.compile(r'cin\s*>>\s*(\w+)')
+DECLARATION_REGEX = re.compile(r'(int|float|double|char|string)\s+(\w+)\s*;')
+
+def pattern_anchors(pattern):
+    """Devuelve los literales (en minúsculas) con los que empieza cada alternativa del patrón.
+
+    Devuelve None si alguna alternativa no empieza con un literal o el patrón
+    tiene grupos; esos patrones se buscan por separado con findall.
+    """
+    if '(' in pattern:
+        return None
+    anchors = []
+    for alternative in pattern.split('|'):
+        literal = re.match(r'[\w:]*', alternative).group()
+        if alternative[len(literal):len(literal) + 1] in ('?', '*', '+', '{'):
+            literal = literal[:-1]  # El último carácter es opcional o se repite
+        if not literal:
+            return None
+        anchors.append(literal.lower())
+    return anchors
 
 class CppAnalyzer:
     """Clase para analizar el código fuente C++ y determinar sus características."""
     
-    def __init__(self):
-        """Inicializar el analizador."""
+    def __init__(self, cache=None):
+        """Inicializar el analizador.
+        
+        Args:
+            cache (AnalysisCache): Caché persistente de resultados (None = sin caché)
+        """
+        self.cache = cache
         # Patrones para diferentes tipos de ejercicios
         self.patterns = {
             "vector": [
@@ -65,6 +101,105 @@ class CppAnalyzer:
                 "atributo", "método", "member", "instancia", "herencia"
             ]
         }
+        
+        self._build_scanner()
+        self.version = self.get_version()
+    
+    def get_version(self):
+        """Devuelve un hash de las reglas y del código del analizador y del analizador léxico.
+        
+        Cambia con cualquier modificación de los patrones, las palabras clave o
+        la lógica, e invalida así las entradas de la caché de análisis.
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([self.patterns, self.keywords], sort_keys=True).encode('utf-8'))
+        for module_path in (__file__, lexer.__file__):
+            with open(module_path, 'rb') as f:
+                digest.update(f.read())
+        return digest.hexdigest()[:16]
+    
+    def _build_scanner(self):
+        """Precompila los patrones y las palabras clave para recorrer el código una sola vez.
+        
+        Todos los patrones empiezan con un literal: una única expresión con
+        búsqueda anticipada encuentra las posiciones donde empieza alguno y en
+        cada una se prueban solo los patrones de ese literal. Las palabras
+        clave son palabras completas, así que basta con contar las palabras
+        que ya contó el analizador léxico.
+        """
+        self._pattern_list = []         # (tipo, patrón compilado) en el orden de self.patterns
+        self._unanchored_patterns = []  # Índices de los patrones sin literal inicial
+        literal_patterns = {}
+        for type_name, patterns in self.patterns.items():
+            for pattern in patterns:
+                index = len(self._pattern_list)
+                self._pattern_list.append((type_name, re.compile(pattern, re.IGNORECASE)))
+                anchors = pattern_anchors(pattern)
+                if anchors is None:
+                    self._unanchored_patterns.append(index)
+                    continue
+                for anchor in anchors:
+                    literal_patterns.setdefault(anchor, set()).add(index)
+        
+        # En una posición también coinciden los literales que son prefijo del capturado
+        self._anchor_patterns = {
+            literal: sorted(index for anchor, indexes in literal_patterns.items()
+                            if literal.startswith(anchor) for index in indexes)
+            for literal in literal_patterns
+        }
+        self._anchored_patterns = sorted(set().union(*literal_patterns.values()))
+        literals = sorted(literal_patterns, key=len, reverse=True)
+        # La clase con la primera letra descarta rápido las posiciones sin literal
+        first_letters = ''.join(sorted({re.escape(literal[0]) for literal in literals}))
+        self._anchor_regex = re.compile(
+            rf'(?=[{first_letters}])(?=(' + '|'.join(re.escape(literal) for literal in literals) + r'))',
+            re.IGNORECASE
+        ) if literals else None
+        
+        # Palabra clave -> tipos que la cuentan
+        self._keyword_types = {}
+        for type_name, words in self.keywords.items():
+            for word in words:
+                self._keyword_types.setdefault(word.lower(), []).append(type_name)
+        # Los tokens no ASCII se comparan con la misma semántica de re.IGNORECASE
+        self._keyword_group_words = list(self._keyword_types)
+        self._keyword_regex = re.compile(
+            '|'.join(f'(?P<k{index}>{re.escape(word)})' for index, word in enumerate(self._keyword_group_words)),
+            re.IGNORECASE
+        )
+    
+    def scan_patterns(self, code):
+        """Devuelve las coincidencias de cada patrón (como re.findall) en una sola pasada."""
+        found = [[] for _ in self._pattern_list]
+        next_start = [0] * len(self._pattern_list)
+        if self._anchor_regex is not None:
+            for anchor in self._anchor_regex.finditer(code):
+                position = anchor.start()
+                indexes = self._anchor_patterns.get(anchor.group(1).lower(), self._anchored_patterns)
+                for index in indexes:
+                    # findall no devuelve coincidencias solapadas de un mismo patrón
+                    if position < next_start[index]:
+                        continue
+                    match = self._pattern_list[index][1].match(code, position)
+                    if match:
+                        found[index].append(match.group())
+                        next_start[index] = max(match.end(), position + 1)
+        for index in self._unanchored_patterns:
+            found[index] = self._pattern_list[index][1].findall(code)
+        return found
+    
+    def count_keywords(self, code):
+        """Cuenta las apariciones de palabras clave de cada tipo (como \\b<palabra>\\b sin mayúsculas)."""
+        counts = {type_name: 0 for type_name in self.keywords}
+        for token, occurrences in summarize(code)["words"].items():
+            if token.isascii():
+                types = self._keyword_types.get(token.lower())
+            else:
+                match = self._keyword_regex.fullmatch(token)
+                types = self._keyword_types[self._keyword_group_words[int(match.lastgroup[1:])]] if match else None
+            for type_name in types or ():
+                counts[type_name] += occurrences
+        return counts
     
     def analyze_file(self, filepath):
         """Analiza un archivo C++ para determinar sus características."""
@@ -73,8 +208,23 @@ class CppAnalyzer:
             with open(filepath, 'r', encoding='utf-8') as file:
                 content = file.read()
             
+            # Un archivo sin cambios desde el último análisis solo necesita su hash
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.make_key(content, filepath, self.version)
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            
             # Analizar el código
-            return self.analyze_code(content, filepath)
+            analysis = self.analyze_code(content, filepath)
+            
+            if cache_key:
+                try:
+                    self.cache.put(cache_key, analysis)
+                except OSError as cache_error:
+                    print(f"Advertencia: No se pudo guardar en la caché de análisis: {cache_error}")
+            return analysis
             
         except Exception as e:
             print(f"Error al analizar archivo: {e}")
@@ -97,63 +247,54 @@ class CppAnalyzer:
                 "includes": [],               # Bibliotecas incluidas
                 "main_function": False,       # Si tiene función main
                 "functions": [],              # Funciones definidas
+                "recursive_functions": [],    # Funciones que se llaman a sí mismas
             }
             
-            # Contar líneas de código no vacías y que no sean comentarios
-            lines = code.split('\n')
-            code_lines = []
-            for line in lines:
-                line = line.strip()
-                if line and not line.startswith('//') and not line.startswith('/*'):
-                    code_lines.append(line)
-            analysis["lines_of_code"] = len(code_lines)
+            # Los patrones se buscan en el código sin comentarios ni contenido de cadenas
+            summary = summarize(code)
+            view = code_view(code)
+            
+            # Contar líneas con código (sin comentarios ni vacías)
+            analysis["lines_of_code"] = summary["code_lines"]
             
             # Detectar includes
-            analysis["includes"] = re.findall(r'#include\s*[<"]([^>"]+)[>"]', code)
+            analysis["includes"] = list(summary["headers"])
             
             # Detectar función main
-            analysis["main_function"] = bool(re.search(r'int\s+main\s*\([^)]*\)', code))
+            analysis["main_function"] = bool(MAIN_REGEX.search(view))
             
             # Detectar clases y estructuras
-            analysis["has_classes"] = bool(re.findall(r'class\s+\w+', code))
-            analysis["has_structs"] = bool(re.findall(r'struct\s+\w+', code))
+            analysis["has_classes"] = bool(CLASS_REGEX.search(view))
+            analysis["has_structs"] = bool(STRUCT_REGEX.search(view))
             
             # Detectar funciones
-            analysis["functions"] = re.findall(r'(?:void|int|float|double|char|bool|string)\s+(\w+)\s*\([^)]*\)', code)
+            analysis["functions"] = FUNCTION_REGEX.findall(view)
+            analysis["recursive_functions"] = self.find_recursive_functions(view)
             
             # Detectar si requiere entrada
-            if 'cin' in code or 'getline' in code or 'scanf' in code:
+            if summary["identifiers"] & {"cin", "getline", "scanf"}:
                 analysis["requires_input"] = True
                 
-                # Detectar tipos de variables usadas con cin
-                cin_vars = re.findall(r'cin\s*>>\s*(\w+)', code)
-                for var in cin_vars:
-                    # Buscar la declaración de la variable
-                    var_decl = re.findall(rf'(?:int|float|double|char|string)\s+{var}\s*;', code)
-                    if var_decl:
-                        var_type = var_decl[0].split()[0]
-                        if var_type not in analysis["input_types"]:
-                            analysis["input_types"].append(var_type)
+                # Detectar tipos de variables usadas con cin (primera declaración de cada una)
+                declared = {}
+                for var_type, var in DECLARATION_REGEX.findall(view):
+                    declared.setdefault(var, var_type)
+                for var in CIN_REGEX.findall(view):
+                    var_type = declared.get(var)
+                    if var_type and var_type not in analysis["input_types"]:
+                        analysis["input_types"].append(var_type)
             
             # Detectar patrones por tipo de ejercicio
             pattern_scores = {"vector": 0, "matriz": 0, "cadena": 0, "estructura": 0}
             
-            for type_name, patterns in self.patterns.items():
-                matches = []
-                for pattern in patterns:
-                    found = re.findall(pattern, code, re.IGNORECASE)
-                    if found:
-                        matches.extend(found)
-                        pattern_scores[type_name] += len(found)
-                
-                if matches:
-                    analysis["detected_patterns"][type_name] = matches
+            for (type_name, _), found in zip(self._pattern_list, self.scan_patterns(view)):
+                if found:
+                    analysis["detected_patterns"].setdefault(type_name, []).extend(found)
+                    pattern_scores[type_name] += len(found)
             
             # Buscar palabras clave en comentarios o cadenas
-            for type_name, words in self.keywords.items():
-                for word in words:
-                    word_count = sum(1 for m in re.finditer(rf'\b{word}\b', code, re.IGNORECASE))
-                    pattern_scores[type_name] += word_count * 0.5  # Menos peso que los patrones de código
+            for type_name, word_count in self.count_keywords(code).items():
+                pattern_scores[type_name] += word_count * 0.5  # Menos peso que los patrones de código
             
             # Determinar el tipo basado en los puntajes
             if pattern_scores:
@@ -205,32 +346,71 @@ class CppAnalyzer:
             traceback.print_exc()
             return {"error": str(e), "type": "default"}
     
+    def find_recursive_functions(self, code):
+        """Devuelve los nombres de las funciones que se llaman a sí mismas en su cuerpo."""
+        recursive = []
+        for match in FUNCTION_HEADER_REGEX.finditer(code):
+            name = match.group(1)
+            if name in ("if", "for", "while", "switch", "catch", "main") or name in recursive:
+                continue
+            
+            # Delimitar el cuerpo contando llaves
+            depth = 1
+            end = match.end()
+            while end < len(code) and depth:
+                if code[end] == '{':
+                    depth += 1
+                elif code[end] == '}':
+                    depth -= 1
+                end += 1
+            
+            if re.search(rf'\b{re.escape(name)}\s*\(', code[match.end():end]):
+                recursive.append(name)
+        return recursive
+    
     def analyze_description(self, text):
         """Analiza una descripción textual para determinar el tipo de ejercicio."""
         try:
-            # Tokenizar y etiquetar el texto
-            tokens = word_tokenize(text.lower())
-            tagged = pos_tag(tokens)
-            
-            # Buscar palabras clave por tipo
-            scores = {"vector": 0, "matriz": 0, "cadena": 0, "estructura": 0}
-            
-            for word, tag in tagged:
-                # Solo considerar sustantivos y verbos
-                if tag.startswith('N') or tag.startswith('V'):
-                    for type_name, keywords in self.keywords.items():
-                        if word in keywords:
-                            scores[type_name] += 1
-            
-            # Determinar el tipo basado en los puntajes
-            if scores:
-                max_type = max(scores.items(), key=lambda x: x[1])
-                if max_type[1] > 0:
-                    return max_type[0]
-            
-            return "default"
+            # Tokenizar y etiquetar el texto (NLTK se carga en el primer uso)
+            tagged = DescriptionTagger.get().tag(text.lower())
+            return self.get_description_type(tagged)
             
         except Exception as e:
             print(f"Error al analizar descripción: {e}")
             traceback.print_exc()
             return "default"
+    
+    def analyze_descriptions(self, texts):
+        """Analiza varias descripciones etiquetándolas en lote.
+        
+        Returns:
+            list: El tipo de ejercicio de cada descripción, en el mismo orden
+        """
+        try:
+            tagged_texts = DescriptionTagger.get().tag_batch([text.lower() for text in texts])
+            return [self.get_description_type(tagged) for tagged in tagged_texts]
+            
+        except Exception as e:
+            print(f"Error al analizar descripciones: {e}")
+            traceback.print_exc()
+            return ["default"] * len(texts)
+    
+    def get_description_type(self, tagged):
+        """Determina el tipo de ejercicio a partir de las palabras etiquetadas de una descripción."""
+        # Buscar palabras clave por tipo
+        scores = {"vector": 0, "matriz": 0, "cadena": 0, "estructura": 0}
+        
+        for word, tag in tagged:
+            # Solo considerar sustantivos y verbos
+            if tag.startswith('N') or tag.startswith('V'):
+                for type_name, keywords in self.keywords.items():
+                    if word in keywords:
+                        scores[type_name] += 1
+        
+        # Determinar el tipo basado en los puntajes
+        if scores:
+            max_type = max(scores.items(), key=lambda x: x[1])
+            if max_type[1] > 0:
+                return max_type[0]
+        
+        return "default"
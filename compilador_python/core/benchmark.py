@@ -0,0 +1,129 @@
+"""
+Módulo para medir el rendimiento de los programas compilados con ejecuciones repetidas.
+"""
+
+import os
+import statistics
+
+from config.settings import BENCHMARK_CONFIG
+from core.executor import ProgramExecutor, STATUS_OK, STATUS_DESCRIPTIONS
+
+def summarize_samples(samples):
+    """Resume una lista de tiempos con estadísticos robustos.
+
+    Los cuartiles se calculan con el método inclusivo y los valores atípicos
+    con la regla de Tukey (fuera de Q1 - 1.5·IQR y Q3 + 1.5·IQR).
+
+    Returns:
+        dict: min, max, median, mean, q1, q3, iqr, outliers_low y outliers_high
+    """
+    ordered = sorted(samples)
+    if len(ordered) >= 2:
+        q1, _, q3 = statistics.quantiles(ordered, n=4, method='inclusive')
+    else:
+        q1 = q3 = ordered[0]
+    iqr = q3 - q1
+    low_fence = q1 - 1.5 * iqr
+    high_fence = q3 + 1.5 * iqr
+    return {
+        "min": ordered[0],
+        "max": ordered[-1],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "q1": q1,
+        "q3": q3,
+        "iqr": iqr,
+        "outliers_low": sum(1 for value in ordered if value < low_fence),
+        "outliers_high": sum(1 for value in ordered if value > high_fence)
+    }
+
+def format_benchmark(benchmark):
+    """Resume la medición en una línea para la consola y el informe."""
+    if not benchmark.get("success"):
+        return f"sin medición ({benchmark.get('error')})"
+    wall = benchmark["wall"]
+    outliers = wall["outliers_low"] + wall["outliers_high"]
+    text = (f"mediana {wall['median']:.4f} s, mínimo {wall['min']:.4f} s, IQR {wall['iqr']:.4f} s "
+            f"({benchmark['runs']} ejecuciones tras {benchmark['warmups']} de calentamiento, "
+            f"{outliers} atípicas")
+    if benchmark.get("cpu") is not None:
+        text += f", núcleo {benchmark['cpu']}"
+    return text + ")"
+
+class Benchmark:
+    """Ejecuta un binario varias veces con la misma entrada y resume sus tiempos.
+
+    Las ejecuciones de calentamiento no se cuentan: cargan el ejecutable y las
+    bibliotecas en la caché de páginas. Opcionalmente, cada ejecución se fija
+    a un núcleo con sched_setaffinity para reducir la variación entre medidas.
+    """
+
+    def __init__(self, runs=None, warmups=None, cpu=None):
+        """Inicializa la medición.
+
+        Args:
+            runs (int): Ejecuciones medidas (por defecto, BENCHMARK_CONFIG['runs'])
+            warmups (int): Ejecuciones previas descartadas (por defecto, BENCHMARK_CONFIG['warmups'])
+            cpu (int): Núcleo al que se fija cada ejecución (por defecto, BENCHMARK_CONFIG['cpu'])
+        """
+        self.runs = max(1, int(runs or BENCHMARK_CONFIG['runs']))
+        self.warmups = max(0, int(BENCHMARK_CONFIG['warmups'] if warmups is None else warmups))
+        self.cpu = BENCHMARK_CONFIG['cpu'] if cpu is None else cpu
+        self.executor = ProgramExecutor(verbose=False)
+
+    def get_affinity(self):
+        """Devuelve el conjunto de núcleos para sched_setaffinity o None si no se fija."""
+        if self.cpu is None:
+            return None
+        if not hasattr(os, 'sched_setaffinity'):
+            print("Advertencia: Esta plataforma no permite fijar el núcleo; se mide sin fijarlo")
+            return None
+        if self.cpu not in os.sched_getaffinity(0):
+            print(f"Advertencia: El núcleo {self.cpu} no está disponible; se mide sin fijarlo")
+            return None
+        return {self.cpu}
+
+    def run(self, executable, stdin_data=None, timeout=None, cpu_timeout=None, limits=None):
+        """Mide el programa y devuelve el resumen de sus tiempos.
+
+        Returns:
+            dict: success, runs, warmups, cpu, samples (tiempos de reloj), wall y
+                cpu_time (resúmenes de summarize_samples), o status y error si
+                una ejecución no terminó correctamente
+        """
+        affinity = self.get_affinity()
+        result = {
+            "runs": self.runs,
+            "warmups": self.warmups,
+            "cpu": min(affinity) if affinity else None
+        }
+
+        wall_samples = []
+        cpu_samples = []
+        for index in range(self.warmups + self.runs):
+            execution = self.executor.run(
+                executable, stdin_data=stdin_data, timeout=timeout,
+                cpu_timeout=cpu_timeout, limits=limits, affinity=affinity
+            )
+            if execution.get("status") != STATUS_OK:
+                status = execution.get("status")
+                result.update({
+                    "success": False,
+                    "status": status,
+                    "error": execution.get("error") or STATUS_DESCRIPTIONS.get(status, status)
+                })
+                return result
+            if index < self.warmups:
+                continue
+            resources = execution["resources"]
+            wall_samples.append(resources["wall_time"])
+            if resources.get("user_time") is not None:
+                cpu_samples.append(resources["user_time"] + resources["sys_time"])
+
+        result.update({
+            "success": True,
+            "samples": wall_samples,
+            "wall": summarize_samples(wall_samples),
+            "cpu_time": summarize_samples(cpu_samples) if cpu_samples else None
+        })
+        return result
@@ -0,0 +1,523 @@
+"""
+Módulo de cachés persistentes en disco.
+"""
+
+import os
+import re
+import json
+import zlib
+import shutil
+import hashlib
+import threading
+import subprocess
+
+from config.settings import CACHE_CONFIG
+
+class DiskCache:
+    """Caché en disco con tamaño máximo y expulsión LRU.
+
+    Cada entrada se guarda como uno o varios archivos cuyo nombre empieza por
+    la clave. El archivo de metadatos (<clave>.json) marca con su fecha de
+    modificación el último acceso, y es el que decide el orden de expulsión.
+    """
+
+    META_SUFFIX = ".json"  # Sufijo del archivo de metadatos de cada entrada
+
+    def __init__(self, directory, max_size_mb):
+        """Inicializa la caché.
+
+        Args:
+            directory (str): Carpeta donde se guardan las entradas
+            max_size_mb (float): Tamaño máximo de la caché en MB
+        """
+        self.directory = directory
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self._size = None  # Se calcula la primera vez que hace falta
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key, suffix):
+        """Devuelve la ruta de un archivo de la entrada."""
+        return os.path.join(self.directory, f"{key}{suffix}")
+
+    def load_meta(self, key):
+        """Lee los metadatos de una entrada y la marca como usada recientemente."""
+        meta_path = self.path(key, self.META_SUFFIX)
+        try:
+            with open(meta_path, 'rb') as f:
+                meta = self.decode_meta(f.read())
+            os.utime(meta_path, None)
+            return meta
+        except (OSError, ValueError):
+            return None
+
+    def store(self, key, meta, files=None):
+        """Guarda una entrada de forma atómica.
+
+        Args:
+            key (str): Clave de la entrada
+            meta (dict): Metadatos serializables en JSON
+            files (dict): Archivos adicionales {sufijo: ruta de origen}
+        """
+        added = 0
+        for suffix, source in (files or {}).items():
+            added += self._atomic_copy(source, self.path(key, suffix))
+
+        meta_path = self.path(key, self.META_SUFFIX)
+        tmp_path = f"{meta_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.encode_meta(meta))
+        added += os.path.getsize(tmp_path)
+        os.replace(tmp_path, meta_path)
+
+        with self._lock:
+            if self._size is not None:
+                self._size += added
+        self.evict()
+
+    def encode_meta(self, meta):
+        """Serializa los metadatos de una entrada."""
+        return json.dumps(meta, separators=(',', ':')).encode('utf-8')
+
+    def decode_meta(self, data):
+        """Lee los metadatos serializados con encode_meta (ValueError si están dañados)."""
+        return json.loads(data)
+
+    def _atomic_copy(self, source, destination):
+        """Copia un archivo a la caché sin dejar entradas a medio escribir."""
+        tmp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, destination)
+        return os.path.getsize(destination)
+
+    def _entries(self):
+        """Agrupa los archivos de la caché por clave.
+
+        Returns:
+            dict: {clave: [último acceso, tamaño total, [rutas]]}
+        """
+        entries = {}
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.tmp'):
+                continue
+            filepath = os.path.join(self.directory, filename)
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                continue
+            key = filename.split('.', 1)[0]
+            entry = entries.setdefault(key, [0, 0, []])
+            entry[1] += stat.st_size
+            entry[2].append(filepath)
+            if filename.endswith(self.META_SUFFIX):
+                entry[0] = stat.st_mtime
+        return entries
+
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta respetar el tamaño máximo."""
+        with self._lock:
+            if self._size is not None and self._size <= self.max_size:
+                return
+
+            entries = self._entries()
+            self._size = sum(entry[1] for entry in entries.values())
+            if self._size <= self.max_size:
+                return
+
+            for key, (last_access, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+                for filepath in paths:
+                    try:
+                        os.remove(filepath)
+                    except OSError:
+                        pass
+                self._size -= size
+                if self._size <= self.max_size:
+                    break
+
+# Salida de "<compilador> --version" por compilador (se consulta una sola vez por proceso)
+_compiler_versions = {}
+_compiler_versions_lock = threading.Lock()
+
+def get_compiler_version(compiler):
+    """Devuelve la salida de '<compilador> --version' o None si no se puede ejecutar."""
+    with _compiler_versions_lock:
+        if compiler not in _compiler_versions:
+            try:
+                process = subprocess.run(
+                    [compiler, '--version'],
+                    capture_output=True,
+                    text=True
+                )
+                _compiler_versions[compiler] = process.stdout if process.returncode == 0 else None
+            except OSError:
+                _compiler_versions[compiler] = None
+        return _compiler_versions[compiler]
+
+class CompileCache(DiskCache):
+    """Caché de ejecutables direccionada por contenido.
+
+    La clave combina el código fuente, los includes locales que resuelve,
+    el compilador, sus flags y la salida de '--version'. También guarda los
+    errores de compilación conocidos junto con su stderr.
+    """
+
+    INCLUDE_PATTERN = re.compile(rb'^\s*#\s*include\s*"([^"]+)"', re.MULTILINE)
+
+    def __init__(self, directory=None, max_size_mb=None):
+        super().__init__(
+            directory or CACHE_CONFIG['compile_dir'],
+            max_size_mb if max_size_mb is not None else CACHE_CONFIG['compile_max_size_mb']
+        )
+
+    def make_key(self, filepath, compiler, flags):
+        """Calcula la clave de compilación de un archivo.
+
+        Returns:
+            str: Hash hexadecimal, o None si no se puede determinar la versión del compilador
+        """
+        version = get_compiler_version(compiler)
+        if version is None:
+            return None
+
+        digest = hashlib.sha256()
+        digest.update(compiler.encode('utf-8') + b'\0')
+        digest.update(version.encode('utf-8') + b'\0')
+        digest.update(json.dumps(list(flags)).encode('utf-8') + b'\0')
+
+        include_dirs = [flag[2:] for flag in flags if flag.startswith('-I') and len(flag) > 2]
+        for path, content in self._source_closure(filepath, include_dirs):
+            digest.update(path.encode('utf-8') + b'\0')
+            digest.update(hashlib.sha256(content).digest())
+
+        return digest.hexdigest()
+
+    def _source_closure(self, filepath, include_dirs):
+        """Recorre el archivo y los includes locales ("...") que se pueden resolver.
+
+        Yields:
+            tuple: (ruta relativa al archivo principal, contenido en bytes)
+        """
+        root_dir = os.path.dirname(os.path.abspath(filepath))
+        pending = [os.path.abspath(filepath)]
+        seen = set()
+
+        while pending:
+            current = pending.pop(0)
+            if current in seen:
+                continue
+            seen.add(current)
+
+            with open(current, 'rb') as f:
+                content = f.read()
+            yield os.path.relpath(current, root_dir), content
+
+            search_dirs = [os.path.dirname(current)] + include_dirs
+            for include in self.INCLUDE_PATTERN.findall(content):
+                include = include.decode('utf-8', 'replace')
+                for directory in search_dirs:
+                    candidate = os.path.abspath(os.path.join(directory, include))
+                    if os.path.isfile(candidate):
+                        pending.append(candidate)
+                        break
+
+    def get(self, key, executable):
+        """Recupera una compilación de la caché.
+
+        Args:
+            key (str): Clave calculada con make_key
+            executable (str): Ruta donde se debe dejar el ejecutable
+
+        Returns:
+            dict: Resultado con el mismo formato que compile_file, o None si no hay entrada
+        """
+        meta = self.load_meta(key)
+        if meta is None:
+            return None
+
+        if not meta.get("success"):
+            return {
+                "success": False,
+                "stdout": meta.get("stdout", ""),
+                "stderr": meta.get("stderr", ""),
+                "cached": True
+            }
+
+        try:
+            shutil.copy2(self.path(key, ".bin"), executable)
+        except OSError:
+            return None
+
+        return {
+            "success": True,
+            "executable": executable,
+            "stdout": meta.get("stdout", ""),
+            "stderr": meta.get("stderr", ""),
+            "cached": True
+        }
+
+    def put(self, key, result):
+        """Guarda el resultado de una compilación (exitosa o fallida)."""
+        meta = {
+            "success": result["success"],
+            "stdout": result.get("stdout", ""),
+            "stderr": result.get("stderr", "")
+        }
+
+        if result["success"]:
+            self.store(key, meta, {".bin": result["executable"]})
+        elif CACHE_CONFIG['cache_failures']:
+            self.store(key, meta)
+
+class RunCache(DiskCache):
+    """Caché de resultados de ejecución.
+
+    La clave combina el contenido del ejecutable, la entrada estándar, los
+    argumentos y los límites aplicados, de modo que volver a generar el
+    informe no obliga a ejecutar otra vez los mismos programas. Las
+    ejecuciones cortadas por el límite de reloj no se guardan, porque
+    dependen de la carga de la máquina.
+    """
+
+    SPILL_FIELDS = ("stdout_spill", "stderr_spill")
+
+    def __init__(self, directory=None, max_size_mb=None):
+        super().__init__(
+            directory or CACHE_CONFIG['run_dir'],
+            max_size_mb if max_size_mb is not None else CACHE_CONFIG['run_max_size_mb']
+        )
+        self._executable_hashes = {}  # {ruta: ((mtime, tamaño), hash)}
+
+    def hash_executable(self, executable):
+        """Devuelve el hash del ejecutable, recalculándolo solo si cambió en disco."""
+        stat = os.stat(executable)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._executable_hashes.get(executable)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(executable, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        self._executable_hashes[executable] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+    def make_key(self, executable, stdin_data=None, args=None, limits=None):
+        """Calcula la clave de una ejecución.
+
+        Args:
+            executable (str): Ruta del ejecutable
+            stdin_data (str|bytes): Entrada estándar (None = sin entrada)
+            args (list): Argumentos de línea de comandos
+            limits (dict): Límites de tiempo y del sandbox aplicados
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        if isinstance(stdin_data, str):
+            stdin_data = stdin_data.encode('utf-8')
+
+        digest = hashlib.sha256()
+        digest.update(self.hash_executable(executable).encode('ascii') + b'\0')
+        digest.update(b'-' if stdin_data is None else hashlib.sha256(stdin_data).digest())
+        digest.update(b'\0' + json.dumps(list(args or [])).encode('utf-8') + b'\0')
+        digest.update(json.dumps(limits or {}, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Recupera un resultado de ejecución.
+
+        Returns:
+            dict: Resultado con el mismo formato que execute_program, o None si no hay entrada
+        """
+        result = self.load_meta(key)
+        if result is None:
+            return None
+
+        # Las salidas completas (si se truncaron) se guardan junto a la entrada
+        for field in self.SPILL_FIELDS:
+            if result.get(field):
+                spill_path = self.path(key, f".{field}.gz")
+                if not os.path.exists(spill_path):
+                    return None
+                result[field] = spill_path
+
+        result["cached"] = True
+        return result
+
+    def put(self, key, result):
+        """Guarda un resultado de ejecución (salvo los cortados por tiempo de reloj)."""
+        if result.get("limit_exceeded") == "wall" or "error" in result:
+            return
+
+        meta = {k: v for k, v in result.items() if k not in ("screenshot", "cached")}
+        files = {}
+        for field in self.SPILL_FIELDS:
+            if meta.get(field):
+                files[f".{field}.gz"] = meta[field]
+        self.store(key, meta, files)
+
+class AnalysisCache(DiskCache):
+    """Caché de los resultados de CppAnalyzer.
+
+    La clave combina el hash del código, el nombre del archivo (el nombre
+    influye en el tipo detectado) y la versión del analizador, que cambia con
+    sus reglas, así que las entradas antiguas dejan de usarse solas. Cada
+    resultado se guarda como JSON comprimido con zlib en un único archivo.
+    """
+
+    META_SUFFIX = ".json.z"
+
+    def __init__(self, directory=None, max_size_mb=None):
+        super().__init__(
+            directory or CACHE_CONFIG['analysis_dir'],
+            max_size_mb if max_size_mb is not None else CACHE_CONFIG['analysis_max_size_mb']
+        )
+
+    def encode_meta(self, meta):
+        return zlib.compress(super().encode_meta(meta), 9)
+
+    def decode_meta(self, data):
+        try:
+            return super().decode_meta(zlib.decompress(data))
+        except zlib.error as e:
+            raise ValueError(str(e)) from e
+
+    def make_key(self, code, filepath, version):
+        """Calcula la clave del análisis de un código.
+
+        Args:
+            code (str): Código fuente
+            filepath (str): Ruta del archivo (solo se usa su nombre)
+            version (str): Versión del analizador (CppAnalyzer.version)
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        digest = hashlib.sha256()
+        digest.update(version.encode('ascii') + b'\0')
+        digest.update(os.path.basename(filepath or '').encode('utf-8') + b'\0')
+        digest.update(hashlib.sha256(code.encode('utf-8', 'surrogatepass')).digest())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Recupera un análisis; None si no hay entrada."""
+        return self.load_meta(key)
+
+    def put(self, key, analysis):
+        """Guarda un análisis (los que terminaron con error no se guardan)."""
+        if "error" not in analysis:
+            self.store(key, analysis)
+
+class FragmentCache(DiskCache):
+    """Caché de los fragmentos del informe ya renderizados.
+
+    Los programas se renderizan en grupos, con un PDF por sección (código,
+    resultados y análisis). La clave de cada programa combina todo lo que se
+    muestra de él (código, salida, contenido de la captura, tipo...) y la
+    versión del generador de PDF; la de un grupo, las claves de sus
+    programas. Los encabezados de las secciones, que dependen de todos los
+    programas, no se guardan. Al volver a generar el informe solo se
+    renderizan los grupos con algún programa que cambió. Los fragmentos se
+    guardan como archivos <clave>.<sección>.pdf y los metadatos con sus
+    páginas y la página donde empieza cada programa.
+
+    La línea "Fecha: ..." de la salida cambia en cada ejecución y no forma
+    parte de la clave; un fragmento reutilizado muestra la fecha de la
+    ejecución que lo renderizó. Las líneas "Recursos: ..." y
+    "Rendimiento: ..." sí la forman, porque se muestran en los resultados:
+    como son tiempos medidos, cambian en cada ejecución real y la clave de
+    un programa solo se repite cuando la caché de ejecuciones devuelve la
+    ejecución anterior (o cuando no se midió nada). Los recursos del
+    programa (program_info['resources']) solo aparecen en la tabla de la
+    sección 2 y quedan fuera de la clave.
+    """
+
+    VOLATILE_LINES = re.compile(r'^Fecha: .*$', re.MULTILINE)
+
+    def __init__(self, directory=None, max_size_mb=None):
+        super().__init__(
+            directory or CACHE_CONFIG['fragments_dir'],
+            max_size_mb if max_size_mb is not None else CACHE_CONFIG['fragments_max_size_mb']
+        )
+
+    def hash_screenshot(self, screenshot_path):
+        """Devuelve el hash del contenido de la captura (o de su versión JPG, como el generador)."""
+        for path in (screenshot_path, screenshot_path.replace('.png', '.jpg')):
+            try:
+                with open(path, 'rb') as f:
+                    return hashlib.sha256(f.read()).hexdigest()
+            except OSError:
+                continue
+        return None
+
+    def make_key(self, program_info, style_type, version):
+        """Calcula la clave de un programa.
+
+        Args:
+            program_info (dict): Datos del programa, como los recibe add_program
+            style_type (str): Tipo del programa
+            version (str): Versión del generador de PDF (get_renderer_version)
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        info = dict(program_info)
+        info.pop('resources', None)
+        if isinstance(info.get('output'), str):
+            info['output'] = self.VOLATILE_LINES.sub('Fecha:', info['output'])
+        if info.get('screenshot'):
+            info['screenshot'] = self.hash_screenshot(info['screenshot'])
+
+        digest = hashlib.sha256()
+        digest.update(version.encode('ascii') + b'\0')
+        digest.update(json.dumps([style_type, info], sort_keys=True, default=str).encode('utf-8'))
+        return digest.hexdigest()
+
+    def make_group_key(self, keys, first):
+        """Calcula la clave de los fragmentos de un grupo de programas.
+
+        Args:
+            keys (list): Claves de los programas del grupo (make_key), en orden
+            first (bool): Si es el primer grupo, cuyo fragmento de código
+                empieza con el título de la sección 1
+
+        Returns:
+            str: Hash hexadecimal
+        """
+        digest = hashlib.sha256()
+        digest.update(json.dumps([keys, first]).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key, directory, number, sections):
+        """Copia los fragmentos de una entrada a la carpeta de trabajo del informe.
+
+        Returns:
+            list: (ruta, páginas, inicios) de cada sección, como
+                render_program_chunks, o None si no hay entrada
+        """
+        meta = self.load_meta(key)
+        if meta is None or len(meta.get("pages", ())) != len(sections) or len(meta.get("starts", ())) != len(sections):
+            return None
+
+        chunks = []
+        for name, pages, starts in zip(sections, meta["pages"], meta["starts"]):
+            if not pages:
+                chunks.append((None, 0, starts))
+                continue
+            path = os.path.join(directory, f"{number:06d}_{name}.pdf")
+            try:
+                shutil.copyfile(self.path(key, f".{name}.pdf"), path)
+            except OSError:
+                return None
+            chunks.append((path, pages, starts))
+        return chunks
+
+    def put(self, key, sections, chunks):
+        """Guarda los fragmentos renderizados de un grupo de programas."""
+        files = {f".{name}.pdf": path for name, (path, pages, starts) in zip(sections, chunks) if path}
+        meta = {
+            "pages": [pages for path, pages, starts in chunks],
+            "starts": [starts for path, pages, starts in chunks]
+        }
+        self.store(key, meta, files)
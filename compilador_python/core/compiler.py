@@ -2,18 +2,27 @@
 Módulo principal para la compilación y ejecución de programas C++.
 """
 
+import io
 import os
 import subprocess
 import re
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
-from config.settings import COMPILER_CONFIG, TEMP_DIR, OUTPUT_DIR
+from config.settings import COMPILER_CONFIG, CACHE_CONFIG, EXECUTION_CONFIG, INPUT_CONFIG, BENCHMARK_CONFIG, COMPLEXITY_CONFIG, ALLOC_CONFIG, TEMP_DIR, OUTPUT_DIR
 from utils.screenshot import take_program_screenshot, take_terminal_screenshot
 from utils.pdf_generator import PDFGenerator
 from utils.output_window import OutputWindow
 from core.analyzer import CppAnalyzer
+from core.cache import CompileCache, RunCache, AnalysisCache
+from core.input_generator import InputGenerator
+from core.benchmark import Benchmark, format_benchmark
+from core.complexity import ComplexityEstimator, format_complexity
+from core.alloc_tracker import AllocationTracker, format_allocations
+from core.pty_executor import PtyExecutor
+from core.executor import ProgramExecutor, get_execution_mode, get_limits, describe_limit, resource_summary, format_resources, STATUS_DESCRIPTIONS, STATUS_OK, STATUS_RUNTIME_ERROR
 
 class CppCompiler:
     """Clase principal para manejar la compilación y ejecución de programas C++."""
@@ -23,9 +32,18 @@ class CppCompiler:
         self.compiler = COMPILER_CONFIG['compiler']
         self.flags = COMPILER_CONFIG['flags']
         self.timeout = COMPILER_CONFIG['timeout']
+        self.cpu_timeout = COMPILER_CONFIG['cpu_timeout']
+        self.jobs = COMPILER_CONFIG['jobs']
         self.gui = gui
         self.pdf = PDFGenerator(os.path.join(OUTPUT_DIR, "programas_cpp.pdf"))
-        self.analyzer = CppAnalyzer()
+        self.analyzer = CppAnalyzer(AnalysisCache() if CACHE_CONFIG['enabled'] else None)
+        self.compile_cache = CompileCache() if CACHE_CONFIG['enabled'] else None
+        self.run_cache = RunCache() if CACHE_CONFIG['enabled'] else None
+        self.executor = ProgramExecutor()
+        self.pty_executor = PtyExecutor()
+        self.input_generator = InputGenerator()
+        self.complexity_estimator = ComplexityEstimator(self.input_generator)
+        self.alloc_tracker = AllocationTracker(self.compiler)
         self.processed_files = []  # Lista para mantener registro de archivos procesados
         
         # Crear directorios necesarios
@@ -79,11 +97,17 @@ class CppCompiler:
             traceback.print_exc()
             return {"error": str(e)}
     
-    def compile_file(self, filepath):
-        """Compila un archivo C++."""
+    def compile_file(self, filepath, output_name=None, out=None):
+        """Compila un archivo C++.
+        
+        Args:
+            filepath (str): Ruta del archivo .cpp
+            output_name (str): Nombre del ejecutable (por defecto, el del archivo sin extensión)
+            out (file): Dónde escribir los mensajes (por defecto, la consola)
+        """
         try:
             basename = os.path.basename(filepath)
-            name_without_ext = os.path.splitext(basename)[0]
+            name_without_ext = output_name or os.path.splitext(basename)[0]
             
             # Asegurar que el directorio temporal existe
             os.makedirs(TEMP_DIR, exist_ok=True)
@@ -96,8 +120,22 @@ class CppCompiler:
             # Construir el comando de compilación
             compile_cmd = [self.compiler] + self.flags + [filepath, '-o', executable]
             
-            print(f"\n=== Compilando {basename} ===")
-            print(f"Comando: {' '.join(compile_cmd)}")
+            print(f"\n=== Compilando {basename} ===", file=out)
+            
+            # Consultar la caché antes de invocar al compilador
+            cache_key = None
+            if self.compile_cache:
+                cache_key = self.compile_cache.make_key(filepath, self.compiler, self.flags)
+                cached = self.compile_cache.get(cache_key, executable) if cache_key else None
+                if cached:
+                    if cached["success"]:
+                        print("Compilación recuperada de la caché", file=out)
+                    else:
+                        print("Error de compilación (recuperado de la caché):", file=out)
+                        print(cached["stderr"], file=out)
+                    return cached
+            
+            print(f"Comando: {' '.join(compile_cmd)}", file=out)
             
             # Ejecutar la compilación
             process = subprocess.run(
@@ -107,32 +145,181 @@ class CppCompiler:
             )
             
             if process.returncode == 0:
-                print("Compilación exitosa")
-                return {
+                print("Compilación exitosa", file=out)
+                result = {
                     "success": True,
                     "executable": executable,
                     "stdout": process.stdout,
                     "stderr": process.stderr
                 }
             else:
-                print("Error de compilación:")
-                print(process.stderr)
-                return {
+                print("Error de compilación:", file=out)
+                print(process.stderr, file=out)
+                result = {
                     "success": False,
                     "stdout": process.stdout,
                     "stderr": process.stderr
                 }
+            
+            if cache_key:
+                try:
+                    self.compile_cache.put(cache_key, result)
+                except OSError as cache_error:
+                    print(f"Advertencia: No se pudo guardar en la caché de compilación: {cache_error}", file=out)
+            
+            return result
                 
         except Exception as e:
-            print(f"Error durante la compilación: {e}")
-            traceback.print_exc()
+            print(f"Error durante la compilación: {e}", file=out)
+            traceback.print_exc(file=out)
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    def execute_program(self, executable, test_input=None):
-        """Ejecuta un programa compilado y captura su salida."""
+    def compile_batch(self, files, jobs=None):
+        """Compila varios archivos C++ en paralelo.
+        
+        Los resultados se entregan en orden de finalización, de modo que la
+        interfaz puede actualizar el progreso a medida que termina cada archivo,
+        y los mensajes de cada archivo se muestran juntos al entregarlo.
+        
+        Args:
+            files (list): Rutas de los archivos .cpp a compilar
+            jobs (int): Compilaciones simultáneas (por defecto, self.jobs)
+            
+        Yields:
+            tuple: (ruta del archivo, resultado de compile_file)
+        """
+        files = list(dict.fromkeys(files))
+        if not files:
+            return
+        
+        jobs = max(1, int(jobs or self.jobs or 1))
+        output_names = self.get_output_names(files)
+        
+        with ThreadPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+            futures = {
+                pool.submit(self.compile_collecting_messages, filepath, output_names[filepath]): filepath
+                for filepath in files
+            }
+            for future in as_completed(futures):
+                result, messages = future.result()
+                print(messages, end='')
+                yield futures[future], result
+    
+    def compile_collecting_messages(self, filepath, output_name=None):
+        """Compila un archivo (en un hilo de compile_batch) guardando sus mensajes.
+        
+        Los hilos no escriben en la consola: compile_batch muestra los mensajes
+        de cada archivo juntos, cuando termina, sin mezclarlos con los de los
+        demás.
+        
+        Returns:
+            tuple: (resultado de compile_file, mensajes)
+        """
+        messages = io.StringIO()
+        result = self.compile_file(filepath, output_name, out=messages)
+        return result, messages.getvalue()
+    
+    def get_output_names(self, files):
+        """Asigna un nombre de ejecutable único a cada archivo.
+        
+        Archivos con el mismo nombre en carpetas distintas (por ejemplo,
+        ejercicio1_numeros.cpp en Script/ y en Examen(script)/) no deben
+        sobrescribirse al compilarse al mismo tiempo en TEMP_DIR.
+        """
+        output_names = {}
+        used = set()
+        for filepath in files:
+            base = os.path.splitext(os.path.basename(filepath))[0]
+            name = base
+            counter = 2
+            while name in used:
+                name = f"{base}_{counter}"
+                counter += 1
+            used.add(name)
+            output_names[filepath] = name
+        return output_names
+    
+    def execute_program(self, executable, test_input=None, exercise_type=None):
+        """Ejecuta un programa compilado y captura su salida.
+        
+        Según EXECUTION_CONFIG['mode'], el programa se ejecuta en la Terminal de
+        macOS (con captura de pantalla), directamente mediante tuberías o en una
+        pseudo-terminal (con transcripción), con los límites del sandbox
+        correspondientes a exercise_type. Con ALLOC_CONFIG['enabled'], el
+        resultado incluye "allocations" con los contadores del shim de memoria
+        dinámica (None si el programa no terminó normalmente).
+        """
+        mode = get_execution_mode()
+        if mode in ("pipe", "pty"):
+            executor = self.pty_executor if mode == "pty" else self.executor
+            env, trace_path = None, None
+            if ALLOC_CONFIG['enabled']:
+                env, trace_path = self.alloc_tracker.prepare(executable)
+            result = executor.run(
+                executable,
+                stdin_data=test_input,
+                timeout=self.timeout,
+                cpu_timeout=self.cpu_timeout,
+                limits=get_limits(exercise_type),
+                env=env
+            )
+            if trace_path:
+                result["allocations"] = self.alloc_tracker.read(trace_path)
+            return result
+        return self.execute_in_terminal(executable, test_input)
+    
+    def get_run_limits(self, exercise_type=None, mode=None, alloc_tracking=None):
+        """Devuelve todos los límites que afectan a una ejecución (parte de la clave de RunCache).
+
+        Args:
+            exercise_type (str): Tipo de ejercicio (define los límites del sandbox)
+            mode (str): Modo en que se ejecuta realmente el programa (por
+                defecto, el de get_execution_mode)
+            alloc_tracking (bool): Si la ejecución cuenta la memoria dinámica
+                (por defecto, ALLOC_CONFIG['enabled'])
+        """
+        return {
+            "timeout": self.timeout,
+            "cpu_timeout": self.cpu_timeout,
+            "sandbox": get_limits(exercise_type),
+            "mode": mode or get_execution_mode(),
+            "input_wait_grace": EXECUTION_CONFIG["input_wait_grace"],
+            "alloc_tracking": ALLOC_CONFIG["enabled"] if alloc_tracking is None else alloc_tracking
+        }
+    
+    def benchmark_program(self, executable, stdin_data=None, exercise_type=None, runs=None, warmups=None, cpu=None):
+        """Mide el rendimiento de un ejecutable con ejecuciones repetidas y la misma entrada.
+        
+        Las mediciones nunca se toman de la caché de ejecución y siempre usan el
+        modo "pipe", sin la sobrecarga de la pseudo-terminal.
+        
+        Args:
+            executable (str): Ruta del ejecutable
+            stdin_data (str): Entrada fija de todas las ejecuciones
+            exercise_type (str): Tipo de ejercicio (define los límites del sandbox)
+            runs, warmups, cpu: Sobrescriben los valores de BENCHMARK_CONFIG
+            
+        Returns:
+            dict: Resultado de Benchmark.run
+        """
+        benchmark = Benchmark(runs, warmups, cpu)
+        print(f"Midiendo rendimiento: {benchmark.warmups} ejecuciones de calentamiento "
+              f"y {benchmark.runs} medidas...")
+        result = benchmark.run(
+            executable,
+            stdin_data=stdin_data,
+            timeout=self.timeout,
+            cpu_timeout=self.cpu_timeout,
+            limits=get_limits(exercise_type)
+        )
+        print(f"Rendimiento: {format_benchmark(result)}")
+        return result
+    
+    def execute_in_terminal(self, executable, test_input=None):
+        """Ejecuta un programa en una ventana de Terminal de macOS y toma una captura."""
         try:
             basename = os.path.basename(executable)
             name_without_ext = os.path.splitext(basename)[0]
@@ -180,6 +367,7 @@ tell application "Terminal"
 end tell'"""
             
             print("Abriendo terminal y ejecutando programa...")
+            start_time = time.perf_counter()
             terminal_process = os.system(terminal_cmd)
             
             if terminal_process != 0:
@@ -243,6 +431,9 @@ end tell'"""
                     print("Tome su tiempo para revisar la salida.")
                     print("Presione Enter cuando haya terminado para continuar...")
             
+            # Tiempo de reloj hasta que terminó el programa (incluye la interacción del usuario)
+            execution_time = time.perf_counter() - start_time
+            
             # Dar tiempo para que la ventana se estabilice
             time.sleep(2)
             
@@ -289,7 +480,9 @@ end tell'"""
                 "stdout": stdout,
                 "stderr": stderr,
                 "screenshot": screenshot_path if screenshot_taken else None,
-                "execution_time": wait_time
+                "execution_time": execution_time,
+                # La Terminal no es hija de este proceso: solo se conoce el tiempo de reloj
+                "resources": resource_summary(execution_time)
             }
             
         except Exception as e:
@@ -301,8 +494,14 @@ end tell'"""
                 "screenshot": None
             }
     
-    def process_file(self, filepath):
-        """Procesa un archivo C++: analiza, compila, ejecuta y documenta."""
+    def process_file(self, filepath, compile_result=None):
+        """Procesa un archivo C++: analiza, compila, ejecuta y documenta.
+        
+        Args:
+            filepath (str): Ruta del archivo .cpp
+            compile_result (dict): Resultado de una compilación previa (por ejemplo,
+                de compile_batch). Si es None, el archivo se compila aquí.
+        """
         try:
             basename = os.path.basename(filepath)
             name_without_ext = os.path.splitext(basename)[0]
@@ -329,8 +528,9 @@ end tell'"""
             else:
                 print(f"Requiere entrada del usuario: No")
             
-            # Compilar
-            compile_result = self.compile_file(filepath)
+            # Compilar (salvo que ya se haya compilado por lotes)
+            if compile_result is None:
+                compile_result = self.compile_file(filepath)
             if not compile_result["success"]:
                 # Documentar el error de compilación
                 compiler_info = f"""Compilador: {self.compiler}
@@ -352,16 +552,66 @@ Error:
                 return compile_result
             
             print("\nPrograma compilado exitosamente.")
-            print("Iniciando ejecución... Por favor:")
-            print("1. Interactúe con el programa si es necesario")
-            print("2. Revise la salida")
-            print("3. Presione Enter cuando haya terminado para tomar la captura")
-            print("4. Espere a que se procese el siguiente archivo\n")
-            
-            # Ejecutar
-            execution_result = self.execute_program(
-                compile_result["executable"]
-            )
+            if get_execution_mode() == "terminal":
+                print("Iniciando ejecución... Por favor:")
+                print("1. Interactúe con el programa si es necesario")
+                print("2. Revise la salida")
+                print("3. Presione Enter cuando haya terminado para tomar la captura")
+                print("4. Espere a que se procese el siguiente archivo\n")
+            else:
+                print("Iniciando ejecución sin terminal...\n")
+            
+            # Generar la entrada estándar cuando no hay un usuario que la escriba
+            with open(filepath, 'r', encoding='utf-8') as f:
+                file_content = f.read()
+            
+            test_input = None
+            if analysis["requires_input"] and INPUT_CONFIG['enabled'] and get_execution_mode() != "terminal":
+                test_input = self.input_generator.generate(file_content, analysis)
+                print(f"Entrada generada ({len(test_input.splitlines())} líneas, semilla {self.input_generator.seed})")
+            
+            # Ejecutar (o reutilizar una ejecución idéntica de la caché)
+            execution_result = None
+            run_key = None
+            if self.run_cache and get_execution_mode() != "terminal":
+                run_key = self.run_cache.make_key(
+                    compile_result["executable"], test_input, limits=self.get_run_limits(analysis["type"])
+                )
+                execution_result = self.run_cache.get(run_key)
+                if execution_result:
+                    print("Ejecución recuperada de la caché")
+            
+            if execution_result is None:
+                execution_result = self.execute_program(
+                    compile_result["executable"],
+                    test_input,
+                    analysis["type"]
+                )
+                if run_key:
+                    try:
+                        self.run_cache.put(run_key, execution_result)
+                    except OSError as cache_error:
+                        print(f"Advertencia: No se pudo guardar en la caché de ejecución: {cache_error}")
+            
+            # Medir el rendimiento con la misma entrada (solo si la ejecución fue correcta)
+            benchmark = None
+            if BENCHMARK_CONFIG['enabled'] and execution_result.get("success"):
+                benchmark_input = test_input
+                if benchmark_input is None and analysis["requires_input"] and INPUT_CONFIG['enabled']:
+                    benchmark_input = self.input_generator.generate(file_content, analysis)
+                benchmark = self.benchmark_program(compile_result["executable"], benchmark_input, analysis["type"])
+                if BENCHMARK_CONFIG['pdf_section']:
+                    self.pdf.add_benchmark(name_without_ext, benchmark)
+            
+            # Estimar la complejidad con un barrido de tamaños de entrada
+            empirical_complexity = None
+            if (COMPLEXITY_CONFIG['enabled'] and execution_result.get("success")
+                    and self.complexity_estimator.get_category(analysis)):
+                print("Estimando la complejidad con un barrido de tamaños...")
+                empirical_complexity = self.complexity_estimator.estimate(
+                    compile_result["executable"], file_content, analysis, get_limits(analysis["type"])
+                )
+                print(f"Complejidad medida: {format_complexity(empirical_complexity)}")
             
             # Verificar si hay captura
             screenshot = None
@@ -370,12 +620,51 @@ Error:
                 print(f"Captura encontrada: {screenshot}")
             
             # Documentar el resultado
+            status = execution_result.get("status") or (STATUS_OK if execution_result["success"] else STATUS_RUNTIME_ERROR)
+            limit_description = None
+            if execution_result.get("limit_exceeded"):
+                limit_description = describe_limit(
+                    execution_result["limit_exceeded"], self.timeout, self.cpu_timeout, get_limits(analysis["type"])
+                )
+                print(f"Estado: {STATUS_DESCRIPTIONS.get(status, status)} ({limit_description})")
+            
             compiler_info = f"""Compilador: {self.compiler}
 Flags: {' '.join(self.flags)}
 Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-Estado: {'Ejecución exitosa' if execution_result['success'] else 'Error en ejecución'}
+Estado: {STATUS_DESCRIPTIONS.get(status, status)}"""
+            
+            if limit_description:
+                compiler_info += f"""
+Límite excedido: {limit_description}"""
+            
+            if execution_result.get("resources"):
+                compiler_info += f"""
+Recursos: {format_resources(execution_result['resources'])}"""
+            
+            if execution_result.get("allocations"):
+                compiler_info += f"""
+Memoria dinámica: {format_allocations(execution_result['allocations'])}"""
+            
+            if benchmark:
+                compiler_info += f"""
+Rendimiento: {format_benchmark(benchmark)}"""
+            
+            compiler_info += f"""
 Tipo: {analysis['type'].upper()}
-Complejidad: {analysis['complexity']}/100
+Complejidad: {analysis['complexity']}/100"""
+            
+            if empirical_complexity:
+                compiler_info += f"""
+Complejidad medida: {format_complexity(empirical_complexity)}"""
+            
+            if test_input:
+                compiler_info += f"""
+Entrada generada:
+{test_input.rstrip()}"""
+            
+            # Con transcripción, la salida se muestra en ella (con las entradas intercaladas)
+            if not execution_result.get("transcript"):
+                compiler_info += f"""
 Salida:
 {execution_result.get('stdout', '')}"""
             
@@ -385,16 +674,16 @@ Salida:
 Error:
 {execution_result.get("stderr", "")}"""
             
-            # Obtener el contenido del archivo para el PDF
-            with open(filepath, 'r', encoding='utf-8') as f:
-                file_content = f.read()
-            
             # Usar el tipo detectado por el analizador
             self.pdf.add_program({
                 'name': name_without_ext,
                 'source_code': file_content,
                 'output': compiler_info,
-                'screenshot': screenshot
+                'screenshot': screenshot,
+                'transcript': execution_result.get('transcript'),
+                'resources': execution_result.get('resources'),
+                'empirical_complexity': empirical_complexity,
+                'allocations': execution_result.get('allocations')
             }, analysis["type"])
             
             print(f"\nProcesamiento de {basename} completado.")
@@ -404,6 +693,8 @@ Error:
                 "success": execution_result["success"],
                 "compile_result": compile_result,
                 "execution_result": execution_result,
+                "benchmark": benchmark,
+                "empirical_complexity": empirical_complexity,
                 "analysis": analysis
             }
             
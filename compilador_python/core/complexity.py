@@ -0,0 +1,181 @@
+"""
+Módulo para estimar empíricamente la complejidad de un programa con barridos de tamaños.
+"""
+
+import math
+
+from config.settings import COMPLEXITY_CONFIG
+from core.benchmark import Benchmark
+
+# Modelos candidatos, del más simple al más complejo
+COMPLEXITY_MODELS = [
+    ("O(1)", lambda n: 1.0),
+    ("O(log n)", lambda n: math.log2(n)),
+    ("O(n)", lambda n: float(n)),
+    ("O(n log n)", lambda n: n * math.log2(n)),
+    ("O(n²)", lambda n: float(n) ** 2),
+    ("O(n³)", lambda n: float(n) ** 3),
+    ("O(2^n)", lambda n: 2.0 ** n)
+]
+
+def fit_model(sizes, times, growth):
+    """Ajusta t(n) = a + b·growth(n) por mínimos cuadrados con b >= 0.
+
+    Returns:
+        tuple: (a, b, suma de los cuadrados de los residuos) o None si el
+            modelo no se puede evaluar en estos tamaños (desbordamiento)
+    """
+    try:
+        xs = [growth(n) for n in sizes]
+    except OverflowError:
+        return None
+
+    mean_x = sum(xs) / len(xs)
+    mean_t = sum(times) / len(times)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (t - mean_t) for x, t in zip(xs, times)) / sxx if sxx else 0.0
+    slope = max(slope, 0.0)  # Un tiempo que decrece con n no es un crecimiento
+    intercept = mean_t - slope * mean_x
+    sse = sum((t - intercept - slope * x) ** 2 for x, t in zip(xs, times))
+    return intercept, slope, sse
+
+def fit_complexity(sizes, times, tolerance=0.05):
+    """Elige el modelo de COMPLEXITY_MODELS que mejor explica los tiempos.
+
+    Entre modelos con un error parecido (dentro de la tolerancia relativa) se
+    prefiere el más simple, para no confundir el ruido con crecimiento.
+
+    El R² compara el modelo con la media de los tiempos, que es justamente el
+    ajuste de O(1), así que para O(1) valdría siempre 0: en su lugar se
+    informa en note la dispersión de los residuos respecto de la media.
+
+    Returns:
+        dict: class, r2 (None para O(1)), note (solo para O(1)) y sse de
+            cada modelo ({nombre: sse})
+    """
+    mean_t = sum(times) / len(times)
+    sst = sum((t - mean_t) ** 2 for t in times)
+    fits = {}
+    for name, growth in COMPLEXITY_MODELS:
+        fit = fit_model(sizes, times, growth)
+        if fit is not None:
+            fits[name] = fit
+
+    best_sse = min(sse for _, _, sse in fits.values())
+    chosen = next(name for name, _ in COMPLEXITY_MODELS
+                  if name in fits and fits[name][2] <= best_sse * (1 + tolerance) + 1e-15)
+    result = {"class": chosen, "sse": {name: fit[2] for name, fit in fits.items()}}
+    if chosen == "O(1)":
+        spread = math.sqrt(fits[chosen][2] / len(times)) / mean_t if mean_t else 0.0
+        result.update({"r2": None, "note": f"R² no aplica a O(1); dispersión ±{spread:.1%} de la media"})
+    else:
+        result["r2"] = 1 - fits[chosen][2] / sst if sst else 1.0
+    return result
+
+def format_complexity(estimate):
+    """Resume la estimación en una línea para la consola y el informe."""
+    if not estimate.get("success"):
+        return f"no medida ({estimate.get('error')})"
+    sizes = estimate["sizes"]
+    text = f"{estimate['class']}"
+    if estimate.get("r2") is not None:
+        text += f", R² {estimate['r2']:.3f}"
+    elif estimate.get("note"):
+        text += f", {estimate['note']}"
+    return text + f" ({len(sizes)} tamaños de {sizes[0]} a {sizes[-1]})"
+
+class ComplexityEstimator:
+    """Mide el tiempo de un programa con entradas de tamaño creciente y ajusta su complejidad.
+
+    Los tamaños forman un barrido geométrico según la categoría del programa
+    (vector, matriz o recursión) y la entrada de cada tamaño la produce el
+    generador de entradas con su parámetro size. El barrido termina al
+    superar COMPLEXITY_CONFIG['time_budget'] o cuando una ejecución falla.
+    """
+
+    def __init__(self, input_generator):
+        self.input_generator = input_generator
+
+    def get_category(self, analysis):
+        """Devuelve la categoría del barrido ("vector", "matriz", "recursion") o None."""
+        if analysis.get("type") in ("vector", "matriz"):
+            return analysis["type"]
+        if analysis.get("recursive_functions"):
+            return "recursion"
+        return None
+
+    def sweep_sizes(self, category):
+        """Devuelve los tamaños del barrido geométrico de una categoría (sin repetidos)."""
+        start, factor, maximum = COMPLEXITY_CONFIG["sweeps"][category]
+        sizes = []
+        value = float(start)
+        while value <= maximum:
+            if not sizes or round(value) > sizes[-1]:
+                sizes.append(round(value))
+            value *= factor
+        return sizes
+
+    def estimate(self, executable, code, analysis, limits=None):
+        """Ejecuta el barrido y ajusta los modelos.
+
+        Args:
+            executable (str): Ruta del ejecutable
+            code (str): Código fuente (para generar las entradas)
+            analysis (dict): Resultado de CppAnalyzer.analyze_code
+            limits (dict): Límites del sandbox
+
+        Returns:
+            dict: success, category, sizes, times, class, r2 (None si no hay
+                crecimiento medible, con el motivo en note), sse y stopped
+                (motivo del fin del barrido), o error si no se pudo estimar
+        """
+        category = self.get_category(analysis)
+        if category is None:
+            return {"success": False, "error": "el programa no es de vectores, matrices ni recursivo"}
+
+        benchmark = Benchmark(COMPLEXITY_CONFIG["runs"], COMPLEXITY_CONFIG["warmups"], cpu=None)
+        sizes = []
+        times = []
+        stopped = "tamaño máximo alcanzado"
+        for size in self.sweep_sizes(category):
+            stdin_data = self.input_generator.generate(code, analysis, size=size)
+            if not stdin_data:
+                return {"success": False, "category": category, "error": "el programa no lee un tamaño de entrada"}
+
+            result = benchmark.run(
+                executable,
+                stdin_data=stdin_data,
+                timeout=COMPLEXITY_CONFIG["run_timeout"],
+                cpu_timeout=COMPLEXITY_CONFIG["run_timeout"],
+                limits=limits
+            )
+            if not result["success"]:
+                stopped = f"n = {size}: {result['error']}"
+                break
+
+            # El tiempo de CPU no incluye la espera de la tubería ni del planificador
+            summary = result["cpu_time"] or result["wall"]
+            sizes.append(size)
+            times.append(summary["median"])
+            if summary["median"] > COMPLEXITY_CONFIG["time_budget"]:
+                stopped = f"n = {size}: se superó el presupuesto de tiempo"
+                break
+
+        estimate = {"category": category, "sizes": sizes, "times": times, "stopped": stopped}
+        if len(sizes) < COMPLEXITY_CONFIG["min_points"]:
+            estimate.update({"success": False, "error": f"solo {len(sizes)} tamaños medidos ({stopped})"})
+            return estimate
+
+        if max(times) - min(times) < COMPLEXITY_CONFIG["min_signal"]:
+            # Sin variación medible el arranque del proceso domina el tiempo
+            estimate.update({"success": True, "class": "O(1)", "r2": None, "sse": {},
+                             "note": "sin variación medible del tiempo"})
+            return estimate
+
+        estimate.update({"success": True, **fit_complexity(sizes, times)})
+        if estimate["r2"] is not None and estimate["r2"] < COMPLEXITY_CONFIG["min_r2"]:
+            # El mejor modelo con crecimiento no explica los tiempos: es ruido
+            estimate.update({"class": "O(1)", "note": f"ningún crecimiento explica los tiempos "
+                                                      f"(mejor R² {estimate['r2']:.3f})",
+                             "r2": None})
+        return estimate
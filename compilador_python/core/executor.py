@@ -0,0 +1,698 @@
+"""
+Módulo para ejecutar programas compilados sin abrir una terminal.
+"""
+
+import os
+import math
+import time
+import select
+import signal
+import shutil
+import platform
+import threading
+import subprocess
+import traceback
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config.settings import EXECUTION_CONFIG, SANDBOX_CONFIG, EXERCISE_TYPES, TEMP_DIR
+from core.output_capture import OutputCapture
+from core.runtime_probe import RuntimeProbe
+
+# Estados posibles de una ejecución
+STATUS_OK = "OK"
+STATUS_RUNTIME_ERROR = "RE"
+STATUS_TIME_LIMIT = "TLE"
+STATUS_MEMORY_LIMIT = "MLE"
+STATUS_OUTPUT_LIMIT = "OLE"
+STATUS_IDLE_LIMIT = "ILE"
+
+STATUS_DESCRIPTIONS = {
+    STATUS_OK: "Ejecución exitosa",
+    STATUS_RUNTIME_ERROR: "Error en ejecución",
+    STATUS_TIME_LIMIT: "Tiempo límite excedido (TLE)",
+    STATUS_MEMORY_LIMIT: "Memoria límite excedida (MLE)",
+    STATUS_OUTPUT_LIMIT: "Salida límite excedida (OLE)",
+    STATUS_IDLE_LIMIT: "Esperando entrada con la entrada agotada (ILE)"
+}
+
+# Límite excedido -> estado de la ejecución
+LIMIT_STATUSES = {
+    "wall": STATUS_TIME_LIMIT,
+    "cpu": STATUS_TIME_LIMIT,
+    "memory": STATUS_MEMORY_LIMIT,
+    "output": STATUS_OUTPUT_LIMIT,
+    "stack": STATUS_MEMORY_LIMIT,
+    "file_size": STATUS_OUTPUT_LIMIT,
+    "input": STATUS_IDLE_LIMIT
+}
+
+# La advertencia de límites no soportados se muestra una sola vez
+_warned_no_prlimit = False
+
+# Sonda del sandbox compartida por todos los ejecutores (se compila con el primer uso)
+runtime_probe = RuntimeProbe()
+
+# prlimit(1) de util-linux: fija los rlimit sobre sí mismo y hace exec del programa
+PRLIMIT_TOOL = shutil.which("prlimit") if os.name == 'posix' else None
+
+# Número de la llamada read() en /proc/<pid>/syscall según la arquitectura
+READ_SYSCALLS = {"x86_64": 0, "aarch64": 63, "i686": 3, "armv7l": 3}
+# Funciones del núcleo (wchan) en las que duerme una lectura de tubería o terminal
+STDIN_WAIT_CHANNELS = ("pipe_read", "n_tty_read", "tty_read", "wait_woken")
+
+def get_execution_mode():
+    """Devuelve el modo de ejecución efectivo ("terminal", "pipe" o "pty").
+
+    En modo "auto" se usa la Terminal de macOS cuando hay una sesión gráfica
+    y, en cualquier otro caso (Linux, servidores, sesiones SSH), la
+    pseudo-terminal, que registra la transcripción sin capturas de pantalla.
+    """
+    mode = EXECUTION_CONFIG.get("mode", "auto")
+    if mode == "auto":
+        if platform.system() == "Darwin" and "SSH_CONNECTION" not in os.environ:
+            return "terminal"
+        return "pty" if os.name == 'posix' else "pipe"
+    return mode
+
+def get_limits(exercise_type=None):
+    """Devuelve los límites del sandbox para un tipo de ejercicio.
+
+    Parte de SANDBOX_CONFIG y aplica la clave "limits" del tipo en
+    EXERCISE_TYPES, si existe.
+
+    Returns:
+        dict: Límites efectivos, o None si el sandbox está desactivado
+    """
+    if not SANDBOX_CONFIG.get("enabled", True):
+        return None
+    limits = {key: value for key, value in SANDBOX_CONFIG.items() if key != "enabled"}
+    limits.update(EXERCISE_TYPES.get(exercise_type or "default", {}).get("limits", {}))
+    return limits
+
+def _rlimit_values(cpu_timeout=None, limits=None):
+    """Calcula los rlimit de una ejecución sin superar los límites duros heredados.
+
+    La memoria virtual (RLIMIT_AS) no es el límite de memoria del ejercicio,
+    sino un respaldo de memory_mb × address_space_factor: así una reserva
+    grande no falla con NULL o bad_alloc antes de poder medirla, y el límite
+    memory_mb se decide con el pico medido (ver detect_limit).
+
+    Returns:
+        list: (nombre para prlimit(1), recurso, blando, duro)
+    """
+    if resource is None:
+        return []
+    megabyte = 1024 * 1024
+    values = []
+    if cpu_timeout:
+        soft = max(1, math.ceil(cpu_timeout))
+        values.append(("cpu", resource.RLIMIT_CPU, soft, soft + 1))
+
+    limits = limits or {}
+    if limits.get("memory_mb"):
+        value = int(limits["memory_mb"] * (limits.get("address_space_factor") or 1) * megabyte)
+        values.append(("as", resource.RLIMIT_AS, value, value))
+    for key, name, kind, scale in (
+        ("max_processes", "nproc", resource.RLIMIT_NPROC, 1),
+        ("max_file_size_mb", "fsize", resource.RLIMIT_FSIZE, megabyte),
+        ("stack_mb", "stack", resource.RLIMIT_STACK, megabyte)
+    ):
+        if limits.get(key):
+            value = int(limits[key] * scale)
+            values.append((name, kind, value, value))
+
+    capped = []
+    for name, kind, soft, hard in values:
+        # Nunca subir por encima del límite duro heredado
+        _, inherited_hard = resource.getrlimit(kind)
+        if inherited_hard != resource.RLIM_INFINITY:
+            soft, hard = min(soft, inherited_hard), min(hard, inherited_hard)
+        capped.append((name, kind, soft, hard))
+    return capped
+
+def limited_command(command, cpu_timeout=None, limits=None, env=None):
+    """Prepara el lanzamiento de un programa con sus rlimit ya fijados antes del exec.
+
+    Con prlimit(1) (util-linux) el programa se lanza a través de la
+    herramienta, que fija los límites sobre sí misma y hace exec del
+    programa: no queda ningún instante sin límites y el hijo no ejecuta
+    Python entre fork y exec (preexec_fn puede bloquearse con los locks que
+    otros hilos tenían al hacer fork). Las variables de env se pasan con
+    env(1) justo antes del programa, para que un LD_PRELOAD como el de
+    alloc_tracker no se cargue en la herramienta.
+
+    Returns:
+        tuple: (argv, variables de entorno para Popen o None, True si los
+            límites quedan pendientes de aplicar tras crear el proceso)
+    """
+    values = _rlimit_values(cpu_timeout, limits) if os.name == 'posix' else []
+    if not values or not PRLIMIT_TOOL:
+        return command, env, bool(values)
+    argv = [PRLIMIT_TOOL] + [f"--{name}={soft}:{hard}" for name, _, soft, hard in values] + ["--"]
+    if env:
+        argv += ["env"] + [f"{key}={value}" for key, value in env.items()]
+    return argv + list(command), None, False
+
+def _apply_limits(pid, cpu_timeout=None, limits=None):
+    """Aplica los rlimit a un proceso ya creado, desde el padre, con prlimit.
+
+    Solo se usa si no está prlimit(1): los límites rigen desde unos
+    instantes después de crear el proceso.
+
+    Returns:
+        bool: False si la plataforma no permite fijar límites a otro proceso
+    """
+    if resource is None or not hasattr(resource, 'prlimit'):
+        return False
+    for _, kind, soft, hard in _rlimit_values(cpu_timeout, limits):
+        try:
+            resource.prlimit(pid, kind, (soft, hard))
+        except ProcessLookupError:
+            break  # El programa ya terminó
+        except (ValueError, OSError):
+            pass  # Límite no soportado en esta plataforma
+    return True
+
+def _setup_child(pid, cpu_timeout=None, limits=None, affinity=None):
+    """Fija los núcleos de un proceso recién creado y le aplica desde el padre los límites pendientes.
+
+    Los límites solo se pasan aquí cuando limited_command no pudo fijarlos
+    antes del exec (sin prlimit(1)).
+    """
+    global _warned_no_prlimit
+    if affinity:
+        try:
+            os.sched_setaffinity(pid, affinity)
+        except OSError:
+            pass  # El programa ya terminó
+    if not (cpu_timeout or limits):
+        return
+    applied = _apply_limits(pid, cpu_timeout, limits)
+    if not _warned_no_prlimit:
+        _warned_no_prlimit = True
+        if applied:
+            print("Advertencia: No se encontró prlimit (util-linux): los límites de CPU y del sandbox "
+                  "se aplican unos instantes después de iniciar cada programa")
+        else:
+            print("Advertencia: Esta plataforma no permite aplicar los límites de CPU y del sandbox "
+                  "(solo se aplica el tiempo límite de reloj)")
+
+def detect_limit(returncode, stderr, cpu_timeout=None, limits=None, max_rss_kb=None, peaks=None,
+                 stack_overflow=None):
+    """Determina qué límite del sandbox provocó el fin del programa, si alguno.
+
+    La memoria se decide con lo medido, no con lo que el programa escribió:
+    se excede si la memoria residente máxima o el pico de memoria virtual
+    (VmPeak, de la sonda o muestreado) superan memory_mb, aunque el programa
+    capture std::bad_alloc o termine con código 0. Un SIGSEGV es un
+    desbordamiento de pila si la sonda lo ubicó debajo del límite de la pila
+    o, sin sonda, si el VmStk muestreado llegó al 90 % de stack_mb.
+
+    Args:
+        peaks (dict): Máximos en kB ("VmPeak", "VmStk"; ver sample_memory)
+        stack_overflow (bool): Veredicto de la sonda sobre el SIGSEGV (None = sin sonda)
+
+    Returns:
+        str: "cpu", "memory", "stack", "file_size" o None
+    """
+    if returncode is None or os.name != 'posix':
+        return None
+    limits = limits or {}
+    peaks = peaks or {}
+    if cpu_timeout and returncode in (-signal.SIGXCPU, -signal.SIGKILL):
+        return "cpu"
+    if limits.get("max_file_size_mb") and returncode == -signal.SIGXFSZ:
+        return "file_size"
+    if limits.get("stack_mb") and returncode == -signal.SIGSEGV:
+        if stack_overflow is None:
+            stack_overflow = peaks.get("VmStk", 0) >= limits["stack_mb"] * 1024 * 0.9
+        if stack_overflow:
+            return "stack"
+    if limits.get("memory_mb"):
+        memory_kb = limits["memory_mb"] * 1024
+        if max(max_rss_kb or 0, peaks.get("VmPeak", 0)) > memory_kb:
+            return "memory"
+        if returncode != 0 and "std::bad_alloc" in (stderr or ""):
+            # Reserva mayor que el respaldo de RLIMIT_AS (memory_mb × address_space_factor):
+            # falla antes de poder medirla
+            return "memory"
+    return None
+
+def merge_probe(peaks, probe):
+    """Añade a los máximos muestreados los picos exactos del informe de la sonda."""
+    for field, key in (("VmPeak", "vm_peak_kb"), ("VmHWM", "vm_hwm_kb")):
+        if probe and probe.get(key) is not None:
+            peaks[field] = max(peaks.get(field, 0), probe[key])
+    return peaks
+
+def read_proc_status_kb(pid, field):
+    """Lee un campo en kB de /proc/<pid>/status (por ejemplo, "VmHWM"); None si no existe."""
+    try:
+        with open(f"/proc/{pid}/status", 'rb') as f:
+            for line in f:
+                if line.startswith(field.encode() + b':'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def read_proc_status_fields(pid, fields):
+    """Lee varios campos en kB de /proc/<pid>/status; devuelve {campo: kB} con los que existen."""
+    wanted = {field.encode(): field for field in fields}
+    values = {}
+    try:
+        with open(f"/proc/{pid}/status", 'rb') as f:
+            for line in f:
+                name, _, value = line.partition(b':')
+                if name in wanted:
+                    values[wanted[name]] = int(value.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+def read_proc_state(pid):
+    """Devuelve el estado del proceso según /proc/<pid>/stat ("R", "S", "D"...) o None."""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            stat = f.read()
+        # El estado va después del nombre del programa, que está entre paréntesis
+        end = stat.rindex(b')')
+        return stat[end + 2:end + 3].decode('ascii')
+    except (OSError, ValueError):
+        return None
+
+def read_proc_cpu_ticks(pid):
+    """Devuelve utime + stime del proceso (en ticks de reloj) según /proc/<pid>/stat, o None."""
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            stat = f.read()
+        # Tras el nombre: estado (campo 3), ..., utime (14) y stime (15)
+        fields = stat[stat.rindex(b')') + 2:].split()
+        return int(fields[11]) + int(fields[12])
+    except (OSError, ValueError, IndexError):
+        return None
+
+def is_blocked_on_stdin(pid):
+    """Indica si el proceso está dormido leyendo su entrada estándar.
+
+    Se combinan el estado de /proc/<pid>/stat, el canal de espera (wchan) y,
+    si está disponible, la llamada en curso de /proc/<pid>/syscall (read()
+    sobre el descriptor 0).
+
+    Returns:
+        bool: True o False, o None si no hay /proc (por ejemplo, en macOS)
+    """
+    state = read_proc_state(pid)
+    if state is None:
+        return None
+    if state != "S":
+        return False
+
+    try:
+        with open(f"/proc/{pid}/wchan") as f:
+            wchan = f.read().strip()
+        # "0" indica que el núcleo oculta el símbolo: no se puede descartar
+        if wchan not in ("", "0") and not any(channel in wchan for channel in STDIN_WAIT_CHANNELS):
+            return False
+    except OSError:
+        pass
+
+    read_syscall = READ_SYSCALLS.get(platform.machine())
+    try:
+        with open(f"/proc/{pid}/syscall") as f:
+            syscall = f.read().split()
+        if read_syscall is not None and len(syscall) > 1 and syscall[0].isdigit():
+            return int(syscall[0]) == read_syscall and int(syscall[1], 16) == 0
+    except (OSError, ValueError):
+        pass
+    return True
+
+class InputWaitDetector:
+    """Detecta un programa que espera indefinidamente una entrada agotada.
+
+    El programa se considera bloqueado si is_blocked_on_stdin lo confirma y su
+    tiempo de CPU no avanza durante EXECUTION_CONFIG['input_wait_grace'] s.
+    """
+
+    def __init__(self, grace=None):
+        self.grace = EXECUTION_CONFIG["input_wait_grace"] if grace is None else grace
+        self.blocked_since = None
+        self.cpu_ticks = None
+
+    def reset(self):
+        """Olvida el bloqueo observado (por ejemplo, porque el programa escribió algo)."""
+        self.blocked_since = None
+
+    def check(self, pid, now):
+        """Devuelve True cuando el programa lleva el periodo de gracia esperando entrada."""
+        blocked = bool(is_blocked_on_stdin(pid))
+        cpu_ticks = read_proc_cpu_ticks(pid)
+        if not blocked or self.blocked_since is None or cpu_ticks != self.cpu_ticks:
+            self.blocked_since = now if blocked else None
+            self.cpu_ticks = cpu_ticks
+            return False
+        return now - self.blocked_since >= self.grace
+
+def describe_signal(returncode):
+    """Devuelve el nombre de la señal que terminó al proceso (por ejemplo, "SIGSEGV") o None."""
+    if returncode is None or returncode >= 0:
+        return None
+    try:
+        return signal.Signals(-returncode).name
+    except ValueError:
+        return f"señal {-returncode}"
+
+def resource_summary(wall_time, rusage=None, returncode=None, sampled_rss_kb=None, inherited_rss_kb=None):
+    """Construye el diccionario de recursos consumidos por una ejecución.
+
+    El ru_maxrss del hijo incluye la memoria que heredó de este proceso al
+    hacer fork, así que solo se usa cuando la supera; en otro caso se usa el
+    máximo de VmHWM muestreado después del exec.
+
+    Args:
+        wall_time (float): Tiempo de reloj en segundos
+        rusage: Resultado de os.wait4 / resource.getrusage del hijo (None si no está disponible)
+        returncode (int): Código de salida (negativo si terminó por una señal)
+        sampled_rss_kb (int): Máximo de VmHWM leído de /proc durante la ejecución
+        inherited_rss_kb (int): Memoria residente de este proceso al lanzar al hijo
+
+    Returns:
+        dict: wall_time, user_time, sys_time, max_rss_kb y exit_signal
+    """
+    resources = {
+        "wall_time": wall_time,
+        "user_time": None,
+        "sys_time": None,
+        "max_rss_kb": None,
+        "exit_signal": describe_signal(returncode)
+    }
+    if rusage is not None:
+        resources["user_time"] = rusage.ru_utime
+        resources["sys_time"] = rusage.ru_stime
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        max_rss = rusage.ru_maxrss
+        resources["max_rss_kb"] = max_rss // 1024 if platform.system() == "Darwin" else max_rss
+    if inherited_rss_kb is not None and resources["max_rss_kb"] is not None:
+        if resources["max_rss_kb"] <= inherited_rss_kb:
+            # Sin muestra válida el valor no es confiable: se informa como desconocido
+            resources["max_rss_kb"] = sampled_rss_kb
+        elif sampled_rss_kb is not None:
+            resources["max_rss_kb"] = max(resources["max_rss_kb"], sampled_rss_kb)
+    return resources
+
+def format_resources(resources):
+    """Resume los recursos en una línea para la consola y el informe."""
+    parts = [f"reloj {resources['wall_time']:.3f} s"]
+    if resources.get("user_time") is not None:
+        parts.append(f"CPU usuario {resources['user_time']:.3f} s")
+        parts.append(f"CPU sistema {resources['sys_time']:.3f} s")
+    if resources.get("max_rss_kb") is not None:
+        parts.append(f"memoria máxima {resources['max_rss_kb'] / 1024:.1f} MB")
+    if resources.get("exit_signal"):
+        parts.append(f"señal {resources['exit_signal']}")
+    return ", ".join(parts)
+
+def describe_limit(limit_exceeded, timeout=None, cpu_timeout=None, limits=None):
+    """Describe el límite excedido, por ejemplo "10 s de reloj" o "512 MB de memoria"."""
+    limits = limits or {}
+    descriptions = {
+        "wall": f"{timeout} s de reloj",
+        "cpu": f"{cpu_timeout} s de CPU",
+        "memory": f"{limits.get('memory_mb')} MB de memoria",
+        "output": f"{limits.get('max_output_mb')} MB de salida",
+        "stack": f"{limits.get('stack_mb')} MB de pila",
+        "file_size": f"{limits.get('max_file_size_mb')} MB por archivo escrito",
+        "input": f"{EXECUTION_CONFIG['input_wait_grace']} s bloqueado leyendo la entrada agotada"
+    }
+    return descriptions.get(limit_exceeded, limit_exceeded)
+
+def kill_process_group(process):
+    """Termina el proceso y todos los procesos de su grupo."""
+    if os.name == 'posix':
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    elif process.poll() is None:
+        process.kill()
+
+class ProgramExecutor:
+    """Ejecuta un programa compilado directamente con subprocess y captura su salida."""
+
+    def __init__(self, verbose=True):
+        """Inicializa el ejecutor.
+
+        Args:
+            verbose (bool): Mostrar en consola el inicio y el resumen de cada ejecución
+                (se desactiva al ejecutar muchos casos en paralelo)
+        """
+        self.verbose = verbose
+
+    def log(self, message):
+        """Muestra un mensaje si el ejecutor está en modo detallado."""
+        if self.verbose:
+            print(message)
+
+    def run(self, executable, stdin_data=None, args=None, timeout=None, cpu_timeout=None, limits=None,
+            affinity=None, env=None):
+        """Ejecuta el programa y devuelve el mismo diccionario que execute_program.
+
+        Args:
+            executable (str): Ruta del ejecutable
+            stdin_data (str): Texto que se enviará por la entrada estándar
+            args (list): Argumentos de línea de comandos
+            timeout (float): Límite de tiempo de reloj en segundos (None = sin límite)
+            cpu_timeout (float): Límite de tiempo de CPU en segundos (None = sin límite)
+            limits (dict): Límites del sandbox (ver get_limits; None = sin rlimit adicionales)
+            affinity (set): Núcleos en los que puede ejecutarse el programa (solo Linux)
+            env (dict): Variables de entorno adicionales (por ejemplo, LD_PRELOAD)
+
+        Returns:
+            dict: Resultado de la ejecución
+        """
+        basename = os.path.basename(executable)
+        try:
+            self.log(f"\n{'='*50}")
+            self.log(f"Ejecutando (sin terminal): {basename}")
+            self.log(f"{'='*50}\n")
+
+            popen_kwargs = {}
+            if os.name == 'posix':
+                # Grupo de procesos propio para poder terminar también a los hijos
+                popen_kwargs["start_new_session"] = True
+
+            program_env, probe_path = self.prepare_probe(executable, limits, env)
+            command, program_env, limits_pending = limited_command(
+                [executable] + list(args or []), cpu_timeout, limits, program_env
+            )
+            inherited_rss_kb = read_proc_status_kb("self", "VmRSS")
+            start_time = time.perf_counter()
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE if stdin_data is not None else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                env=dict(os.environ, **program_env) if program_env else None,
+                **popen_kwargs
+            )
+            if os.name == 'posix' and (limits_pending or affinity):
+                _setup_child(process.pid, *((cpu_timeout, limits) if limits_pending else (None, None)), affinity)
+
+            # Leer stdout y stderr en hilos con captura acotada
+            captures = {
+                "stdout": self.create_capture(basename, process.pid, "stdout"),
+                "stderr": self.create_capture(basename, process.pid, "stderr")
+            }
+            threads = [
+                threading.Thread(target=captures["stdout"].drain, args=(process.stdout,), daemon=True),
+                threading.Thread(target=captures["stderr"].drain, args=(process.stderr,), daemon=True)
+            ]
+            if stdin_data is not None:
+                threads.append(threading.Thread(
+                    target=self.feed_stdin, args=(process.stdin, stdin_data), daemon=True
+                ))
+            for thread in threads:
+                thread.start()
+
+            limit_exceeded = None
+            rusage = None
+            peaks = {}
+            try:
+                if hasattr(os, 'wait4'):
+                    max_output = (limits or {}).get("max_output_mb")
+                    limit_exceeded, rusage, peaks = self.wait_with_rusage(
+                        process, executable, start_time, timeout,
+                        captures=captures.values(),
+                        max_output_bytes=int(max_output * 1024 * 1024) if max_output else None,
+                        limits=limits
+                    )
+                else:
+                    try:
+                        process.wait(timeout=timeout)
+                    except subprocess.TimeoutExpired:
+                        limit_exceeded = "wall"
+                        kill_process_group(process)
+                        process.wait()
+            finally:
+                # Terminar procesos huérfanos que hayan quedado en el grupo
+                kill_process_group(process)
+            wall_time = time.perf_counter() - start_time
+
+            for thread in threads:
+                thread.join(timeout=1)
+            for stream in (process.stdout, process.stderr):
+                stream.close()
+
+            returncode = process.returncode
+            probe = runtime_probe.read(probe_path)
+            merge_probe(peaks, probe)
+            resources = resource_summary(wall_time, rusage, returncode, peaks.get("VmHWM"), inherited_rss_kb)
+            if limit_exceeded is None:
+                limit_exceeded = detect_limit(
+                    returncode, captures["stderr"].text(), cpu_timeout, limits, resources["max_rss_kb"], peaks,
+                    probe["stack_overflow"] if probe else None
+                )
+
+            if limit_exceeded:
+                status = LIMIT_STATUSES[limit_exceeded]
+                message = f"{STATUS_DESCRIPTIONS[status]}: {describe_limit(limit_exceeded, timeout, cpu_timeout, limits)}."
+                if limit_exceeded in ("wall", "output"):
+                    message += " Se terminó el grupo de procesos."
+                self.log(message)
+            else:
+                status = STATUS_OK if returncode == 0 else STATUS_RUNTIME_ERROR
+                self.log(f"Programa finalizado con código {returncode} en {wall_time:.3f} s")
+            self.log(f"Recursos: {format_resources(resources)}")
+
+            return {
+                "success": status == STATUS_OK,
+                "status": status,
+                "limit_exceeded": limit_exceeded,
+                **captures["stdout"].summary("stdout"),
+                **captures["stderr"].summary("stderr"),
+                "returncode": returncode,
+                "screenshot": None,
+                "execution_time": wall_time,
+                "resources": resources
+            }
+
+        except Exception as e:
+            print(f"Error durante la ejecución: {e}")
+            traceback.print_exc()
+            return {
+                "success": False,
+                "status": STATUS_RUNTIME_ERROR,
+                "error": str(e),
+                "screenshot": None
+            }
+
+    def prepare_probe(self, executable, limits, env=None):
+        """Añade la sonda del sandbox a env si hay límites de memoria o de pila.
+
+        Returns:
+            tuple: (variables de entorno, ruta del informe de la sonda o None)
+        """
+        if os.name != 'posix' or not limits or not (limits.get("memory_mb") or limits.get("stack_mb")):
+            return env, None
+        return runtime_probe.prepare(executable, env)
+
+    def wait_with_rusage(self, process, executable, start_time, timeout=None, captures=(), max_output_bytes=None,
+                         limits=None):
+        """Espera al proceso con os.wait4 para obtener los recursos que consumió.
+
+        Sondea con WNOHANG (con espera creciente hasta 50 ms) para poder aplicar
+        los límites de reloj, de salida y de memoria y muestrear la memoria
+        del programa; al excederse un límite, termina el grupo y recoge al
+        hijo. Donde existe pidfd_open (Linux 5.3+), la espera termina en
+        cuanto el hijo sale, de modo que el tiempo de reloj no depende del
+        intervalo de sondeo.
+
+        Returns:
+            tuple: ("wall", "output", "memory" o None según el límite excedido,
+                rusage del hijo, máximos muestreados de sample_memory)
+        """
+        limit_exceeded = None
+        peaks = {}
+        memory_kb = (limits or {}).get("memory_mb", 0) * 1024
+        executable = os.path.realpath(executable)
+        deadline = start_time + timeout if timeout else None
+        delay = 0.001
+        pidfd = None
+        if hasattr(os, 'pidfd_open'):
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pass
+        try:
+            while True:
+                pid, wait_status, rusage = os.wait4(process.pid, os.WNOHANG)
+                if pid:
+                    break
+
+                self.sample_memory(process.pid, executable, peaks)
+
+                if deadline is not None and time.perf_counter() >= deadline:
+                    limit_exceeded = "wall"
+                elif max_output_bytes and sum(capture.total_bytes for capture in captures) > max_output_bytes:
+                    limit_exceeded = "output"
+                elif memory_kb and peaks.get("VmPeak", 0) > memory_kb:
+                    limit_exceeded = "memory"
+                if limit_exceeded:
+                    kill_process_group(process)
+                    pid, wait_status, rusage = os.wait4(process.pid, 0)
+                    break
+                if pidfd is not None:
+                    select.select([pidfd], [], [], delay)
+                else:
+                    time.sleep(delay)
+                delay = min(delay * 2, 0.05)
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
+
+        # El hijo ya fue recogido: Popen no debe volver a esperarlo
+        process.returncode = os.waitstatus_to_exitcode(wait_status)
+        return limit_exceeded, rusage, peaks
+
+    def sample_memory(self, pid, real_executable, peaks):
+        """Actualiza en peaks los máximos de VmHWM, VmPeak y VmStk (kB) del programa.
+
+        Solo cuenta la memoria del programa, no la del fork previo al exec ni
+        la de prlimit(1) o env(1) antes de que hagan exec del programa.
+        """
+        try:
+            if os.readlink(f"/proc/{pid}/exe") == real_executable:
+                for field, value in read_proc_status_fields(pid, ("VmHWM", "VmPeak", "VmStk")).items():
+                    peaks[field] = max(peaks.get(field, 0), value)
+        except OSError:
+            pass
+        return peaks
+
+    def create_capture(self, basename, pid, stream_name):
+        """Crea la captura acotada de un flujo según EXECUTION_CONFIG."""
+        spill_path = None
+        if EXECUTION_CONFIG["spill_output"]:
+            os.makedirs(TEMP_DIR, exist_ok=True)
+            spill_path = os.path.join(TEMP_DIR, f"{basename}_{pid}_{stream_name}.txt.gz")
+        return OutputCapture(
+            EXECUTION_CONFIG["capture_head_bytes"],
+            EXECUTION_CONFIG["capture_tail_bytes"],
+            spill_path
+        )
+
+    def feed_stdin(self, stdin, data):
+        """Escribe la entrada del programa y cierra la tubería."""
+        try:
+            stdin.write(data.encode('utf-8') if isinstance(data, str) else data)
+        except (BrokenPipeError, OSError):
+            # El programa terminó sin leer toda la entrada
+            pass
+        finally:
+            try:
+                stdin.close()
+            except OSError:
+                pass
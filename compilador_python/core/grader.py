@@ -0,0 +1,288 @@
+"""
+Módulo para calificar programas C++ con casos de prueba (.in/.out).
+"""
+
+import os
+import gzip
+import glob
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import GRADING_CONFIG
+from core.executor import ProgramExecutor, get_limits, STATUS_OK, STATUS_TIME_LIMIT, STATUS_MEMORY_LIMIT, STATUS_OUTPUT_LIMIT
+
+# Veredictos de cada caso
+VERDICT_ACCEPTED = "AC"
+VERDICT_WRONG_ANSWER = "WA"
+VERDICT_TIME_LIMIT = "TLE"
+VERDICT_RUNTIME_ERROR = "RE"
+VERDICT_COMPILE_ERROR = "CE"
+VERDICT_MEMORY_LIMIT = "MLE"
+VERDICT_OUTPUT_LIMIT = "OLE"
+
+VERDICT_DESCRIPTIONS = {
+    VERDICT_ACCEPTED: "Respuesta correcta",
+    VERDICT_WRONG_ANSWER: "Respuesta incorrecta",
+    VERDICT_TIME_LIMIT: "Tiempo límite excedido",
+    VERDICT_RUNTIME_ERROR: "Error en ejecución",
+    VERDICT_COMPILE_ERROR: "Error de compilación",
+    VERDICT_MEMORY_LIMIT: "Memoria límite excedida",
+    VERDICT_OUTPUT_LIMIT: "Salida límite excedida"
+}
+
+# Estados del ejecutor que se informan como veredicto propio
+STATUS_VERDICTS = {
+    STATUS_TIME_LIMIT: VERDICT_TIME_LIMIT,
+    STATUS_MEMORY_LIMIT: VERDICT_MEMORY_LIMIT,
+    STATUS_OUTPUT_LIMIT: VERDICT_OUTPUT_LIMIT
+}
+
+def compare_output(expected, actual):
+    """Compara dos salidas ignorando diferencias de espacios en blanco.
+
+    Se consideran iguales si contienen las mismas palabras en el mismo orden,
+    sin importar espacios, tabulaciones, saltos de línea o '\\r'.
+
+    Returns:
+        tuple: (True si coinciden, descripción de la primera diferencia o None)
+    """
+    if expected == actual:
+        return True, None
+
+    expected_tokens = expected.split()
+    actual_tokens = actual.split()
+    if expected_tokens == actual_tokens:
+        return True, None
+
+    for index, (expected_token, actual_token) in enumerate(zip(expected_tokens, actual_tokens)):
+        if expected_token != actual_token:
+            return False, f"Palabra {index + 1}: se esperaba '{expected_token}' y se obtuvo '{actual_token}'"
+
+    if len(actual_tokens) < len(expected_tokens):
+        return False, f"Salida incompleta: se esperaban {len(expected_tokens)} palabras y se obtuvieron {len(actual_tokens)}"
+    return False, f"Salida con texto de más: se esperaban {len(expected_tokens)} palabras y se obtuvieron {len(actual_tokens)}"
+
+class Grader:
+    """Ejecuta los casos de prueba de cada programa en paralelo y asigna veredictos."""
+
+    def __init__(self, compiler, cases_root=None, jobs=None):
+        """Inicializa el calificador.
+
+        Args:
+            compiler (CppCompiler): Compilador usado para compilar y documentar
+            cases_root (str): Carpeta con una subcarpeta de casos por programa
+                (por defecto, GRADING_CONFIG['cases_dir'])
+            jobs (int): Casos ejecutados simultáneamente (por defecto, GRADING_CONFIG['jobs'])
+        """
+        self.compiler = compiler
+        self.cases_root = cases_root or GRADING_CONFIG['cases_dir']
+        self.jobs = max(1, int(jobs or GRADING_CONFIG['jobs'] or 1))
+        self.executor = ProgramExecutor(verbose=False)
+
+    def find_cases_dir(self, filepath):
+        """Busca la carpeta de casos de un programa.
+
+        Se prueba, en orden, <cases_root>/<nombre>/ y casos/<nombre>/ junto al
+        archivo fuente. Las carpetas como examen-1/pregunta-1/ no se usan porque
+        ahí se guardan los ejecutables.
+
+        Returns:
+            str: Ruta de la carpeta o None si no hay casos
+        """
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        candidates = [
+            os.path.join(self.cases_root, name),
+            os.path.join(os.path.dirname(os.path.abspath(filepath)), "casos", name)
+        ]
+        for candidate in candidates:
+            if os.path.isdir(candidate):
+                return candidate
+        return None
+
+    def find_cases(self, filepath):
+        """Devuelve los pares (nombre, ruta .in, ruta .out) de un programa, ordenados."""
+        cases_dir = self.find_cases_dir(filepath)
+        if cases_dir is None:
+            return []
+
+        cases = []
+        for input_path in sorted(glob.glob(os.path.join(cases_dir, "*.in"))):
+            output_path = os.path.splitext(input_path)[0] + ".out"
+            if os.path.exists(output_path):
+                name = os.path.splitext(os.path.basename(input_path))[0]
+                cases.append((name, input_path, output_path))
+            else:
+                print(f"Advertencia: {os.path.basename(input_path)} no tiene su archivo .out")
+        return cases
+
+    def run_case(self, executable, case, exercise_type=None):
+        """Ejecuta un caso (o recupera su ejecución de la caché) y devuelve su veredicto.
+
+        Returns:
+            dict: case, verdict, detail, execution_time y resources
+        """
+        name, input_path, output_path = case
+        try:
+            with open(input_path, 'rb') as f:
+                stdin_data = f.read()
+            with open(output_path, 'r', encoding='utf-8', errors='replace') as f:
+                expected = f.read()
+
+            run_cache = self.compiler.run_cache
+            run_key = None
+            result = None
+            if run_cache:
+                # La clave describe la ejecución de self.executor: modo pipe, sin el shim de memoria
+                run_limits = self.compiler.get_run_limits(exercise_type, mode="pipe", alloc_tracking=False)
+                run_key = run_cache.make_key(executable, stdin_data, limits=run_limits)
+                result = run_cache.get(run_key)
+
+            if result is None:
+                result = self.executor.run(
+                    executable,
+                    stdin_data=stdin_data,
+                    timeout=self.compiler.timeout,
+                    cpu_timeout=self.compiler.cpu_timeout,
+                    limits=get_limits(exercise_type)
+                )
+                if run_key:
+                    run_cache.put(run_key, result)
+
+            status = result.get("status")
+            detail = None
+            if status in STATUS_VERDICTS:
+                verdict = STATUS_VERDICTS[status]
+            elif status != STATUS_OK:
+                verdict = VERDICT_RUNTIME_ERROR
+                detail = result.get("error") or f"Código de salida {result.get('returncode')}"
+            else:
+                matches, detail = compare_output(expected, self.full_stdout(result))
+                verdict = VERDICT_ACCEPTED if matches else VERDICT_WRONG_ANSWER
+
+            return {
+                "case": name,
+                "verdict": verdict,
+                "detail": detail,
+                "execution_time": result.get("execution_time"),
+                "resources": result.get("resources")
+            }
+
+        except Exception as e:
+            print(f"Error al ejecutar el caso {name}: {e}")
+            traceback.print_exc()
+            return {
+                "case": name,
+                "verdict": VERDICT_RUNTIME_ERROR,
+                "detail": str(e),
+                "execution_time": None,
+                "resources": None
+            }
+
+    def full_stdout(self, result):
+        """Devuelve la salida completa, leyendo el volcado comprimido si se truncó."""
+        if result.get("stdout_truncated") and result.get("stdout_spill"):
+            with gzip.open(result["stdout_spill"], 'rt', encoding='utf-8', errors='replace') as f:
+                return f.read()
+        return result.get("stdout", "")
+
+    def grade_file(self, filepath, compile_result=None):
+        """Califica un programa con todos sus casos.
+
+        Args:
+            filepath (str): Ruta del archivo .cpp
+            compile_result (dict): Resultado de una compilación previa (opcional)
+
+        Returns:
+            dict: Resultado con el formato de build_result
+        """
+        if compile_result is None:
+            compile_result = self.compiler.compile_file(filepath)
+        return self.grade_batch([filepath], {filepath: compile_result})[0]
+
+    def grade_batch(self, files, compile_results=None):
+        """Compila en paralelo y califica todos los programas.
+
+        Los casos de todos los programas se reparten en un único grupo de
+        hilos, de modo que los núcleos se aprovechan aunque cada programa
+        tenga pocos casos.
+
+        Args:
+            files (list): Rutas de los archivos .cpp
+            compile_results (dict): {ruta: resultado de compilación} ya disponibles (opcional)
+
+        Returns:
+            list: Resultados de build_result en el orden de los archivos
+        """
+        files = list(dict.fromkeys(files))
+        compile_results = dict(compile_results or {})
+        pending = [filepath for filepath in files if filepath not in compile_results]
+        compile_results.update(self.compiler.compile_batch(pending))
+
+        start_time = time.perf_counter()
+        cases = {filepath: self.find_cases(filepath) for filepath in files}
+        for filepath in files:
+            if not cases[filepath]:
+                print(f"Advertencia: No hay casos de prueba para {os.path.basename(filepath)}")
+
+        # Los límites del sandbox dependen del tipo de ejercicio de cada programa
+        exercise_types = {
+            filepath: self.compiler.analyzer.analyze_file(filepath).get("type")
+            for filepath in files if cases[filepath]
+        }
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            futures = {
+                filepath: [pool.submit(self.run_case, compile_results[filepath]["executable"], case, exercise_types[filepath])
+                           for case in cases[filepath]]
+                for filepath in files if compile_results[filepath]["success"]
+            }
+            results = []
+            for filepath in files:
+                if filepath in futures:
+                    verdicts = [future.result() for future in futures[filepath]]
+                else:
+                    verdicts = self.compile_error_verdicts(compile_results[filepath], cases[filepath])
+                result = self.build_result(filepath, compile_results[filepath], verdicts)
+                self.compiler.pdf.add_grading(result)
+                results.append(result)
+
+        total = sum(len(result["verdicts"]) for result in results)
+        print(f"\nSe calificaron {len(results)} programas ({total} casos) en {time.perf_counter() - start_time:.2f} s")
+        return results
+
+    def compile_error_verdicts(self, compile_result, cases):
+        """Asigna CE a todos los casos de un programa que no compiló."""
+        # La primera línea con "error" es la más útil para el informe
+        lines = (compile_result.get("stderr") or compile_result.get("error") or "").strip().splitlines()
+        detail = next((line for line in lines if "error" in line.lower()), lines[0] if lines else None)
+        return [
+            {"case": case_name, "verdict": VERDICT_COMPILE_ERROR, "detail": detail,
+             "execution_time": None, "resources": None}
+            for case_name, _, _ in cases
+        ] or [{"case": "-", "verdict": VERDICT_COMPILE_ERROR, "detail": detail,
+               "execution_time": None, "resources": None}]
+
+    def build_result(self, filepath, compile_result, verdicts):
+        """Reúne los veredictos de un programa y muestra su resumen en consola.
+
+        Returns:
+            dict: name, file, compiled, verdicts (uno por caso), summary {veredicto: cantidad} y score
+        """
+        name = os.path.splitext(os.path.basename(filepath))[0]
+        summary = {}
+        for verdict in verdicts:
+            summary[verdict["verdict"]] = summary.get(verdict["verdict"], 0) + 1
+        accepted = summary.get(VERDICT_ACCEPTED, 0)
+
+        print(f"{name}: {accepted}/{len(verdicts)} casos correctos "
+              f"({', '.join(f'{v} {c}' for v, c in sorted(summary.items()))})")
+
+        return {
+            "name": name,
+            "file": filepath,
+            "compiled": compile_result["success"],
+            "verdicts": verdicts,
+            "summary": summary,
+            "score": accepted / len(verdicts) if verdicts else 0.0
+        }
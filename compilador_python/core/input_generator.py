@@ -0,0 +1,243 @@
+"""
+Módulo para generar automáticamente la entrada estándar de los programas C++.
+"""
+
+import re
+import random
+
+from config.settings import INPUT_CONFIG
+
+class InputGenerator:
+    """Genera un guion de entrada plausible a partir de las lecturas de cin del programa.
+
+    Reconoce contadores (n, cantidad, filas...), lecturas de elementos de
+    arreglos y matrices dentro de ciclos, cadenas leídas con getline y menús
+    basados en switch, y produce un valor por línea en el orden del código.
+    """
+
+    # Declaraciones: tipo seguido de una lista de declaradores
+    DECLARATION_PATTERN = re.compile(
+        r'\b((?:(?:unsigned|signed|long|short|const)\s+)*'
+        r'(?:int|long|short|float|double|char|string|bool|std::string))\s+([^;(){}]+);'
+    )
+    DECLARATOR_PATTERN = re.compile(r'\**\s*(\w+)\s*((?:\[[^\]]*\])*)')
+    # Destino de una lectura: variable, elemento (v[i], m[i][j], a[i].campo) o *(p + i)
+    TARGET = (r'(?:\*\s*\(\s*\w+\s*\+\s*\w+\s*\)'
+              r'|[\w.]+(?:\[[^\]]*\])*(?:(?:\.|->)\w+(?:\[[^\]]*\])*)*)')
+    POINTER_PATTERN = re.compile(r'\*\s*\(\s*(\w+)\s*\+')
+    CIN_PATTERN = re.compile(r'(?:std::)?\bcin((?:\s*>>\s*' + TARGET + r')+)')
+    GETLINE_PATTERN = re.compile(r'(?:std::)?getline\s*\(\s*(?:std::)?cin\s*,\s*([^,)]+)|(?:std::)?cin\s*\.\s*getline\s*\(\s*([^,)]+)')
+    SCANF_PATTERN = re.compile(r'scanf\s*\(\s*"([^"]*)"')
+    CASE_PATTERN = re.compile(r'\bcase\s+(-?\d+)\s*:')
+    EXIT_PATTERN = re.compile(r'while\s*\(\s*(\w+)\s*!=\s*(-?\d+)\s*\)')
+
+    COUNT_NAMES = re.compile(
+        r'^(n|m|k|t|num_?elementos|cant\w*|tam\w*|size|len\w*|longitud|total|'
+        r'filas?|columnas?|rows?|cols?|columns?|limite|dim\w*|elementos)$',
+        re.IGNORECASE
+    )
+    MENU_NAMES = re.compile(r'opci[oó]n|^opc$|menu|choice|option|selecci[oó]n|elecci[oó]n', re.IGNORECASE)
+    CONFIRM_NAMES = re.compile(r'^(resp\w*|continuar|seguir|otra\w*|repetir|confirm\w*)$', re.IGNORECASE)
+    ROW_NAMES = re.compile(r'^(filas?|rows?|m)$', re.IGNORECASE)
+    COLUMN_NAMES = re.compile(r'^(columnas?|cols?|columns?)$', re.IGNORECASE)
+
+    WORDS = ["Ana", "Luis", "Maria", "Carlos", "Sofia", "Pedro", "Lucia", "Jorge", "Elena", "Diego"]
+    LINES = ["Ana Perez", "Luis Gomez", "hola mundo", "Maria Lopez", "programacion en C",
+             "Carlos Diaz", "reconocer patrones", "Sofia Martinez"]
+
+    def __init__(self, seed=None):
+        """Inicializa el generador.
+
+        Args:
+            seed (int): Semilla para obtener siempre la misma entrada (por defecto, INPUT_CONFIG['seed'])
+        """
+        self.seed = INPUT_CONFIG['seed'] if seed is None else seed
+
+    def find_declarations(self, code):
+        """Devuelve {nombre: (tipo, dimensiones)} para las variables declaradas."""
+        declarations = {}
+        for match in self.DECLARATION_PATTERN.finditer(code):
+            var_type = match.group(1).split()[-1].replace('std::', '')
+            for declarator in match.group(2).split(','):
+                declarator = declarator.split('=')[0]
+                decl_match = self.DECLARATOR_PATTERN.match(declarator.strip())
+                if decl_match and decl_match.group(1) not in declarations:
+                    dims = re.findall(r'\[([^\]]*)\]', decl_match.group(2))
+                    declarations[decl_match.group(1)] = (var_type, dims)
+        return declarations
+
+    def find_reads(self, code):
+        """Extrae las lecturas de entrada en el orden en que aparecen en el código.
+
+        Returns:
+            list: Diccionarios con name, type, kind ("value" o "line"), indices y position
+        """
+        declarations = self.find_declarations(code)
+        reads = []
+
+        def add_read(target, position, kind):
+            target = target.strip().lstrip('&')
+            indices = target.count('[')
+            pointer_match = self.POINTER_PATTERN.match(target)
+            if pointer_match:
+                target, indices = pointer_match.group(1), 1  # *(arreglo + i) equivale a arreglo[i]
+            # En "alumnos[i].nombre" interesa el campo; en "numeros[i]", la variable
+            base = re.sub(r'\[[^\]]*\]', '', target)
+            name = base.split('.')[-1].split('->')[-1].strip()
+            var_type, dims = declarations.get(name, ("int", []))
+            if kind == "value" and var_type == "char" and dims:
+                var_type = "string"  # char nombre[50] leído con >>
+            reads.append({
+                "name": name,
+                "type": "string" if kind == "line" else var_type,
+                "kind": kind,
+                "indices": indices,
+                "dims": dims,
+                "position": position
+            })
+
+        for match in self.CIN_PATTERN.finditer(code):
+            for offset, target in enumerate(match.group(1).split('>>')[1:]):
+                if target.strip():
+                    add_read(target, match.start() + offset, "value")
+
+        for match in self.GETLINE_PATTERN.finditer(code):
+            add_read(match.group(1) or match.group(2), match.start(), "line")
+
+        for match in self.SCANF_PATTERN.finditer(code):
+            for offset, spec in enumerate(re.findall(r'%l?([dificsu])', match.group(1))):
+                spec_type = {"d": "int", "i": "int", "u": "int", "f": "double", "c": "char", "s": "string"}[spec]
+                reads.append({"name": f"scanf_{offset}", "type": spec_type, "kind": "value",
+                              "indices": 0, "dims": [], "position": match.start() + offset})
+
+        reads.sort(key=lambda read: read["position"])
+        return reads
+
+    def find_menu(self, code, menu_name):
+        """Determina las opciones de un menú y el valor que lo termina.
+
+        Returns:
+            tuple: (lista de (opción, inicio, fin) de cada case, opción de salida)
+        """
+        cases = []
+        matches = list(self.CASE_PATTERN.finditer(code))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(code)
+            cases.append((int(match.group(1)), match.end(), end))
+
+        exit_option = None
+        for match in self.EXIT_PATTERN.finditer(code):
+            if match.group(1) == menu_name:
+                exit_option = int(match.group(2))
+        if exit_option is None:
+            for option, start, end in cases:
+                if re.search(r'salir|exit|terminar|fin\b', code[start:end], re.IGNORECASE):
+                    exit_option = option
+        if exit_option is None:
+            exit_option = 0
+
+        return cases, exit_option
+
+    def generate(self, code, analysis=None, size=None):
+        """Genera el texto de la entrada estándar.
+
+        Args:
+            code (str): Código fuente del programa
+            analysis (dict): Resultado de CppAnalyzer.analyze_code (opcional)
+            size (int): Tamaño forzado para los contadores (por ejemplo, en barridos de tamaños)
+
+        Returns:
+            str: Una línea por valor leído, o "" si el programa no lee nada
+        """
+        rng = random.Random(self.seed)
+        reads = self.find_reads(code)
+
+        if not reads and analysis:
+            # Recurrir a los tipos detectados por el analizador
+            reads = [{"name": "", "type": input_type, "kind": "value", "indices": 0, "dims": [], "position": i}
+                     for i, input_type in enumerate(analysis.get("input_types", []))]
+
+        if size is not None and reads and not any(self.COUNT_NAMES.match(r["name"]) for r in reads):
+            # Sin contador explícito, la primera lectura entera determina el tamaño
+            for read in reads:
+                if read["type"] in ("int", "long", "short") and not read["indices"]:
+                    read["count"] = True
+                    break
+
+        counts = {}
+        lines = []
+
+        def count_value():
+            if size is not None:
+                return size
+            return rng.randint(*INPUT_CONFIG['count_range'])
+
+        def dimension(read, axis):
+            # Sin contador leído, se usa el tamaño literal de la declaración (int v[30])
+            dims = read["dims"]
+            if size is None and not counts and axis < len(dims) and dims[axis].strip().isdigit():
+                return int(dims[axis])
+            return list(counts.values())[-1] if counts else count_value()
+
+        def emit(read):
+            name = read["name"]
+            if read["indices"]:
+                if read["indices"] >= 2:
+                    rows = next((v for k, v in counts.items() if self.ROW_NAMES.match(k)), None)
+                    cols = next((v for k, v in counts.items() if self.COLUMN_NAMES.match(k)), None)
+                    repeat = (rows or dimension(read, 0)) * (cols or rows or dimension(read, 1))
+                else:
+                    repeat = dimension(read, 0)
+                if read["type"] in ("int", "long", "short", "float", "double"):
+                    # Arreglos estrictamente crecientes: satisfacen las validaciones de "ordenado"
+                    value = rng.randint(*INPUT_CONFIG['value_range'])
+                    for _ in range(repeat):
+                        lines.append(str(value))
+                        value += rng.randint(1, 5)
+                else:
+                    lines.extend(self.random_value(read, rng) for _ in range(repeat))
+            elif read.get("count") or (self.COUNT_NAMES.match(name) and read["type"] in ("int", "long", "short")):
+                counts[name] = count_value()
+                lines.append(str(counts[name]))
+            else:
+                lines.append(self.random_value(read, rng))
+
+        menu = next((r for r in reads if self.MENU_NAMES.search(r["name"]) and r["type"] in ("int", "char")), None)
+        if menu is None:
+            for read in reads:
+                emit(read)
+        else:
+            cases, exit_option = self.find_menu(code, menu["name"])
+            for read in reads:
+                if read["position"] < menu["position"]:
+                    emit(read)
+
+            # Recorrer cada opción del menú una vez y después salir
+            for option, start, end in cases:
+                if option == exit_option:
+                    continue
+                lines.append(str(option))
+                for read in reads:
+                    if start <= read["position"] < end and read is not menu:
+                        emit(read)
+            lines.append(str(exit_option))
+
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def random_value(self, read, rng):
+        """Genera un valor aleatorio según el tipo de la lectura."""
+        var_type = read["type"]
+        if read["kind"] == "line":
+            return rng.choice(self.LINES)
+        if var_type in ("float", "double"):
+            low, high = INPUT_CONFIG['value_range']
+            return f"{rng.uniform(low, high):.2f}"
+        if var_type == "char":
+            if self.CONFIRM_NAMES.match(read["name"]):
+                return "n"  # Responder "no" a las preguntas de "¿desea continuar?"
+            return rng.choice("abcdefghijklmnopqrstuvwxyz")
+        if var_type == "string":
+            return rng.choice(self.WORDS)
+        if var_type == "bool":
+            return str(rng.randint(0, 1))
+        return str(rng.randint(*INPUT_CONFIG['value_range']))
@@ -0,0 +1,212 @@
+"""
+Módulo con el analizador léxico de C++ compartido por el analizador y el generador de PDF.
+"""
+
+import re
+from collections import Counter, namedtuple
+from functools import lru_cache
+
+# Archivos distintos que se recuerdan (un lote de programas cabe completo)
+CACHE_SIZE = 256
+
+# Un token: tipo, texto exacto y línea donde empieza (desde 1)
+Token = namedtuple("Token", ["kind", "text", "line"])
+
+# Palabras reservadas de C++ (tipo "keyword"; el resto de palabras son "identifier")
+CPP_KEYWORDS = frozenset("""
+    alignas alignof and and_eq asm auto bitand bitor bool break case catch char char16_t
+    char32_t class compl const constexpr const_cast continue decltype default delete do
+    double dynamic_cast else enum explicit export extern false float for friend goto if
+    inline int long mutable namespace new noexcept not not_eq nullptr operator or or_eq
+    private protected public register reinterpret_cast return short signed sizeof static
+    static_assert static_cast struct switch template this thread_local throw true try
+    typedef typeid typename union unsigned using virtual void volatile wchar_t while xor
+    xor_eq
+""".split())
+
+# Una sola expresión con un grupo por tipo de token; el orden de las
+# alternativas resuelve los prefijos (u8"...", R"(...)", // antes de /)
+TOKEN_REGEX = re.compile(r'''
+    (?P<comment>//(?:[^\n\\]|\\.)*|/\*.*?(?:\*/|\Z))
+  | (?P<string>(?:u8|[uUL])?R"(?P<delimiter>[^()\\\s]{0,16})\(.*?\)(?P=delimiter)"
+             |(?:u8|[uUL])?"(?:[^"\\\n]|\\.)*"?)
+  | (?P<char>(?:u8|[uUL])?'(?:[^'\\\n]|\\.)*'?)
+  | (?P<include>\#[ \t]*include)(?P<include_space>[ \t]*)(?P<header><[^>\n]*>|"[^"\n]*")
+  | (?P<preprocessor>\#[ \t]*\w*)
+  | (?P<number>\.?\d(?:[eEpP][+-]|'\w|[\w.])*)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<newline>\n)
+  | (?P<space>[^\S\n]+)
+  | (?P<operator>::|->\*?|\.\*|\.\.\.|<<=?|>>=?|<=>|[-+*/%^&|<>=!]=|&&|\|\||\+\+|--|[^\w\s])
+''', re.VERBOSE | re.DOTALL)
+
+WORD_REGEX = re.compile(r'\w+')
+
+# Palabras reservadas que nombran un tipo: un * justo después declara un puntero
+TYPE_KEYWORDS = frozenset("""
+    auto bool char char16_t char32_t const double float int long short signed unsigned
+    void volatile wchar_t
+""".split())
+
+# Tokens tras los que puede empezar una declaración ("Nodo *p;", "{ std::string* s")
+DECLARATION_STARTS = frozenset(("", ";", "{", "}", "const", "static", "struct", "class"))
+
+# Especificadores de acceso: tras "public:" también empieza una declaración
+ACCESS_SPECIFIERS = frozenset(("public", "protected", "private"))
+
+# Tokens que pueden seguir al * de un declarador ("int *p", "int **pp", "int *const p", "(int*)")
+DECLARATOR_NEXT = frozenset(("*", ")", ">", ",", "const", "volatile"))
+
+def scan_tokens(source):
+    """Genera los tokens de un texto sin guardarlos (ver tokenize).
+
+    Sirve para textos que no conviene recordar en la caché.
+    """
+    line = 1
+    for match in TOKEN_REGEX.finditer(source):
+        kind = match.lastgroup
+        if kind == "delimiter":
+            kind = "string"  # lastgroup devuelve el grupo interno de las cadenas crudas
+        if kind == "header":
+            yield Token("preprocessor", match.group("include"), line)
+            if match.group("include_space"):
+                yield Token("space", match.group("include_space"), line)
+        elif kind == "word":
+            kind = "keyword" if match.group() in CPP_KEYWORDS else "identifier"
+        text = match.group(kind if kind in ("header", "string") else 0)
+        yield Token(kind, text, line)
+        line += text.count('\n')
+
+@lru_cache(maxsize=CACHE_SIZE)
+def tokenize(source):
+    """Divide el código en tokens una sola vez por texto (el resultado se comparte).
+
+    Los tipos son comment, string, char, preprocessor (la directiva, por
+    ejemplo "#include"), header (<iostream> o "archivo.h" tras #include),
+    number, keyword, identifier, operator, space y newline. Concatenar los
+    textos de todos los tokens reproduce exactamente el código.
+
+    Returns:
+        tuple: Tokens (inmutables) en orden de aparición
+    """
+    return tuple(scan_tokens(source))
+
+@lru_cache(maxsize=CACHE_SIZE)
+def code_view(source):
+    """Devuelve el código con los comentarios y el contenido de los literales en blanco.
+
+    Cada carácter borrado se reemplaza por un espacio (los saltos de línea se
+    conservan), así que las posiciones y las líneas coinciden con el código
+    original y las expresiones regulares ya no encuentran palabras dentro de
+    comentarios o cadenas. Las comillas de los literales se conservan.
+    """
+    parts = []
+    for token in tokenize(source):
+        if token.kind == "comment":
+            parts.append(re.sub(r'[^\n]', ' ', token.text))
+        elif token.kind in ("string", "char"):
+            quote = '"' if token.kind == "string" else "'"
+            opening = token.text.find(quote) + 1
+            closing = len(token.text) - 1 if len(token.text) > opening and token.text.endswith(quote) else len(token.text)
+            inner = re.sub(r'[^\n]', ' ', token.text[opening:closing])
+            parts.append(token.text[:opening] + inner + token.text[closing:])
+        else:
+            parts.append(token.text)
+    return ''.join(parts)
+
+@lru_cache(maxsize=CACHE_SIZE)
+def summarize(source):
+    """Resume los tokens del código para consultas rápidas.
+
+    Returns:
+        dict: keywords, identifiers y operators (conjuntos de los textos que
+            aparecen fuera de comentarios y cadenas), directives (directivas
+            de preprocesador sin espacios, por ejemplo "#include"), headers
+            (nombres incluidos, sin < > ni comillas), comments (cantidad de
+            comentarios), code_lines (líneas con algún token de código),
+            words (Counter de las palabras \\w+ de todo el texto, comentarios
+            y cadenas incluidos)
+    """
+    keywords = set()
+    identifiers = set()
+    operators = set()
+    directives = []
+    headers = []
+    comments = 0
+    code_lines = set()
+    for token in tokenize(source):
+        if token.kind in ("space", "newline"):
+            continue
+        if token.kind == "comment":
+            comments += 1
+            continue
+        code_lines.add(token.line)
+        if token.kind == "keyword":
+            keywords.add(token.text)
+        elif token.kind == "identifier":
+            identifiers.add(token.text)
+        elif token.kind == "operator":
+            operators.add(token.text)
+        elif token.kind == "preprocessor":
+            directives.append(token.text.replace(' ', '').replace('\t', ''))
+        elif token.kind == "header":
+            headers.append(token.text[1:-1])
+    return {
+        "keywords": frozenset(keywords),
+        "identifiers": frozenset(identifiers),
+        "operators": frozenset(operators),
+        "directives": tuple(directives),
+        "headers": tuple(headers),
+        "comments": comments,
+        "code_lines": len(code_lines),
+        "words": Counter(WORD_REGEX.findall(source))
+    }
+
+def _declares_pointer(code, index):
+    """Indica si el * de code[index] es el declarador de un puntero.
+
+    Se acepta tras una palabra de tipo ("int *p", "const char* s", "(void *)")
+    o tras un nombre de tipo, quizá calificado o con argumentos de plantilla,
+    que empieza una declaración ("Nodo *p", "std::string* s",
+    "vector<int>* v"); así "a * b" no cuenta como puntero.
+    """
+    following = code[index + 1] if index + 1 < len(code) else None
+    if following is None or not (following.kind == "identifier" or following.text in DECLARATOR_NEXT):
+        return False
+    if index == 0:
+        return False
+    previous = code[index - 1]
+    if previous.kind == "keyword":
+        return previous.text in TYPE_KEYWORDS
+    if previous.text == ">":
+        return True
+    if previous.kind != "identifier":
+        return False
+
+    # Retroceder sobre el nombre calificado (std::string) hasta el token anterior al tipo
+    start = index - 1
+    while start >= 2 and code[start - 1].text == "::" and code[start - 2].kind == "identifier":
+        start -= 2
+    before = code[start - 1].text if start > 0 else ""
+    if before == ":":
+        return start >= 2 and code[start - 2].text in ACCESS_SPECIFIERS
+    return before in DECLARATION_STARTS
+
+@lru_cache(maxsize=CACHE_SIZE)
+def uses_pointers(source):
+    """Indica si el código usa punteros según el contexto de sus tokens.
+
+    Cuentan el operador ->, new y delete, y los * que declaran un puntero (ver
+    _declares_pointer). Las multiplicaciones, las desreferencias sueltas y los
+    & (referencias, dirección u operación de bits) no cuentan.
+    """
+    code = [token for token in tokenize(source)
+            if token.kind not in ("space", "newline", "comment")]
+    for index, token in enumerate(code):
+        if token.kind == "operator" and token.text in ("->", "->*"):
+            return True
+        if token.kind == "keyword" and token.text in ("new", "delete"):
+            return True
+        if token.kind == "operator" and token.text == "*" and _declares_pointer(code, index):
+            return True
+    return False
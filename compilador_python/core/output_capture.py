@@ -0,0 +1,110 @@
+"""
+Módulo para capturar la salida de los programas con memoria acotada.
+"""
+
+import os
+import gzip
+
+class OutputCapture:
+    """Captura acotada de un flujo de salida.
+
+    Conserva los primeros `head_bytes` bytes y, en un búfer circular, los
+    últimos `tail_bytes`. Opcionalmente vuelca el flujo completo a un archivo
+    comprimido, de modo que la memoria usada no depende de cuánto imprima
+    el programa.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, head_bytes, tail_bytes, spill_path=None):
+        """Inicializa la captura.
+
+        Args:
+            head_bytes (int): Bytes iniciales que se conservan
+            tail_bytes (int): Bytes finales que se conservan
+            spill_path (str): Archivo .gz donde guardar el flujo completo (None = no guardar)
+        """
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.head = bytearray()
+        self.tail = bytearray()
+        self.total_bytes = 0
+        self.spill_path = spill_path
+        self._spill = gzip.open(spill_path, 'wb', compresslevel=1) if spill_path else None
+
+    def feed(self, data):
+        """Añade un bloque de bytes a la captura."""
+        self.total_bytes += len(data)
+        if self._spill:
+            self._spill.write(data)
+
+        room = self.head_bytes - len(self.head)
+        if room > 0:
+            self.head += data[:room]
+            data = data[room:]
+
+        if data and self.tail_bytes > 0:
+            self.tail += data[-self.tail_bytes:]
+            excess = len(self.tail) - self.tail_bytes
+            if excess > 0:
+                del self.tail[:excess]
+
+    def drain(self, stream):
+        """Lee el flujo hasta el final (pensado para ejecutarse en un hilo)."""
+        try:
+            while True:
+                data = stream.read1(self.CHUNK_SIZE) if hasattr(stream, 'read1') else stream.read(self.CHUNK_SIZE)
+                if not data:
+                    break
+                self.feed(data)
+        except (OSError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        """Cierra el archivo de volcado; si no hubo truncamiento, se elimina."""
+        if self._spill:
+            self._spill.close()
+            self._spill = None
+            if not self.truncated:
+                try:
+                    os.remove(self.spill_path)
+                except OSError:
+                    pass
+                self.spill_path = None
+
+    @property
+    def truncated(self):
+        """Indica si se descartó parte de la salida en memoria."""
+        return self.total_bytes > len(self.head) + len(self.tail)
+
+    @property
+    def omitted_bytes(self):
+        """Número de bytes que no se conservan en memoria."""
+        return self.total_bytes - len(self.head) - len(self.tail)
+
+    def text(self):
+        """Devuelve la salida conservada como texto, con un marcador si se truncó."""
+        head = self.head.decode('utf-8', errors='replace')
+        if not self.truncated:
+            return head + self.tail.decode('utf-8', errors='replace')
+
+        marker = f"\n[... salida truncada: se omitieron {self.omitted_bytes} de {self.total_bytes} bytes"
+        if self.spill_path:
+            marker += f"; salida completa en {os.path.basename(self.spill_path)}"
+        marker += " ...]\n"
+        return head + marker + self.tail.decode('utf-8', errors='replace')
+
+    def summary(self, prefix):
+        """Devuelve los campos de la captura para el diccionario de resultado.
+
+        Args:
+            prefix (str): "stdout" o "stderr"
+        """
+        return {
+            prefix: self.text(),
+            f"{prefix}_bytes": self.total_bytes,
+            f"{prefix}_truncated": self.truncated,
+            f"{prefix}_spill": self.spill_path
+        }
@@ -0,0 +1,248 @@
+"""
+Módulo para ejecutar programas en una pseudo-terminal y registrar la sesión.
+"""
+
+import os
+import re
+import time
+import select
+import subprocess
+import traceback
+
+from config.settings import EXECUTION_CONFIG
+from core.executor import (
+    ProgramExecutor, InputWaitDetector, limited_command, _setup_child, kill_process_group, read_proc_status_kb,
+    is_blocked_on_stdin, resource_summary, detect_limit, merge_probe, runtime_probe, describe_limit, format_resources,
+    LIMIT_STATUSES, STATUS_DESCRIPTIONS, STATUS_OK, STATUS_RUNTIME_ERROR
+)
+
+# Secuencias de escape ANSI (colores, borrado de pantalla de system("clear")...)
+ANSI_PATTERN = re.compile(r'\x1b\[[0-9;?]*[A-Za-z]|\x1b[()][A-Za-z0-9]|\x1b[=>]')
+
+def clean_terminal_text(text):
+    """Convierte la salida cruda de la terminal en texto plano."""
+    text = ANSI_PATTERN.sub('', text)
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+class PtyExecutor(ProgramExecutor):
+    """Ejecuta un programa en una pseudo-terminal, como si un usuario lo usara.
+
+    La entrada se escribe línea a línea cuando el programa queda esperando
+    (sin producir salida y bloqueado en la lectura), y se registra una
+    transcripción con marcas de tiempo de la salida y de cada línea escrita.
+    El eco de la terminal se desactiva para que cada entrada aparezca una
+    sola vez. Agotada la entrada se pulsa Enter una vez; si el programa
+    vuelve a quedar esperando, se termina con el estado ILE en lugar de
+    agotar el tiempo límite.
+    """
+
+    def run(self, executable, stdin_data=None, args=None, timeout=None, cpu_timeout=None, limits=None, env=None):
+        """Ejecuta el programa en una pty y devuelve el diccionario de execute_program.
+
+        Además de los campos de ProgramExecutor.run, incluye "transcript":
+        una lista de eventos {"time", "stream" ("out" o "in"), "text"}.
+        """
+        import pty
+        import fcntl
+        import struct
+        import termios
+
+        basename = os.path.basename(executable)
+        try:
+            self.log(f"\n{'='*50}")
+            self.log(f"Ejecutando (pseudo-terminal): {basename}")
+            self.log(f"{'='*50}\n")
+
+            master, slave = pty.openpty()
+            # Tamaño de la ventana y sin eco: las entradas se registran aparte
+            fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack(
+                'HHHH', EXECUTION_CONFIG["pty_rows"], EXECUTION_CONFIG["pty_columns"], 0, 0
+            ))
+            attributes = termios.tcgetattr(slave)
+            attributes[3] &= ~termios.ECHO
+            termios.tcsetattr(slave, termios.TCSANOW, attributes)
+
+            program_env, probe_path = self.prepare_probe(executable, limits, env)
+            command, program_env, limits_pending = limited_command(
+                [executable] + list(args or []), cpu_timeout, limits, program_env
+            )
+            inherited_rss_kb = read_proc_status_kb("self", "VmRSS")
+            start_time = time.perf_counter()
+            try:
+                process = subprocess.Popen(
+                    command,
+                    stdin=slave,
+                    stdout=slave,
+                    stderr=slave,
+                    start_new_session=True,
+                    env={**os.environ, **(program_env or {}), "TERM": EXECUTION_CONFIG["pty_term"]}
+                )
+                if limits_pending:
+                    _setup_child(process.pid, cpu_timeout, limits)
+            finally:
+                os.close(slave)
+
+            capture = self.create_capture(basename, process.pid, "pty")
+            transcript = []
+            pending = stdin_data.decode('utf-8', 'replace') if isinstance(stdin_data, bytes) else (stdin_data or "")
+            pending = pending.splitlines(keepends=True)
+            sent_enter = False
+            input_wait = InputWaitDetector()
+
+            limit_exceeded = None
+            wait_status = None
+            rusage = None
+            peaks = {}
+            max_output = (limits or {}).get("max_output_mb")
+            max_output_bytes = int(max_output * 1024 * 1024) if max_output else None
+            memory_kb = (limits or {}).get("memory_mb", 0) * 1024
+            last_activity = start_time
+            real_executable = os.path.realpath(executable)
+
+            try:
+                while True:
+                    # Vaciar todo lo disponible antes de revisar el estado del programa
+                    ready, _, _ = select.select([master], [], [], 0.01)
+                    for _ in range(64):
+                        if not ready or not self.read_output(master, capture, transcript, start_time):
+                            break
+                        last_activity = time.perf_counter()
+                        input_wait.reset()
+                        ready, _, _ = select.select([master], [], [], 0)
+
+                    pid, wait_status, rusage = os.wait4(process.pid, os.WNOHANG)
+                    if pid:
+                        # Leer lo que quede en la pty antes de cerrarla
+                        while select.select([master], [], [], 0.05)[0]:
+                            if not self.read_output(master, capture, transcript, start_time):
+                                break
+                        break
+
+                    self.sample_memory(process.pid, real_executable, peaks)
+
+                    now = time.perf_counter()
+                    if timeout and now - start_time >= timeout:
+                        limit_exceeded = "wall"
+                    elif max_output_bytes and capture.total_bytes > max_output_bytes:
+                        limit_exceeded = "output"
+                    elif memory_kb and peaks.get("VmPeak", 0) > memory_kb:
+                        limit_exceeded = "memory"
+                    elif sent_enter and input_wait.check(process.pid, now):
+                        # Ya recibió toda la entrada y un Enter: seguiría esperando hasta el tiempo límite
+                        limit_exceeded = "input"
+                    if limit_exceeded:
+                        kill_process_group(process)
+                        pid, wait_status, rusage = os.wait4(process.pid, 0)
+                        break
+
+                    # Escribir la siguiente línea cuando el programa espera entrada
+                    if (now - last_activity >= EXECUTION_CONFIG["pty_input_delay"]
+                            and (pending or not sent_enter) and self.is_waiting_input(process.pid)):
+                        if pending:
+                            line = pending.pop(0)
+                            os.write(master, line.encode('utf-8'))
+                            transcript.append({"time": now - start_time, "stream": "in", "text": line})
+                        else:
+                            # Entrada agotada: solo Enter, lo que basta para las pausas
+                            # "Presione Enter"; si vuelve a esperar, se termina con ILE
+                            os.write(master, b'\n')
+                            transcript.append({"time": now - start_time, "stream": "in", "text": "\n"})
+                            sent_enter = True
+                        last_activity = now
+            finally:
+                kill_process_group(process)
+                os.close(master)
+                capture.close()
+
+            process.returncode = os.waitstatus_to_exitcode(wait_status)
+            returncode = process.returncode
+            wall_time = time.perf_counter() - start_time
+            output_text = clean_terminal_text(capture.text())
+
+            probe = runtime_probe.read(probe_path)
+            merge_probe(peaks, probe)
+            resources = resource_summary(wall_time, rusage, returncode, peaks.get("VmHWM"), inherited_rss_kb)
+            if limit_exceeded is None:
+                limit_exceeded = detect_limit(returncode, output_text, cpu_timeout, limits, resources["max_rss_kb"],
+                                              peaks, probe["stack_overflow"] if probe else None)
+
+            if limit_exceeded:
+                status = LIMIT_STATUSES[limit_exceeded]
+                self.log(f"{STATUS_DESCRIPTIONS[status]}: {describe_limit(limit_exceeded, timeout, cpu_timeout, limits)}.")
+            else:
+                status = STATUS_OK if returncode == 0 else STATUS_RUNTIME_ERROR
+                self.log(f"Programa finalizado con código {returncode} en {wall_time:.3f} s")
+            self.log(f"Recursos: {format_resources(resources)}")
+
+            summary = capture.summary("stdout")
+            summary["stdout"] = output_text
+            return {
+                "success": status == STATUS_OK,
+                "status": status,
+                "limit_exceeded": limit_exceeded,
+                **summary,
+                # En una terminal stdout y stderr se mezclan en la misma pantalla
+                "stderr": "",
+                "returncode": returncode,
+                "screenshot": None,
+                "execution_time": wall_time,
+                "resources": resources,
+                "transcript": self.merge_transcript(transcript)
+            }
+
+        except Exception as e:
+            print(f"Error durante la ejecución en la pseudo-terminal: {e}")
+            traceback.print_exc()
+            return {
+                "success": False,
+                "status": STATUS_RUNTIME_ERROR,
+                "error": str(e),
+                "screenshot": None
+            }
+
+    def read_output(self, master, capture, transcript, start_time):
+        """Lee un bloque de la pty y lo añade a la captura y a la transcripción.
+
+        Returns:
+            bool: False si la terminal se cerró (no hay más salida)
+        """
+        try:
+            data = os.read(master, capture.CHUNK_SIZE)
+        except OSError:
+            return False  # EIO: el programa cerró la terminal
+        if not data:
+            return False
+
+        capture.feed(data)
+        # La transcripción se acota; la salida completa queda en la captura
+        if (capture.total_bytes - len(data) <= EXECUTION_CONFIG["transcript_max_bytes"]
+                and len(transcript) < EXECUTION_CONFIG["transcript_max_events"]):
+            transcript.append({
+                    "time": time.perf_counter() - start_time,
+                    "stream": "out",
+                    "text": data.decode('utf-8', errors='replace')
+                })
+        return True
+
+    def merge_transcript(self, transcript):
+        """Une los bloques de salida consecutivos y limpia las secuencias de la terminal."""
+        merged = []
+        total = 0
+        for event in transcript:
+            text = clean_terminal_text(event["text"]) if event["stream"] == "out" else event["text"]
+            if total + len(text) > EXECUTION_CONFIG["transcript_max_bytes"]:
+                merged.append({"time": event["time"], "stream": "out",
+                               "text": "\n[... transcripción truncada ...]\n"})
+                break
+            total += len(text)
+            if merged and merged[-1]["stream"] == event["stream"] == "out":
+                merged[-1]["text"] += text
+            else:
+                merged.append({"time": event["time"], "stream": event["stream"], "text": text})
+        return merged
+
+    def is_waiting_input(self, pid):
+        """Indica si el programa está bloqueado leyendo de la terminal."""
+        blocked = is_blocked_on_stdin(pid)
+        # Sin /proc (macOS) basta con el silencio de la salida
+        return blocked is None or blocked
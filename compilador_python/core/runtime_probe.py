@@ -0,0 +1,219 @@
+"""
+Módulo con la sonda del sandbox: un shim cargado por LD_PRELOAD que informa cómo terminó el programa.
+"""
+
+import os
+import json
+import platform
+import threading
+
+from config.settings import PROBE_CONFIG, COMPILER_CONFIG, TEMP_DIR
+from core.shim import build_shim, preload_env
+
+# Shim en C. Al terminar normalmente (destructor) escribe en PROBE_REPORT_FILE
+# el pico exacto de memoria virtual y residente (VmPeak y VmHWM), que el
+# muestreo desde el padre no ve si el programa reserva y termina enseguida.
+# Además instala, en una pila alternativa, un manejador de SIGSEGV que anota
+# si la falla ocurrió justo debajo del límite de la pila principal (un
+# desbordamiento por recursión) y vuelve a la instrucción, que falla de nuevo
+# con la acción por defecto: el programa sigue terminando con SIGSEGV. Todo
+# lo que se ejecuta en el manejador es seguro en una señal (sin stdio ni malloc).
+SHIM_SOURCE = r'''
+#define _GNU_SOURCE
+#include <signal.h>
+#include <stddef.h>
+#include <stdlib.h>
+#include <string.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/resource.h>
+
+static char report_path[4096];
+static char *stack_top;
+static size_t stack_limit;
+static pid_t main_pid;
+static char alternate_stack[64 * 1024];
+
+static long status_field(const char *status, const char *name)
+{
+    const char *line = strstr(status, name);
+    long value = 0;
+    if (!line)
+        return -1;
+    for (line += strlen(name); *line == ' ' || *line == '\t'; line++)
+        ;
+    for (; *line >= '0' && *line <= '9'; line++)
+        value = value * 10 + (*line - '0');
+    return value;
+}
+
+static char *append_text(char *out, const char *text)
+{
+    while (*text)
+        *out++ = *text++;
+    return out;
+}
+
+static char *append_number(char *out, long value)
+{
+    char digits[24];
+    int count = 0;
+    if (value < 0)
+        return append_text(out, "null");
+    do {
+        digits[count++] = '0' + value % 10;
+        value /= 10;
+    } while (value);
+    while (count)
+        *out++ = digits[--count];
+    return out;
+}
+
+static void write_report(int stack_overflow)
+{
+    char status[8192], report[160], *out = report;
+    ssize_t length = 0;
+    int fd;
+    if (!report_path[0] || getpid() != main_pid)
+        return;
+    fd = open("/proc/self/status", O_RDONLY);
+    if (fd >= 0) {
+        length = read(fd, status, sizeof(status) - 1);
+        close(fd);
+    }
+    status[length > 0 ? length : 0] = '\0';
+    out = append_text(out, "{\"stack_overflow\": ");
+    out = append_text(out, stack_overflow ? "true" : "false");
+    out = append_text(out, ", \"vm_peak_kb\": ");
+    out = append_number(out, status_field(status, "VmPeak:"));
+    out = append_text(out, ", \"vm_hwm_kb\": ");
+    out = append_number(out, status_field(status, "VmHWM:"));
+    out = append_text(out, "}\n");
+    fd = open(report_path, O_WRONLY | O_CREAT | O_TRUNC, 0644);
+    if (fd >= 0) {
+        if (write(fd, report, out - report) < 0)
+            ;
+        close(fd);
+    }
+}
+
+static void on_segmentation_fault(int signal_number, siginfo_t *info, void *context)
+{
+    char *address = (char *)info->si_addr;
+    /* La pila crece hacia abajo desde stack_top; el hueco de guarda del núcleo
+       queda debajo del límite */
+    int stack_overflow = address < stack_top
+                         && (size_t)(stack_top - address) >= stack_limit / 2
+                         && (size_t)(stack_top - address) <= stack_limit + 4 * 1024 * 1024;
+    (void)signal_number;
+    (void)context;
+    write_report(stack_overflow);
+}
+
+__attribute__((constructor)) static void install_probe(void)
+{
+    const char *path = getenv("PROBE_REPORT_FILE");
+    struct rlimit limit;
+    struct sigaction action;
+    stack_t alternate;
+    if (!path || strlen(path) >= sizeof(report_path))
+        return;
+    strcpy(report_path, path);
+    /* Los procesos que lance el programa no deben sobrescribir el informe */
+    unsetenv("PROBE_REPORT_FILE");
+    main_pid = getpid();
+
+    if (getrlimit(RLIMIT_STACK, &limit) || limit.rlim_cur == RLIM_INFINITY)
+        return;
+    stack_top = (char *)__builtin_frame_address(0);
+    stack_limit = limit.rlim_cur;
+    alternate.ss_sp = alternate_stack;
+    alternate.ss_size = sizeof(alternate_stack);
+    alternate.ss_flags = 0;
+    if (sigaltstack(&alternate, NULL))
+        return;
+    memset(&action, 0, sizeof(action));
+    action.sa_sigaction = on_segmentation_fault;
+    action.sa_flags = SA_SIGINFO | SA_ONSTACK | SA_RESETHAND;
+    sigemptyset(&action.sa_mask);
+    sigaction(SIGSEGV, &action, NULL);
+}
+
+__attribute__((destructor)) static void report_exit(void)
+{
+    write_report(0);
+}
+'''
+
+class RuntimeProbe:
+    """Construye la sonda del sandbox y lee sus informes.
+
+    Como el shim de alloc_tracker, se compila una sola vez con el compilador
+    configurado y se guarda en PROBE_CONFIG['shim_dir']. Solo funciona en
+    Linux con glibc; en otras plataformas los límites de memoria y de pila se
+    deciden solo con lo muestreado desde /proc.
+    """
+
+    def __init__(self, compiler=None):
+        self.compiler = compiler or COMPILER_CONFIG['compiler']
+        self.shim_path = None
+        self._build_failed = False
+        self._lock = threading.Lock()
+
+    def is_supported(self):
+        """Indica si la plataforma admite la sonda (Linux con glibc)."""
+        return platform.system() == "Linux" and platform.libc_ver()[0] == "glibc"
+
+    def build(self):
+        """Compila la sonda si hace falta y devuelve su ruta, o None si no está disponible."""
+        with self._lock:
+            if self.shim_path or self._build_failed:
+                return self.shim_path
+            if not PROBE_CONFIG['enabled'] or not self.is_supported():
+                self._build_failed = True
+                return None
+
+            shim_path, errors = build_shim(self.compiler, SHIM_SOURCE, PROBE_CONFIG['shim_dir'], "probe_shim")
+            if shim_path is None:
+                print(f"Advertencia: No se pudo compilar la sonda del sandbox:\n{errors}")
+                self._build_failed = True
+                return None
+
+            self.shim_path = shim_path
+            return shim_path
+
+    def prepare(self, executable, env=None):
+        """Devuelve (variables de entorno, ruta del informe) para ejecutar con la sonda.
+
+        Las variables de env se conservan (por ejemplo, el LD_PRELOAD de
+        alloc_tracker). Si la sonda no está disponible devuelve (env, None).
+        """
+        shim_path = self.build()
+        if shim_path is None:
+            return env, None
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        report_path = os.path.join(
+            TEMP_DIR, f"{os.path.basename(executable)}_{os.getpid()}_{threading.get_ident()}_probe.json"
+        )
+        if os.path.exists(report_path):
+            os.remove(report_path)
+        return preload_env(shim_path, {**(env or {}), "PROBE_REPORT_FILE": report_path}), report_path
+
+    def read(self, report_path):
+        """Lee y elimina el informe de la sonda; None si el programa no lo escribió.
+
+        Returns:
+            dict: stack_overflow, vm_peak_kb y vm_hwm_kb (None si no se pudieron leer)
+        """
+        if report_path is None:
+            return None
+        try:
+            with open(report_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+        finally:
+            try:
+                os.remove(report_path)
+            except OSError:
+                pass
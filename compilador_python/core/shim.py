@@ -0,0 +1,49 @@
+"""
+Módulo para compilar las bibliotecas compartidas que se cargan con LD_PRELOAD.
+"""
+
+import os
+import hashlib
+import subprocess
+
+def build_shim(compiler, source, directory, name):
+    """Compila el código C de un shim, si hace falta, y devuelve su ruta.
+
+    El archivo se guarda en directory con un nombre que depende del código y
+    del compilador, así que se compila una sola vez por versión; se escribe en
+    un temporal y se renombra para que otro proceso nunca cargue uno a medias.
+
+    Args:
+        compiler (str): Compilador (g++ compila el código como C con -x c)
+        source (str): Código C del shim
+        directory (str): Carpeta de los shims compilados
+        name (str): Prefijo del archivo (por ejemplo, "alloc_shim")
+
+    Returns:
+        tuple: (ruta del shim o None, errores del compilador o None)
+    """
+    digest = hashlib.sha256(f"{compiler}\0{source}".encode('utf-8')).hexdigest()[:16]
+    shim_path = os.path.join(directory, f"{name}_{digest}.so")
+    if os.path.exists(shim_path):
+        return shim_path, None
+
+    os.makedirs(directory, exist_ok=True)
+    source_path = os.path.join(directory, f"{name}_{digest}.c")
+    with open(source_path, 'w', encoding='utf-8') as f:
+        f.write(source)
+    tmp_path = f"{shim_path}.{os.getpid()}.tmp"
+    process = subprocess.run(
+        [compiler, '-x', 'c', '-shared', '-fPIC', '-O2', source_path, '-o', tmp_path, '-ldl'],
+        capture_output=True, text=True
+    )
+    if process.returncode != 0:
+        return None, process.stderr
+    os.replace(tmp_path, shim_path)
+    return shim_path, None
+
+def preload_env(shim_path, env=None):
+    """Añade un shim al LD_PRELOAD de env (o del entorno actual) y devuelve las variables."""
+    env = dict(env or {})
+    preload = env.get("LD_PRELOAD", os.environ.get("LD_PRELOAD"))
+    env["LD_PRELOAD"] = f"{shim_path}:{preload}" if preload else shim_path
+    return env
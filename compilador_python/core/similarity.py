@@ -0,0 +1,336 @@
+"""
+Módulo para detectar programas casi idénticos con firmas MinHash e índices LSH.
+"""
+
+import os
+import json
+import zlib
+import base64
+import random
+import struct
+import hashlib
+import threading
+
+from config.settings import SIMILARITY_CONFIG
+from core.lexer import tokenize
+
+# Las permutaciones de MinHash son h(x) = (a·x + b) mod p con p primo de Mersenne
+MERSENNE_PRIME = (1 << 61) - 1
+
+# Cambia si cambia la normalización de los tokens (invalida el índice guardado)
+TOKEN_NORMALIZATION_VERSION = 1
+
+def normalize_tokens(source):
+    """Devuelve los tokens del código sin comentarios ni espacios y con los nombres generalizados.
+
+    Los identificadores, números y literales se reemplazan por un marcador,
+    así que renombrar variables o cambiar mensajes no oculta una copia.
+    """
+    normalized = []
+    for token in tokenize(source):
+        if token.kind in ("space", "newline", "comment"):
+            continue
+        if token.kind == "identifier":
+            normalized.append("$id")
+        elif token.kind == "number":
+            normalized.append("$num")
+        elif token.kind in ("string", "char"):
+            normalized.append("$lit")
+        else:
+            normalized.append(token.text)
+    return normalized
+
+def stable_hash(text):
+    """Hash de 64 bits que no depende de PYTHONHASHSEED (se guarda en el índice)."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+def shingle_hashes(source, size):
+    """Devuelve el conjunto de hashes de los shingles (secuencias de size tokens) del código."""
+    tokens = normalize_tokens(source)
+    if not tokens:
+        return set()
+    if len(tokens) < size:
+        return {stable_hash(' '.join(tokens))}
+    return {stable_hash(' '.join(tokens[i:i + size])) for i in range(len(tokens) - size + 1)}
+
+def estimate_similarity(signature_a, signature_b):
+    """Estima la similitud de Jaccard como la fracción de mínimos iguales de dos firmas."""
+    equal = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return equal / len(signature_a)
+
+class MinHasher:
+    """Calcula firmas MinHash con permutaciones fijas (las mismas en cada ejecución)."""
+
+    def __init__(self, num_perm, seed=1):
+        generator = random.Random(seed)
+        self.permutations = [
+            (generator.randrange(1, MERSENNE_PRIME), generator.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, hashes):
+        """Devuelve la firma (una lista de num_perm enteros) de un conjunto de hashes."""
+        values = [value % MERSENNE_PRIME for value in hashes]
+        return [min((a * value + b) % MERSENNE_PRIME for value in values) for a, b in self.permutations]
+
+class UnionFind:
+    """Conjuntos disjuntos con compresión de caminos para agrupar los pares similares."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, item):
+        parent = self.parent.setdefault(item, item)
+        if parent != item:
+            parent = self.parent[item] = self.find(parent)
+        return parent
+
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+class SimilarityIndex:
+    """Índice persistente de firmas MinHash con bandas LSH.
+
+    Cada programa se resume en una firma de num_perm mínimos. La firma se
+    divide en bandas y dos programas son candidatos si coinciden en alguna
+    banda completa, de modo que encontrar los candidatos de un programa
+    cuesta lo mismo que buscar sus bandas y no hay que compararlo con todo
+    el corpus. Los candidatos se confirman con la similitud estimada.
+
+    El índice se guarda comprimido en SIMILARITY_CONFIG['index_dir'] y solo
+    se recalculan las firmas de los archivos cuyo contenido cambió.
+    """
+
+    def __init__(self, directory=None, num_perm=None, bands=None, shingle_size=None):
+        self.directory = directory or SIMILARITY_CONFIG['index_dir']
+        self.num_perm = num_perm or SIMILARITY_CONFIG['num_perm']
+        self.bands = bands or SIMILARITY_CONFIG['bands']
+        self.shingle_size = shingle_size or SIMILARITY_CONFIG['shingle_size']
+        if self.num_perm % self.bands:
+            raise ValueError(f"num_perm ({self.num_perm}) debe ser múltiplo de bands ({self.bands})")
+        self.rows = self.num_perm // self.bands
+        self.hasher = MinHasher(self.num_perm)
+        self.index_path = os.path.join(self.directory, "index.json.z")
+        self.documents = {}  # {ruta: {"hash": sha256 del código, "signature": [...]}}
+        self.buckets = [{} for _ in range(self.bands)]  # Una tabla por banda: {clave: {rutas}}
+        self._lock = threading.Lock()
+        self.load()
+
+    def params(self):
+        """Parámetros de los que dependen las firmas guardadas."""
+        return {
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "shingle_size": self.shingle_size,
+            "normalization": TOKEN_NORMALIZATION_VERSION
+        }
+
+    def band_keys(self, signature):
+        """Devuelve la clave de cada banda de una firma."""
+        keys = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows:(band + 1) * self.rows]
+            keys.append(hashlib.blake2b(struct.pack(f'<{self.rows}Q', *rows), digest_size=8).hexdigest())
+        return keys
+
+    def load(self):
+        """Carga el índice guardado si existe y es compatible con los parámetros actuales."""
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = json.loads(zlib.decompress(f.read()))
+        except (OSError, ValueError, zlib.error):
+            return
+        if data.get("params") != self.params():
+            print("Índice de similitud creado con otros parámetros: se reconstruirá")
+            return
+
+        for path, document in data.get("documents", {}).items():
+            packed = base64.b64decode(document["signature"])
+            signature = list(struct.unpack(f'<{self.num_perm}Q', packed))
+            self._insert(path, document["hash"], signature)
+
+    def save(self):
+        """Guarda el índice de forma atómica."""
+        with self._lock:
+            documents = {
+                path: {
+                    "hash": document["hash"],
+                    "signature": base64.b64encode(
+                        struct.pack(f'<{self.num_perm}Q', *document["signature"])
+                    ).decode('ascii')
+                }
+                for path, document in self.documents.items()
+            }
+            data = json.dumps({"params": self.params(), "documents": documents}, separators=(',', ':'))
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(data.encode('utf-8'), 6))
+            os.replace(tmp_path, self.index_path)
+
+    def _insert(self, path, source_hash, signature):
+        """Registra una firma y sus bandas (sin bloquear; quien llama tiene el lock o carga el índice)."""
+        self.documents[path] = {"hash": source_hash, "signature": signature}
+        for band, key in enumerate(self.band_keys(signature)):
+            self.buckets[band].setdefault(key, set()).add(path)
+
+    def _remove(self, path):
+        """Quita una firma y sus bandas del índice."""
+        document = self.documents.pop(path, None)
+        if document is None:
+            return
+        for band, key in enumerate(self.band_keys(document["signature"])):
+            bucket = self.buckets[band].get(key)
+            if bucket:
+                bucket.discard(path)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def add(self, path, source=None):
+        """Indexa un archivo (o su código si se pasa source).
+
+        Returns:
+            bool: True si se calculó una firma nueva, False si el contenido no cambió
+                o el archivo no tiene código
+        """
+        path = os.path.abspath(path)
+        if source is None:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                source = f.read()
+        source_hash = hashlib.sha256(source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+        with self._lock:
+            document = self.documents.get(path)
+            if document and document["hash"] == source_hash:
+                return False
+
+        hashes = shingle_hashes(source, self.shingle_size)
+        signature = self.hasher.signature(hashes) if hashes else None
+        with self._lock:
+            self._remove(path)
+            if signature is None:
+                return False
+            self._insert(path, source_hash, signature)
+        return True
+
+    def prune_missing(self):
+        """Quita del índice los archivos que ya no existen. Devuelve cuántos se quitaron."""
+        with self._lock:
+            missing = [path for path in self.documents if not os.path.exists(path)]
+            for path in missing:
+                self._remove(path)
+        return len(missing)
+
+    def candidates(self, path):
+        """Devuelve las rutas que comparten alguna banda con el archivo indexado."""
+        path = os.path.abspath(path)
+        document = self.documents.get(path)
+        if document is None:
+            return set()
+        found = set()
+        for band, key in enumerate(self.band_keys(document["signature"])):
+            found.update(self.buckets[band].get(key, ()))
+        found.discard(path)
+        return found
+
+    def find_similar(self, path, threshold=None):
+        """Devuelve [(ruta, similitud estimada)] de los archivos parecidos a uno indexado."""
+        threshold = SIMILARITY_CONFIG['threshold'] if threshold is None else threshold
+        signature = self.documents[os.path.abspath(path)]["signature"]
+        similar = []
+        for candidate in self.candidates(path):
+            similarity = estimate_similarity(signature, self.documents[candidate]["signature"])
+            if similarity >= threshold:
+                similar.append((candidate, similarity))
+        return sorted(similar, key=lambda item: (-item[1], item[0]))
+
+    def _compare_bucket(self, members, compare, union_find):
+        """Compara los miembros de un cubo y une los que son similares.
+
+        Los cubos pequeños se comparan completos. En uno grande (muchas copias
+        de pocos programas) cada miembro se compara con un representante de
+        cada grupo que ya apareció en el cubo (su primer miembro) y pasa a ser
+        representante si no se parece a ninguno; si ya está en el grupo de un
+        representante (por otra banda) no se compara. Así un falso positivo
+        no deja sin comparar a los demás y el costo crece con los grupos del
+        cubo, no con todos los pares. Con más de max_bucket_pairs
+        representantes, los miembros que no se parecen a ninguno se dejan a
+        las demás bandas.
+
+        Args:
+            members (list): Rutas del cubo, ordenadas
+            compare (callable): compare(a, b) confirma un par y devuelve si es similar
+            union_find (UnionFind): Grupos confirmados hasta ahora
+        """
+        limit = SIMILARITY_CONFIG['max_bucket_pairs']
+        if len(members) <= limit:
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    compare(a, b)
+            return
+
+        representatives = []
+        for member in members:
+            for representative in representatives:
+                if union_find.find(member) == union_find.find(representative) or compare(representative, member):
+                    break
+            else:
+                if len(representatives) < limit:
+                    representatives.append(member)
+
+    def clusters(self, threshold=None, paths=None):
+        """Agrupa los archivos casi idénticos.
+
+        Solo se comparan los pares que comparten alguna banda (candidatos) y
+        los pares confirmados se unen con union-find, así que el costo crece
+        con el número de archivos y de candidatos, no con todos los pares.
+
+        Args:
+            threshold (float): Similitud mínima (por defecto, SIMILARITY_CONFIG['threshold'])
+            paths (list): Solo devolver los grupos que contienen alguno de estos archivos
+
+        Returns:
+            list: Un dict por grupo con members (rutas ordenadas), pairs
+                ([(ruta, ruta, similitud)]) y max_similarity, del más parecido
+                al menos
+        """
+        threshold = SIMILARITY_CONFIG['threshold'] if threshold is None else threshold
+        union_find = UnionFind()
+        confirmed = {}
+        with self._lock:
+            compared = {}
+
+            def compare(a, b):
+                if (a, b) not in compared:  # El mismo par suele repetirse en varias bandas
+                    similarity = estimate_similarity(self.documents[a]["signature"],
+                                                     self.documents[b]["signature"])
+                    compared[(a, b)] = similarity >= threshold
+                    if compared[(a, b)]:
+                        confirmed[(a, b)] = similarity
+                        union_find.union(a, b)
+                return compared[(a, b)]
+
+            for bucket_table in self.buckets:
+                for bucket in bucket_table.values():
+                    if len(bucket) >= 2:
+                        self._compare_bucket(sorted(bucket), compare, union_find)
+
+        groups = {}
+        for (a, b), similarity in confirmed.items():
+            group = groups.setdefault(union_find.find(a), {"members": set(), "pairs": []})
+            group["members"].update((a, b))
+            group["pairs"].append((a, b, similarity))
+
+        wanted = {os.path.abspath(path) for path in paths} if paths else None
+        result = []
+        for group in groups.values():
+            if wanted is not None and not group["members"] & wanted:
+                continue
+            result.append({
+                "members": sorted(group["members"]),
+                "pairs": sorted(group["pairs"], key=lambda pair: (-pair[2], pair[0], pair[1])),
+                "max_similarity": max(pair[2] for pair in group["pairs"])
+            })
+        return sorted(result, key=lambda group: (-group["max_similarity"], group["members"]))
@@ -0,0 +1,54 @@
+"""
+Módulo con el etiquetador gramatical de NLTK compartido por todo el proceso.
+"""
+
+import threading
+
+class DescriptionTagger:
+    """Tokenizador y etiquetador de NLTK cargados una sola vez por proceso.
+
+    NLTK tarda en importarse y solo lo necesita el análisis de descripciones,
+    así que se importa la primera vez que se pide la instancia con get() y
+    no al importar el analizador. El modelo del etiquetador se carga una vez
+    y se reutiliza, también para etiquetar varios textos a la vez.
+    """
+
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls):
+        """Devuelve la instancia compartida, creándola (e importando NLTK) si hace falta."""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        """Importa NLTK y carga el modelo del etiquetador (usar get() en lugar de crearla)."""
+        from nltk.tokenize import word_tokenize
+        from nltk.tag.perceptron import PerceptronTagger
+
+        self._word_tokenize = word_tokenize
+        self._tagger = PerceptronTagger()
+
+    def tokenize(self, text):
+        """Divide un texto en palabras."""
+        return self._word_tokenize(text)
+
+    def tag(self, text):
+        """Tokeniza y etiqueta un texto.
+
+        Returns:
+            list: Pares (palabra, etiqueta)
+        """
+        return self._tagger.tag(self.tokenize(text))
+
+    def tag_batch(self, texts):
+        """Tokeniza y etiqueta varios textos con una sola llamada al etiquetador.
+
+        Returns:
+            list: Una lista de pares (palabra, etiqueta) por texto
+        """
+        return self._tagger.tag_sents([self.tokenize(text) for text in texts])
@@ -291,6 +291,7 @@ class CompilerGUI:
         self.compiler_var = tk.StringVar(value=COMPILER_CONFIG["compiler"])
         self.flags_var = tk.StringVar(value=" ".join(COMPILER_CONFIG["flags"]))
         self.timeout_var = tk.StringVar(value=str(COMPILER_CONFIG["timeout"]))
+        self.jobs_var = tk.StringVar(value=str(COMPILER_CONFIG["jobs"]))
         self.autoclean_var = tk.BooleanVar(value=True)  # Variable para limpieza automática
         
         # Grid de configuración
@@ -304,13 +305,16 @@ class CompilerGUI:
             ttk.Label(config_frame, text="Timeout:", bootstyle="primary").grid(row=2, column=0, sticky="w", padx=5, pady=2)
             ttk.Entry(config_frame, textvariable=self.timeout_var, bootstyle="primary").grid(row=2, column=1, sticky="ew", padx=5, pady=2)
             
+            ttk.Label(config_frame, text="Trabajos (-j):", bootstyle="primary").grid(row=3, column=0, sticky="w", padx=5, pady=2)
+            ttk.Entry(config_frame, textvariable=self.jobs_var, bootstyle="primary").grid(row=3, column=1, sticky="ew", padx=5, pady=2)
+            
             # Opción para limpiar archivos temporales
             ttk.Checkbutton(
                 config_frame, 
                 text="Limpiar archivos temporales", 
                 variable=self.autoclean_var,
                 bootstyle="primary-round-toggle"
-            ).grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+            ).grid(row=4, column=0, columnspan=2, sticky="w", padx=5, pady=5)
         else:
             ttk.Label(config_frame, text="🔧 Compilador:").grid(row=0, column=0, sticky="w", padx=5, pady=2)
             ttk.Entry(config_frame, textvariable=self.compiler_var, style="Config.TEntry").grid(row=0, column=1, sticky="ew", padx=5, pady=2)
@@ -321,13 +325,16 @@ class CompilerGUI:
             ttk.Label(config_frame, text="⏱️ Timeout:").grid(row=2, column=0, sticky="w", padx=5, pady=2)
             ttk.Entry(config_frame, textvariable=self.timeout_var, style="Config.TEntry").grid(row=2, column=1, sticky="ew", padx=5, pady=2)
             
+            ttk.Label(config_frame, text="🧵 Trabajos (-j):").grid(row=3, column=0, sticky="w", padx=5, pady=2)
+            ttk.Entry(config_frame, textvariable=self.jobs_var, style="Config.TEntry").grid(row=3, column=1, sticky="ew", padx=5, pady=2)
+            
             # Opción para limpiar archivos temporales
             ttk.Checkbutton(
                 config_frame, 
                 text="🧹 Limpiar archivos temporales", 
                 variable=self.autoclean_var,
                 style="TCheckbutton"
-            ).grid(row=3, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+            ).grid(row=4, column=0, columnspan=2, sticky="w", padx=5, pady=5)
         
         config_frame.columnconfigure(1, weight=1)
         
@@ -833,6 +840,9 @@ class CompilerGUI:
             messagebox.showwarning("Advertencia", "No hay archivos seleccionados para compilar.")
             return
         
+        # Actualizar la configuración del compilador (compilador, flags y trabajos)
+        self.update_compiler_config()
+        
         # Configurar la interfaz durante la compilación
         self.disable_interface()
         self.batch_progress_var.set(0)
@@ -843,6 +853,9 @@ class CompilerGUI:
     def process_batch_files(self, files):
         """Procesa los archivos seleccionados en un hilo separado."""
         try:
+            # compile_batch compila cada ruta una sola vez: el progreso se mide
+            # sobre la misma lista sin repetidos
+            files = list(dict.fromkeys(files))
             total_files = len(files)
             self.status_var.set(f"Compilando {total_files} archivos...")
             self.batch_log(f"Iniciando compilación por lotes de {total_files} archivos...")
@@ -850,23 +863,20 @@ class CompilerGUI:
             success_count = 0
             error_count = 0
             
-            for i, file in enumerate(files):
+            self.batch_log(f"Compilando con {self.compiler.jobs} trabajos en paralelo")
+            
+            # Los resultados llegan en orden de finalización
+            for i, (file, compile_result) in enumerate(self.compiler.compile_batch(files), 1):
                 # Actualizar progreso
                 progress = (i / total_files) * 100
                 self.batch_progress_var.set(progress)
-                self.status_var.set(f"Compilando {i+1}/{total_files}: {os.path.basename(file)}")
-                
-                # Procesar el archivo
-                self.batch_log(f"Procesando ({i+1}/{total_files}): {file}")
-                
-                # Compilar archivo sin generar PDF
-                compile_result = self.compiler.compile_file(file)
+                self.status_var.set(f"Compilados {i}/{total_files}: {os.path.basename(file)}")
                 
                 if compile_result["success"]:
-                    self.batch_log(f"Archivo compilado correctamente: {os.path.basename(file)}", "success")
+                    self.batch_log(f"({i}/{total_files}) Archivo compilado correctamente: {os.path.basename(file)}", "success")
                     success_count += 1
                 else:
-                    self.batch_log(f"Error al compilar: {os.path.basename(file)}", "error")
+                    self.batch_log(f"({i}/{total_files}) Error al compilar: {os.path.basename(file)}", "error")
                     if "stderr" in compile_result:
                         error_text = compile_result["stderr"]
                         # Limitar la cantidad de texto de error para evitar sobrecarga
@@ -1019,6 +1029,11 @@ class CompilerGUI:
         except ValueError:
             self.log("Advertencia: Valor de timeout inválido, usando valor predeterminado")
             self.compiler.timeout = COMPILER_CONFIG["timeout"]
+        try:
+            self.compiler.jobs = max(1, int(self.jobs_var.get()))
+        except ValueError:
+            self.log("Advertencia: Número de trabajos inválido, usando valor predeterminado")
+            self.compiler.jobs = COMPILER_CONFIG["jobs"]
     
     def process_files(self):
         """Procesa los archivos seleccionados en un hilo separado."""
@@ -1162,21 +1177,20 @@ class CompilerGUI:
             success_count = 0
             error_count = 0
             
-            for i, file in enumerate(self.selected_files):
+            self.log(f"Compilando con {self.compiler.jobs} trabajos en paralelo")
+            
+            # Los resultados llegan en orden de finalización
+            for i, (file, compile_result) in enumerate(self.compiler.compile_batch(self.selected_files), 1):
                 # Actualizar progreso
                 progress = (i / total_files) * 100
                 self.progress_var.set(progress)
-                self.status_var.set(f"Compilando {i+1}/{total_files}: {os.path.basename(file)}")
-                
-                # Compilar archivo
-                self.log(f"Compilando ({i+1}/{total_files}): {file}")
-                compile_result = self.compiler.compile_file(file)
+                self.status_var.set(f"Compilados {i}/{total_files}: {os.path.basename(file)}")
                 
                 if compile_result["success"]:
-                    self.log(f"Archivo compilado correctamente: {os.path.basename(file)}", "success")
+                    self.log(f"({i}/{total_files}) Archivo compilado correctamente: {os.path.basename(file)}", "success")
                     success_count += 1
                 else:
-                    self.log(f"Error al compilar: {os.path.basename(file)}", "error")
+                    self.log(f"({i}/{total_files}) Error al compilar: {os.path.basename(file)}", "error")
                     if "stderr" in compile_result:
                         error_text = compile_result["stderr"]
                         # Limitar la cantidad de texto de error para evitar sobrecarga
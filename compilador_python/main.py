@@ -6,6 +6,7 @@ import os
 import sys
 import argparse
 import platform
+import importlib.util
 import traceback
 
 def check_dependencies():
@@ -17,21 +18,20 @@ def check_dependencies():
         "PIL", "reportlab", "nltk", "tkinter"
     ]
     
+    # find_spec localiza los paquetes sin importarlos (NLTK tarda en cargarse
+    # y solo se importa cuando se analiza una descripción)
     for package in required_packages:
         try:
-            if package == "PIL":
-                __import__("PIL.Image")
-            elif package == "tkinter":
-                __import__("tkinter")
-            else:
-                __import__(package)
-        except ImportError:
+            if importlib.util.find_spec(package) is None:
+                missing_deps.append(package)
+        except (ImportError, ValueError):
             missing_deps.append(package)
     
     # Verificar componentes específicos que necesitamos
     try:
-        from PIL import ImageGrab
-    except ImportError:
+        if importlib.util.find_spec("PIL.ImageGrab") is None:
+            missing_deps.append("PIL.ImageGrab")
+    except (ImportError, ValueError):
         missing_deps.append("PIL.ImageGrab")
     
     # Verificar que se pueden usar capturas de pantalla (en macOS)
@@ -108,6 +108,103 @@ def parse_arguments():
         help='Mantener archivos de la ejecución actual cuando se usa --clean-temp'
     )
     
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=None,
+        help='Número de compilaciones (y procesos que renderizan el PDF) en paralelo (por defecto, número de núcleos)'
+    )
+    
+    parser.add_argument(
+        '--exec-mode',
+        choices=['auto', 'terminal', 'pipe', 'pty'],
+        default=None,
+        help='Modo de ejecución de los programas (por defecto, el de EXECUTION_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--stream-pdf',
+        action='store_true',
+        help='Volcar a disco los programas del PDF en lugar de guardarlos en memoria (lotes grandes)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Desactivar las cachés persistentes (siempre recompilar)'
+    )
+    
+    parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Semilla de la entrada generada en modo sin terminal (por defecto, la de INPUT_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--grade',
+        action='store_true',
+        help='Calificar los archivos con sus casos de prueba (.in/.out) y generar los veredictos'
+    )
+    
+    parser.add_argument(
+        '--cases',
+        default=None,
+        help='Carpeta con una subcarpeta de casos por programa (por defecto, la de GRADING_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--benchmark',
+        action='store_true',
+        help='Medir el rendimiento de cada programa con ejecuciones repetidas y agregarlo al PDF'
+    )
+    
+    parser.add_argument(
+        '--runs',
+        type=int,
+        default=None,
+        help='Ejecuciones medidas por programa con --benchmark (por defecto, las de BENCHMARK_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--warmups',
+        type=int,
+        default=None,
+        help='Ejecuciones de calentamiento descartadas con --benchmark (por defecto, las de BENCHMARK_CONFIG)'
+    )
+    
+    parser.add_argument(
+        '--pin-cpu',
+        type=int,
+        default=None,
+        help='Fijar cada ejecución de --benchmark a este núcleo (solo Linux)'
+    )
+    
+    parser.add_argument(
+        '--complexity',
+        action='store_true',
+        help='Estimar la complejidad de los programas de vectores, matrices y recursión con un barrido de tamaños'
+    )
+    
+    parser.add_argument(
+        '--track-alloc',
+        action='store_true',
+        help='Contar reservas, bytes y fugas de memoria dinámica con un shim LD_PRELOAD (solo Linux)'
+    )
+    
+    parser.add_argument(
+        '--similarity',
+        action='store_true',
+        help='Agregar los archivos al índice de similitud e informar los grupos de programas casi idénticos'
+    )
+    
+    parser.add_argument(
+        '--similarity-threshold',
+        type=float,
+        default=None,
+        help='Similitud mínima (0-1) para agrupar dos programas (por defecto, la de SIMILARITY_CONFIG)'
+    )
+    
     parser.add_argument(
         'files',
         nargs='*',
@@ -148,6 +245,7 @@ def run_console_mode(files):
     compiler = CppCompiler()
     success = True
     
+    valid_files = []
     for file in files:
         if not os.path.exists(file):
             print(f"Error: No se encuentra el archivo {file}")
@@ -159,8 +257,19 @@ def run_console_mode(files):
             success = False
             continue
         
+        valid_files.append(file)
+    
+    # Compilar todos los archivos en paralelo antes de ejecutarlos
+    print(f"\nCompilando {len(valid_files)} archivos ({compiler.jobs} en paralelo)...")
+    compile_results = {}
+    for i, (file, compile_result) in enumerate(compiler.compile_batch(valid_files), 1):
+        compile_results[file] = compile_result
+        status = "✓" if compile_result["success"] else "✗"
+        print(f"{status} [{i}/{len(valid_files)}] Compilado: {os.path.basename(file)}")
+    
+    for file in valid_files:
         print(f"\nProcesando: {file}")
-        result = compiler.process_file(file)
+        result = compiler.process_file(file, compile_result=compile_results.get(file))
         
         if result["success"]:
             print(f"✓ {os.path.basename(file)} procesado correctamente")
@@ -179,6 +288,76 @@ def run_console_mode(files):
     compiler.cleanup()
     return success
 
+def run_grading_mode(files, cases_root=None):
+    """Califica los archivos con sus casos de prueba en modo consola."""
+    from core.compiler import CppCompiler
+    from core.grader import Grader
+    
+    valid_files = [file for file in files if os.path.exists(file) and file.lower().endswith('.cpp')]
+    for file in files:
+        if file not in valid_files:
+            print(f"Error: {file} no existe o no es un archivo C++ válido")
+    
+    if not valid_files:
+        print("Error: No se especificaron archivos para calificar")
+        return False
+    
+    compiler = CppCompiler()
+    grader = Grader(compiler, cases_root)
+    print(f"\nCalificando {len(valid_files)} archivos con los casos de {grader.cases_root} "
+          f"({grader.jobs} casos en paralelo)...")
+    results = grader.grade_batch(valid_files)
+    
+    print("\nResumen de la calificación:")
+    for result in results:
+        accepted = result['summary'].get("AC", 0)
+        print(f"  {result['name']}: {accepted}/{len(result['verdicts'])} "
+              f"({result['score'] * 100:.0f}%)")
+    
+    success = compiler.save_pdf()
+    compiler.cleanup()
+    return success
+
+def run_similarity_mode(files):
+    """Indexa los archivos y muestra los grupos de programas casi idénticos.
+    
+    El índice es persistente: los archivos ya indexados sin cambios no se
+    vuelven a procesar y los de ejecuciones anteriores también se comparan.
+    Sin archivos, se informan todos los grupos del índice.
+    """
+    from core.similarity import SimilarityIndex
+    
+    valid_files = [file for file in files if os.path.exists(file) and file.lower().endswith('.cpp')]
+    for file in files:
+        if file not in valid_files:
+            print(f"Error: {file} no existe o no es un archivo C++ válido")
+    
+    index = SimilarityIndex()
+    removed = index.prune_missing()
+    if removed:
+        print(f"Se quitaron {removed} archivos que ya no existen del índice de similitud")
+    
+    updated = sum(1 for file in valid_files if index.add(file))
+    index.save()
+    print(f"\nÍndice de similitud: {len(index.documents)} programas "
+          f"({updated} firmas nuevas o actualizadas)")
+    
+    clusters = index.clusters(paths=valid_files or None)
+    if not clusters:
+        print("No se encontraron programas casi idénticos")
+        return True
+    
+    print(f"\nGrupos de programas casi idénticos: {len(clusters)}")
+    for number, cluster in enumerate(clusters, 1):
+        print(f"\nGrupo {number} ({len(cluster['members'])} programas, "
+              f"similitud máxima {cluster['max_similarity'] * 100:.0f}%):")
+        for member in cluster["members"]:
+            print(f"  - {member}")
+        root = os.path.commonpath(cluster["members"])
+        for a, b, similarity in cluster["pairs"]:
+            print(f"    {os.path.relpath(a, root)} ~ {os.path.relpath(b, root)}: {similarity * 100:.0f}%")
+    return True
+
 def main():
     """Función principal."""
     try:
@@ -195,6 +374,51 @@ def main():
         # Procesar argumentos
         args = parse_arguments()
         
+        # Aplicar el número de trabajos en paralelo a toda la sesión
+        if args.jobs:
+            from config.settings import COMPILER_CONFIG, GRADING_CONFIG, PDF_CONFIG
+            COMPILER_CONFIG["jobs"] = max(1, args.jobs)
+            GRADING_CONFIG["jobs"] = max(1, args.jobs)
+            PDF_CONFIG["jobs"] = max(1, args.jobs)
+        
+        if args.exec_mode:
+            from config.settings import EXECUTION_CONFIG
+            EXECUTION_CONFIG["mode"] = args.exec_mode
+        
+        if args.stream_pdf:
+            from config.settings import PDF_CONFIG
+            PDF_CONFIG["streaming"] = True
+        
+        if args.no_cache:
+            from config.settings import CACHE_CONFIG
+            CACHE_CONFIG["enabled"] = False
+        
+        if args.seed is not None:
+            from config.settings import INPUT_CONFIG
+            INPUT_CONFIG["seed"] = args.seed
+        
+        if args.benchmark:
+            from config.settings import BENCHMARK_CONFIG
+            BENCHMARK_CONFIG["enabled"] = True
+            if args.runs:
+                BENCHMARK_CONFIG["runs"] = max(1, args.runs)
+            if args.warmups is not None:
+                BENCHMARK_CONFIG["warmups"] = max(0, args.warmups)
+            if args.pin_cpu is not None:
+                BENCHMARK_CONFIG["cpu"] = args.pin_cpu
+        
+        if args.complexity:
+            from config.settings import COMPLEXITY_CONFIG
+            COMPLEXITY_CONFIG["enabled"] = True
+        
+        if args.track_alloc:
+            from config.settings import ALLOC_CONFIG
+            ALLOC_CONFIG["enabled"] = True
+        
+        if args.similarity_threshold is not None:
+            from config.settings import SIMILARITY_CONFIG
+            SIMILARITY_CONFIG["threshold"] = min(max(args.similarity_threshold, 0.0), 1.0)
+        
         # Verificar si se solicita limpiar temporales
         if args.clean_temp:
             from core.compiler import CppCompiler
@@ -215,6 +439,14 @@ def main():
                     sys.exit(1)
         
         # Ejecutar en el modo apropiado
+        if args.similarity:
+            success = run_similarity_mode(args.files)
+            sys.exit(0 if success else 1)
+        
+        if args.grade:
+            success = run_grading_mode(args.files, args.cases)
+            sys.exit(0 if success else 1)
+        
         if args.no_gui or args.files:
             success = run_console_mode(args.files)
             sys.exit(0 if success else 1)
@@ -0,0 +1,8 @@
+"""
+Configuración común de las pruebas: permite importar los módulos del compilador.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
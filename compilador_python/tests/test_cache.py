@@ -0,0 +1,77 @@
+"""
+Pruebas de las cachés persistentes: expulsión LRU y claves.
+"""
+
+import os
+import shutil
+import time
+
+import pytest
+
+from core.cache import DiskCache, CompileCache, AnalysisCache
+
+def store_entry(cache, key, tmp_path, size=100):
+    source = tmp_path / f"{key}.src"
+    source.write_bytes(b"x" * size)
+    cache.store(key, {"nombre": key}, {".bin": str(source)})
+
+def age(cache, key, seconds):
+    """Hace que el último acceso a una entrada sea de hace seconds segundos."""
+    moment = time.time() - seconds
+    os.utime(cache.path(key, cache.META_SUFFIX), (moment, moment))
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_size_mb=300 / (1024 * 1024))
+    store_entry(cache, "a", tmp_path)
+    store_entry(cache, "b", tmp_path)
+    age(cache, "a", 200)
+    age(cache, "b", 100)
+    assert cache.load_meta("a") == {"nombre": "a"}  # a pasa a ser la más reciente
+
+    store_entry(cache, "c", tmp_path)
+    assert cache.load_meta("b") is None
+    assert cache.load_meta("a") == {"nombre": "a"}
+    assert cache.load_meta("c") == {"nombre": "c"}
+    assert not os.path.exists(cache.path("b", ".bin"))
+
+def test_damaged_meta_is_a_miss(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_size_mb=1)
+    with open(cache.path("roto", cache.META_SUFFIX), 'w') as f:
+        f.write("{no es json")
+    assert cache.load_meta("roto") is None
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="requiere g++")
+def test_compile_key_follows_sources_and_flags(tmp_path):
+    cache = CompileCache(str(tmp_path / "compile"), max_size_mb=10)
+    header = tmp_path / "datos.h"
+    header.write_text("const int N = 3;\n")
+    source = tmp_path / "main.cpp"
+    source.write_text('#include "datos.h"\n#include <iostream>\nint main() { std::cout << N; }\n')
+
+    key = cache.make_key(str(source), "g++", ["-O2"])
+    assert key == cache.make_key(str(source), "g++", ["-O2"])
+    assert key != cache.make_key(str(source), "g++", ["-O0"])
+
+    header.write_text("const int N = 4;\n")  # Cambia solo el include local
+    assert key != cache.make_key(str(source), "g++", ["-O2"])
+
+def test_compile_failures_are_cached_with_stderr(tmp_path):
+    cache = CompileCache(str(tmp_path / "compile"), max_size_mb=10)
+    cache.put("fallo", {"success": False, "stdout": "", "stderr": "error: falta ';'"})
+    result = cache.get("fallo", str(tmp_path / "ejecutable"))
+    assert result == {"success": False, "stdout": "", "stderr": "error: falta ';'", "cached": True}
+
+def test_analysis_key_and_roundtrip(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "analysis"), max_size_mb=10)
+    code = "int main() { return 0; }"
+    key = cache.make_key(code, "/a/vector_suma.cpp", "v1")
+    assert key == cache.make_key(code, "/otra/carpeta/vector_suma.cpp", "v1")
+    assert key != cache.make_key(code, "/a/matriz_suma.cpp", "v1")  # El nombre influye en el tipo
+    assert key != cache.make_key(code, "/a/vector_suma.cpp", "v2")
+    assert key != cache.make_key(code + "\n", "/a/vector_suma.cpp", "v1")
+
+    analysis = {"type": "vector", "complexity": 12, "input_types": ["int"]}
+    cache.put(key, analysis)
+    assert cache.get(key) == analysis
+    cache.put("con_error", {"error": "no se pudo leer"})
+    assert cache.get("con_error") is None
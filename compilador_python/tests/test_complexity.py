@@ -0,0 +1,37 @@
+"""
+Pruebas del ajuste de modelos de complejidad.
+"""
+
+import math
+
+from core.complexity import fit_complexity, format_complexity
+
+SIZES = [100, 200, 400, 800, 1600, 3200]
+
+def test_constant_times_report_spread_instead_of_r2():
+    times = [0.010, 0.011, 0.009, 0.010, 0.011, 0.009]
+    fit = fit_complexity(SIZES, times)
+    assert fit["class"] == "O(1)"
+    assert fit["r2"] is None
+    assert "R² no aplica" in fit["note"]
+
+    text = format_complexity({"success": True, "sizes": SIZES, **fit})
+    assert "R² 0.000" not in text
+    assert "R² no aplica a O(1)" in text
+
+def test_synthetic_growth_classes():
+    models = {
+        "O(n)": lambda n: 0.002 + 1e-6 * n,
+        "O(n log n)": lambda n: 0.002 + 1e-7 * n * math.log2(n),
+        "O(n²)": lambda n: 0.002 + 1e-9 * n * n,
+        "O(n³)": lambda n: 0.002 + 1e-12 * n ** 3
+    }
+    for expected, model in models.items():
+        fit = fit_complexity(SIZES, [model(n) for n in SIZES])
+        assert fit["class"] == expected
+        assert fit["r2"] > 0.99
+
+def test_exponential_growth():
+    sizes = list(range(10, 26, 3))
+    fit = fit_complexity(sizes, [1e-6 * 2 ** n for n in sizes])
+    assert fit["class"] == "O(2^n)"
@@ -0,0 +1,114 @@
+"""
+Pruebas de los límites de tiempo y del sandbox de las ejecuciones sin terminal.
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from core import executor
+from core.executor import (ProgramExecutor, STATUS_OK, STATUS_TIME_LIMIT, STATUS_MEMORY_LIMIT, STATUS_RUNTIME_ERROR,
+                           STATUS_IDLE_LIMIT)
+from core.pty_executor import PtyExecutor
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None or os.name != "posix",
+                                reason="requiere g++ en un sistema POSIX")
+
+PROGRAMS = {
+    "spin": "int main() { volatile unsigned long x = 0; for (;;) x++; }",
+    "sleep": "#include <unistd.h>\nint main() { sleep(5); return 0; }",
+    "echo": "#include <iostream>\nint main() { int n; std::cin >> n; std::cout << n * 2 << std::endl; }",
+    # Lee su límite de memoria virtual antes de main, en la inicialización estática
+    "static_limit": "#include <sys/resource.h>\n#include <cstdio>\n"
+                    "struct Check { Check() { rlimit r; getrlimit(RLIMIT_AS, &r); "
+                    "printf(\"%llu\\n\", (unsigned long long)r.rlim_cur); } } check;\n"
+                    "int main() { return 0; }",
+    # Reserva 3 GB sin usarlos y termina enseguida
+    "big_malloc": "#include <cstdlib>\n#include <cstdio>\n"
+                  "int main() { if (!malloc(3UL << 30)) { puts(\"null\"); return 1; } return 0; }",
+    "caught_bad_alloc": "#include <vector>\n#include <new>\n#include <cstdio>\n"
+                        "int main() { try { std::vector<char> v(1UL << 30, 1); printf(\"%d\\n\", v[7]); }"
+                        " catch (std::bad_alloc &) { puts(\"sin memoria\"); } return 0; }",
+    "recursion": "int f(int n) { volatile char buffer[1024]; buffer[0] = n; return n ? f(n - 1) + buffer[0] : 0; }\n"
+                 "int main() { return f(100000000); }",
+    "null_pointer": "int main() { volatile int *p = 0; return *p; }",
+    # Pide datos para siempre: en una terminal la entrada nunca llega a EOF
+    "interactive": "#include <iostream>\n#include <string>\n"
+                   "int main() { std::string s; for (;;) { std::cout << \"Dato: \" << std::flush;"
+                   " std::getline(std::cin, s); std::cout << s.size() << std::endl; } }"
+}
+
+SANDBOX = {"memory_mb": 512, "address_space_factor": 8, "stack_mb": 8, "max_processes": 64}
+
+@pytest.fixture(scope="module")
+def programs(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("programs")
+    paths = {}
+    for name, source in PROGRAMS.items():
+        source_path = directory / f"{name}.cpp"
+        source_path.write_text(source)
+        paths[name] = str(directory / name)
+        subprocess.run(["g++", "-O1", str(source_path), "-o", paths[name]], check=True)
+    return paths
+
+@pytest.fixture
+def popen_calls(monkeypatch):
+    calls = []
+    original = subprocess.Popen
+
+    def recording_popen(*args, **kwargs):
+        calls.append(kwargs)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(executor.subprocess, "Popen", recording_popen)
+    return calls
+
+def test_cpu_limit(programs, popen_calls):
+    result = ProgramExecutor(verbose=False).run(programs["spin"], timeout=10, cpu_timeout=1)
+    assert result["status"] == STATUS_TIME_LIMIT
+    assert result["limit_exceeded"] == "cpu"
+    assert result["execution_time"] < 5
+    assert all("preexec_fn" not in kwargs for kwargs in popen_calls)
+
+def test_wall_limit(programs):
+    result = ProgramExecutor(verbose=False).run(programs["sleep"], timeout=0.5, cpu_timeout=2)
+    assert result["status"] == STATUS_TIME_LIMIT
+    assert result["limit_exceeded"] == "wall"
+
+def test_limits_keep_normal_runs(programs):
+    result = ProgramExecutor(verbose=False).run(
+        programs["echo"], stdin_data="21\n", timeout=5, cpu_timeout=2, limits={"memory_mb": 256}
+    )
+    assert result["status"] == STATUS_OK
+    assert result["stdout"].strip() == "42"
+
+@pytest.mark.parametrize("runner", [ProgramExecutor, PtyExecutor])
+def test_limits_apply_before_exec(programs, runner):
+    """Los límites ya rigen durante la inicialización estática del programa."""
+    result = runner(verbose=False).run(programs["static_limit"], timeout=5, limits=SANDBOX)
+    assert result["status"] == STATUS_OK
+    assert int(result["stdout"].split()[0]) == 512 * 8 * 1024 * 1024
+
+@pytest.mark.parametrize("runner", [ProgramExecutor, PtyExecutor])
+@pytest.mark.parametrize("name, status, limit", [
+    ("big_malloc", STATUS_MEMORY_LIMIT, "memory"),
+    ("caught_bad_alloc", STATUS_MEMORY_LIMIT, "memory"),
+    ("recursion", STATUS_MEMORY_LIMIT, "stack"),
+    ("null_pointer", STATUS_RUNTIME_ERROR, None)
+])
+def test_sandbox_violations(programs, runner, name, status, limit):
+    result = runner(verbose=False).run(programs[name], timeout=10, cpu_timeout=5, limits=SANDBOX)
+    assert result["status"] == status
+    assert result["limit_exceeded"] == limit
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/wchan"), reason="requiere /proc")
+def test_exhausted_input_in_pty(programs):
+    """Un programa que sigue esperando entrada tras agotarla termina con ILE, sin agotar el tiempo límite."""
+    result = PtyExecutor(verbose=False).run(programs["interactive"], stdin_data="uno\ndos\n", timeout=20, cpu_timeout=5)
+    assert result["status"] == STATUS_IDLE_LIMIT
+    assert result["limit_exceeded"] == "input"
+    assert result["execution_time"] < 10
+    inputs = [event["text"] for event in result["transcript"] if event["stream"] == "in"]
+    assert inputs == ["uno\n", "dos\n", "\n"]
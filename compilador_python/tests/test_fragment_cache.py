@@ -0,0 +1,105 @@
+"""
+Pruebas de la caché de fragmentos del informe PDF.
+"""
+
+import pytest
+
+pytest.importorskip("pypdf")
+
+from pypdf import PdfReader
+
+from config.settings import CACHE_CONFIG, PDF_CONFIG
+from core.cache import FragmentCache
+from utils import pdf_generator
+from utils.pdf_generator import PDFGenerator
+
+SOURCE = """#include <iostream>
+using namespace std;
+
+int main() {
+    int n = 5;
+    cout << n * 2 << endl;
+    return 0;
+}
+"""
+
+def program_info(name, date):
+    return {
+        'name': name,
+        'source_code': SOURCE,
+        'output': f"Compilador: g++\nFecha: {date}\nEstado: Correcto\nSalida:\n10"
+    }
+
+@pytest.fixture
+def report_dirs(tmp_path, monkeypatch):
+    monkeypatch.setitem(CACHE_CONFIG, 'enabled', True)
+    monkeypatch.setitem(CACHE_CONFIG, 'fragments_dir', str(tmp_path / "fragments"))
+    monkeypatch.setitem(PDF_CONFIG, 'jobs', 1)
+    monkeypatch.setattr(pdf_generator, 'TEMP_DIR', str(tmp_path / "temp"))
+    return tmp_path
+
+def build_report(path, date, capsys):
+    generator = PDFGenerator(str(path))
+    generator.add_program(program_info("suma", date), "general")
+    generator.add_program(program_info("producto", date), "vector")
+    capsys.readouterr()
+    assert generator.save()
+    return capsys.readouterr().out
+
+def test_key_ignores_date(tmp_path):
+    cache_key = FragmentCache(str(tmp_path)).make_key
+    first = cache_key(program_info("suma", "2024-01-01 10:00:00"), "general", "v1")
+    second = cache_key(program_info("suma", "2024-05-02 11:30:00"), "general", "v1")
+    assert first == second
+    assert cache_key(program_info("suma", "2024-01-01 10:00:00"), "vector", "v1") != first
+
+def test_second_identical_run_renders_nothing(report_dirs, capsys):
+    first = build_report(report_dirs / "a.pdf", "2024-01-01 10:00:00", capsys)
+    assert "0 de la caché, 2 renderizados" in first
+
+    second = build_report(report_dirs / "b.pdf", "2024-01-01 10:00:05", capsys)
+    assert "2 de la caché, 0 renderizados" in second
+    assert (report_dirs / "b.pdf").stat().st_size > 0
+
+def test_worker_messages_reach_parent(report_dirs, monkeypatch, capfd):
+    """Los procesos del pool no escriben en la consola: el principal muestra sus mensajes en orden."""
+    monkeypatch.setitem(PDF_CONFIG, 'jobs', 2)
+    monkeypatch.setitem(PDF_CONFIG, 'chunk_programs', 1)
+    generator = PDFGenerator(str(report_dirs / "c.pdf"))
+    generator.add_program(program_info("suma", "2024-01-01 10:00:00"), "general")
+    generator.add_program(program_info("producto", "2024-01-01 10:00:00"), "vector")
+    capfd.readouterr()
+    assert generator.save()
+
+    out = capfd.readouterr().out
+    rendering = out.split("Renderizando", 1)[1].split("Uniendo", 1)[0]
+    assert rendering.count("Código fuente obtenido") == 2
+
+def test_chunked_report_keeps_single_layout(report_dirs, monkeypatch, capsys):
+    """Un grupo de programas ocupa las mismas páginas que en el informe de un solo documento.
+
+    Solo se añaden las páginas donde empiezan los programas tras los
+    encabezados de las secciones 2 y 3, que tienen su propio fragmento.
+    """
+    monkeypatch.setitem(PDF_CONFIG, 'chunk_programs', 4)
+    page_counts = []
+    for name, build in (("single.pdf", PDFGenerator.build_single), ("chunked.pdf", PDFGenerator.build_chunked)):
+        generator = PDFGenerator(str(report_dirs / name))
+        for number in range(3):
+            generator.add_program(program_info(f"programa{number}", "2024-01-01 10:00:00"), "general")
+        build(generator)
+        page_counts.append(len(PdfReader(str(report_dirs / name)).pages))
+    capsys.readouterr()
+    assert page_counts[0] <= page_counts[1] <= page_counts[0] + 2
+
+def test_changed_program_renders_only_its_group(report_dirs, monkeypatch, capsys):
+    """Los encabezados de las secciones no forman parte de la clave del primer grupo."""
+    monkeypatch.setitem(PDF_CONFIG, 'chunk_programs', 1)
+    build_report(report_dirs / "a.pdf", "2024-01-01 10:00:00", capsys)
+
+    generator = PDFGenerator(str(report_dirs / "b.pdf"))
+    generator.add_program(program_info("suma", "2024-01-01 10:00:00"), "general")
+    generator.add_program(program_info("cociente", "2024-01-01 10:00:00"), "vector")
+    capsys.readouterr()
+    assert generator.save()
+    assert "1 de la caché, 1 renderizados" in capsys.readouterr().out
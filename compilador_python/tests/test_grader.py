@@ -0,0 +1,103 @@
+"""
+Pruebas del calificador: veredictos y claves de la caché de ejecuciones.
+"""
+
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from config.settings import ALLOC_CONFIG, EXECUTION_CONFIG
+from core.cache import RunCache
+from core.compiler import CppCompiler
+from core.grader import Grader, VERDICT_ACCEPTED, VERDICT_WRONG_ANSWER, VERDICT_TIME_LIMIT, VERDICT_RUNTIME_ERROR
+from utils.pdf_generator import PDFGenerator
+
+pytestmark = pytest.mark.skipif(shutil.which("g++") is None or os.name != "posix",
+                                reason="requiere g++ en un sistema POSIX")
+
+ECHO = "#include <iostream>\nint main() { int n; std::cin >> n; std::cout << n * 2 << std::endl; }"
+
+# Programas cuyo veredicto para el caso "21" -> "42" se conoce
+VERDICT_PROGRAMS = {
+    "echo": (ECHO, VERDICT_ACCEPTED),
+    "off_by_one": ("#include <iostream>\nint main() { int n; std::cin >> n; std::cout << n * 2 + 1; }",
+                   VERDICT_WRONG_ANSWER),
+    "spin": ("int main() { volatile unsigned long x = 0; for (;;) x++; }", VERDICT_TIME_LIMIT),
+    "crash": ("#include <cstdlib>\nint main() { std::abort(); }", VERDICT_RUNTIME_ERROR),
+    "exit_code": ("int main() { return 3; }", VERDICT_RUNTIME_ERROR)
+}
+
+@pytest.fixture
+def echo(tmp_path):
+    source_path = tmp_path / "echo.cpp"
+    source_path.write_text(ECHO)
+    executable = str(tmp_path / "echo")
+    subprocess.run(["g++", "-O1", str(source_path), "-o", executable], check=True)
+    (tmp_path / "1.in").write_text("21\n")
+    (tmp_path / "1.out").write_text("42\n")
+    return executable, ("1", str(tmp_path / "1.in"), str(tmp_path / "1.out"))
+
+@pytest.fixture
+def grader(tmp_path):
+    compiler = CppCompiler()
+    compiler.run_cache = RunCache(str(tmp_path / "run"))
+    return Grader(compiler, cases_root=str(tmp_path), jobs=1)
+
+@pytest.mark.parametrize("name", VERDICT_PROGRAMS)
+def test_verdicts(name, echo, grader, tmp_path):
+    source, expected = VERDICT_PROGRAMS[name]
+    source_path = tmp_path / f"{name}.cpp"
+    source_path.write_text(source)
+    executable = str(tmp_path / name)
+    subprocess.run(["g++", "-O1", str(source_path), "-o", executable], check=True)
+
+    grader.compiler.run_cache = None
+    grader.compiler.timeout = 5
+    grader.compiler.cpu_timeout = 1
+    _, case = echo
+    result = grader.run_case(executable, case)
+    assert result["verdict"] == expected
+    if expected == VERDICT_WRONG_ANSWER:
+        assert "se esperaba '42' y se obtuvo '43'" in result["detail"]
+
+def test_run_key_is_stable(echo, grader):
+    executable, _ = echo
+    limits = grader.compiler.get_run_limits(mode="pipe", alloc_tracking=False)
+    first = grader.compiler.run_cache.make_key(executable, b"21\n", limits=limits)
+    second = grader.compiler.run_cache.make_key(executable, b"21\n", limits=dict(limits))
+    assert first == second
+    # Otro proceso (otra instancia de la caché) calcula la misma clave
+    assert RunCache(grader.compiler.run_cache.directory).make_key(executable, b"21\n", limits=limits) == first
+    other = grader.compiler.get_run_limits(mode="pty", alloc_tracking=False)
+    assert grader.compiler.run_cache.make_key(executable, b"21\n", limits=other) != first
+
+def test_grader_key_ignores_report_mode(echo, grader, monkeypatch):
+    """El calificador siempre ejecuta en modo pipe: el modo del informe no cambia su clave."""
+    executable, case = echo
+    monkeypatch.setitem(EXECUTION_CONFIG, "mode", "pty")
+    monkeypatch.setitem(ALLOC_CONFIG, "enabled", True)
+    assert grader.run_case(executable, case)["verdict"] == VERDICT_ACCEPTED
+
+    monkeypatch.setitem(EXECUTION_CONFIG, "mode", "pipe")
+    monkeypatch.setitem(ALLOC_CONFIG, "enabled", False)
+    monkeypatch.setattr(grader.executor, "run", lambda *args, **kwargs: pytest.fail("no usó la caché"))
+    assert grader.run_case(executable, case)["verdict"] == VERDICT_ACCEPTED
+
+def test_grading_report_has_only_verdicts(echo, grader, tmp_path, capsys):
+    """Sin programas agregados, el informe de --grade no tiene secciones vacías."""
+    pypdf = pytest.importorskip("pypdf")
+    executable, case = echo
+    grader.compiler.run_cache = None
+    verdicts = [grader.run_case(executable, case)]
+    grader.compiler.pdf = PDFGenerator(str(tmp_path / "veredictos.pdf"))
+    grader.compiler.pdf.add_grading(grader.build_result(str(tmp_path / "echo.cpp"), {"success": True}, verdicts))
+    assert grader.compiler.pdf.save()
+
+    assert "Advertencia" not in capsys.readouterr().out
+    text = "".join(page.extract_text() for page in pypdf.PdfReader(str(tmp_path / "veredictos.pdf")).pages)
+    assert "veredictos de 1 programa C++ calificado" in text
+    assert "0 programas" not in text
+    assert "SECCIÓN 1" not in text and "SECCIÓN 3" not in text
+    assert "echo (1/1)" in text
@@ -0,0 +1,30 @@
+"""
+Pruebas del resaltado de sintaxis del código en el informe PDF.
+"""
+
+import pytest
+
+from utils.pdf_generator import PDFGenerator, SYNTAX_COLORS
+
+@pytest.fixture(scope="module")
+def generator():
+    return PDFGenerator("/dev/null")
+
+def colored(text, kind):
+    return f'<font color="{SYNTAX_COLORS[kind]}">{text}</font>'
+
+def test_multiline_tokens_keep_their_color(generator):
+    source = 'auto s = R"(uno\n"int" 42\n)";\n/* int\n   return */ int x;\nreturn 0;'
+    lines = generator.highlight_cpp_code(source).split('<br/>')
+    assert len(lines) == len(source.split('\n'))
+    assert lines[1] == colored('"int" 42', 'string')
+    assert lines[2] == colored(')"', 'string') + ';'
+    assert lines[4] == colored('   return */', 'comment') + ' ' + colored('int', 'keyword') + ' x;'
+    assert lines[5] == colored('return', 'keyword') + ' ' + colored('0', 'number') + ';'
+
+def test_repeated_lines_are_memoized(generator):
+    generator.highlight_cpp_code("int main() {\n    return 0;\n}")
+    assert generator._highlight_memo["    return 0;"] == "    " + colored('return', 'keyword') + ' ' + colored('0', 'number') + ';'
+    # Una línea dentro de un comentario de varias líneas no se recuerda
+    generator.highlight_cpp_code("/* a\nint y = 1;\n*/")
+    assert "int y = 1;" not in generator._highlight_memo
@@ -0,0 +1,83 @@
+"""
+Pruebas de la generación automática de la entrada estándar.
+"""
+
+from core.input_generator import InputGenerator
+
+ARRAY = """int main() {
+    int n;
+    cin >> n;
+    int v[100];
+    for (int i = 0; i < n; i++) cin >> v[i];
+}"""
+
+MATRIX = """int main() {
+    int filas, columnas;
+    cin >> filas >> columnas;
+    int m[10][10];
+    for (int i = 0; i < filas; i++)
+        for (int j = 0; j < columnas; j++)
+            cin >> m[i][j];
+}"""
+
+MENU = """int main() {
+    int opcion;
+    do {
+        cin >> opcion;
+        switch (opcion) {
+            case 1: { int x; cin >> x; break; }
+            case 2: cout << "Listar"; break;
+            case 3: cout << "Salir"; break;
+        }
+    } while (opcion != 3);
+}"""
+
+def values(text):
+    return text.splitlines()
+
+def test_same_seed_same_input():
+    assert InputGenerator(seed=7).generate(ARRAY) == InputGenerator(seed=7).generate(ARRAY)
+    assert InputGenerator(seed=7).generate(MATRIX) != InputGenerator(seed=8).generate(MATRIX)
+
+def test_count_sizes_the_array():
+    lines = values(InputGenerator(seed=7).generate(ARRAY))
+    count = int(lines[0])
+    assert len(lines) == 1 + count
+    elements = [int(value) for value in lines[1:]]
+    assert elements == sorted(set(elements))  # Estrictamente creciente
+
+def test_forced_size():
+    lines = values(InputGenerator(seed=7).generate(ARRAY, size=6))
+    assert lines[0] == "6"
+    assert len(lines) == 7
+
+def test_literal_size_without_count():
+    code = "int main() { int v[5]; for (int i = 0; i < 5; i++) cin >> v[i]; }"
+    assert len(values(InputGenerator(seed=7).generate(code))) == 5
+
+def test_matrix_shape():
+    lines = values(InputGenerator(seed=7).generate(MATRIX))
+    rows, columns = int(lines[0]), int(lines[1])
+    assert len(lines) == 2 + rows * columns
+
+def test_getline_reads_a_line():
+    code = "int main() { string nombre; int edad; getline(cin, nombre); cin >> edad; }"
+    name, age = values(InputGenerator(seed=7).generate(code))
+    assert name in InputGenerator.LINES
+    assert age.isdigit()
+
+def test_scanf_types():
+    code = 'int main() { int a; double b; char c; scanf("%d %lf %c", &a, &b, &c); }'
+    a, b, c = values(InputGenerator(seed=7).generate(code))
+    assert a.isdigit()
+    assert "." in b and float(b) >= 1
+    assert len(c) == 1 and c.isalpha()
+
+def test_menu_visits_each_option_then_exits():
+    lines = values(InputGenerator(seed=7).generate(MENU))
+    assert lines[0] == "1"
+    assert lines[1].isdigit()  # La lectura del case 1
+    assert lines[2:] == ["2", "3"]
+
+def test_no_reads_no_input():
+    assert InputGenerator(seed=7).generate('int main() { cout << "hola"; }') == ""
@@ -0,0 +1,33 @@
+"""
+Pruebas de la detección de punteros por contexto de tokens.
+"""
+
+import pytest
+
+from core.lexer import uses_pointers
+
+@pytest.mark.parametrize("source", [
+    "int main() { int x = 1; int *p = &x; return *p; }",
+    "void f(const char* s);",
+    "struct Nodo { int valor; Nodo *siguiente; };",
+    "class Lista {\npublic:\n    Nodo* cabeza;\n};",
+    "int main() { std::string* s = nullptr; }",
+    "int main() { std::vector<int>* v = 0; }",
+    "int main() { int **m; }",
+    "int main() { int* v = new int[10]; delete[] v; }",
+    "void f(Nodo n) { n.a->b = 0; }",
+])
+def test_detects_pointers(source):
+    assert uses_pointers(source)
+
+@pytest.mark.parametrize("source", [
+    "int main() { int a = 2, b = 3; int c = a * b; return c; }",
+    "int main() { int a = 2; std::cout << a * a << std::endl; }",
+    "int area(int b, int h) { return b * h / 2; }",
+    "int main() { int x = 5; int y = x & 1; bool z = x && y; }",
+    "void intercambiar(int &a, int &b) { int t = a; a = b; b = t; }",
+    "int main() { int c = 1 ? 2 : c * 3; int n = sizeof(int) * 4; }",
+    "// Nodo *p = new Nodo;\nint main() { std::cout << \"a->b\"; }",
+])
+def test_ignores_other_operators(source):
+    assert not uses_pointers(source)
@@ -0,0 +1,54 @@
+"""
+Pruebas de la captura acotada de la salida de los programas.
+"""
+
+import gzip
+import os
+
+from core.output_capture import OutputCapture
+
+def test_short_output_is_kept_whole(tmp_path):
+    spill_path = str(tmp_path / "salida.gz")
+    capture = OutputCapture(16, 16, spill_path)
+    capture.feed(b"hola\n")
+    capture.feed(b"mundo\n")
+    capture.close()
+
+    assert capture.text() == "hola\nmundo\n"
+    assert not capture.truncated
+    assert capture.summary("stdout") == {
+        "stdout": "hola\nmundo\n", "stdout_bytes": 11, "stdout_truncated": False, "stdout_spill": None
+    }
+    # Sin truncamiento no queda el volcado
+    assert not os.path.exists(spill_path)
+
+def test_long_output_keeps_head_and_tail(tmp_path):
+    spill_path = str(tmp_path / "salida.gz")
+    capture = OutputCapture(10, 10, spill_path)
+    data = b"".join(b"%04d\n" % number for number in range(1000))
+    for start in range(0, len(data), 7):  # Bloques que no coinciden con las líneas
+        capture.feed(data[start:start + 7])
+    capture.close()
+
+    assert capture.truncated
+    assert capture.total_bytes == len(data)
+    assert capture.omitted_bytes == len(data) - 20
+    assert bytes(capture.head) == data[:10]
+    assert bytes(capture.tail) == data[-10:]
+
+    text = capture.text()
+    assert text.startswith("0000\n0001\n")
+    assert text.endswith("0998\n0999\n")
+    assert f"se omitieron {len(data) - 20} de {len(data)} bytes" in text
+    assert "salida.gz" in text
+
+    # El volcado tiene la salida completa
+    with gzip.open(spill_path, 'rb') as f:
+        assert f.read() == data
+
+def test_block_larger_than_tail():
+    capture = OutputCapture(4, 3)
+    capture.feed(b"abcdefghij")
+    assert bytes(capture.head) == b"abcd"
+    assert bytes(capture.tail) == b"hij"
+    assert capture.summary("stderr")["stderr_spill"] is None
@@ -0,0 +1,113 @@
+"""
+Pruebas del agrupamiento de programas casi idénticos.
+"""
+
+import random
+
+from config.settings import SIMILARITY_CONFIG
+from core.similarity import SimilarityIndex
+
+ORIGINAL = """#include <iostream>
+#include <vector>
+using namespace std;
+
+int main() {
+    int n;
+    cin >> n;
+    vector<int> numeros(n);
+    for (int i = 0; i < n; i++) {
+        cin >> numeros[i];
+    }
+    int suma = 0;
+    for (int i = 0; i < n; i++) {
+        suma += numeros[i];
+    }
+    cout << "Suma: " << suma << endl;
+    return 0;
+}
+"""
+
+# La misma solución con otros nombres, otro texto y otros comentarios
+RENAMED = """#include <iostream>
+#include <vector>
+using namespace std;
+
+// Suma los valores leídos
+int main() {
+    int cantidad;
+    cin >> cantidad;
+    vector<int> valores(cantidad);
+    for (int k = 0; k < cantidad; k++) {
+        cin >> valores[k];
+    }
+    int total = 0;
+    for (int k = 0; k < cantidad; k++) {
+        total += valores[k];
+    }
+    cout << "Total = " << total << endl;
+    return 0;
+}
+"""
+
+DIFFERENT = """#include <iostream>
+#include <string>
+using namespace std;
+
+class Cuenta {
+public:
+    string titular;
+    double saldo = 0;
+    bool retirar(double monto) {
+        if (monto > saldo) return false;
+        saldo -= monto;
+        return true;
+    }
+};
+
+int main() {
+    Cuenta cuenta;
+    cuenta.titular = "Ana";
+    while (true) {
+        double monto;
+        if (!(cin >> monto)) break;
+        cout << (cuenta.retirar(monto) ? "ok" : "sin saldo") << endl;
+    }
+}
+"""
+
+def test_renamed_copies_cluster(tmp_path):
+    index = SimilarityIndex(str(tmp_path / "index"))
+    paths = {name: str(tmp_path / f"{name}.cpp") for name in ("original", "copia", "otro")}
+    index.add(paths["original"], ORIGINAL)
+    index.add(paths["copia"], RENAMED)
+    index.add(paths["otro"], DIFFERENT)
+
+    clusters = index.clusters(threshold=0.8)
+    assert len(clusters) == 1
+    assert clusters[0]["members"] == sorted([paths["original"], paths["copia"]])
+    assert clusters[0]["max_similarity"] >= 0.8
+
+def test_large_bucket_finds_non_adjacent_copies(tmp_path, monkeypatch):
+    """En un cubo grande, un primer miembro distinto no esconde las copias que no son vecinas."""
+    monkeypatch.setitem(SIMILARITY_CONFIG, 'max_bucket_pairs', 4)
+    index = SimilarityIndex(str(tmp_path / "index"))
+    generator = random.Random(7)
+
+    def random_signature():
+        return [generator.getrandbits(32) for _ in range(index.num_perm)]
+
+    base = random_signature()
+    near_copy = list(base)
+    near_copy[:4] = random_signature()[:4]
+
+    # Ordenados: el intruso primero y las dos copias separadas por otros programas
+    signatures = {"a_intruso": random_signature(), "b_copia": base, "e_copia": near_copy}
+    for name in ("c_otro", "d_otro", "f_otro", "g_otro"):
+        signatures[name] = random_signature()
+    paths = {name: str(tmp_path / f"{name}.cpp") for name in signatures}
+    for name, signature in signatures.items():
+        index.documents[paths[name]] = {"hash": name, "signature": signature}
+    index.buckets[0]["cubo"] = set(paths.values())
+
+    clusters = index.clusters(threshold=0.8)
+    assert [cluster["members"] for cluster in clusters] == [sorted([paths["b_copia"], paths["e_copia"]])]
@@ -0,0 +1,56 @@
+"""
+Pruebas de la zona de volcado del modo streaming del informe.
+"""
+
+from utils.spill import SpillFile, SpilledStory
+
+def test_spill_file_roundtrip(tmp_path):
+    spill_file = SpillFile(str(tmp_path))
+    assert len(spill_file) == 0
+    assert list(spill_file) == []
+
+    items = [["código", 1], {"programa": "suma"}, ("x" * 10000, None)]
+    for item in items:
+        spill_file.append(item)
+    assert len(spill_file) == 3
+    assert list(spill_file) == items
+    assert list(spill_file) == items  # Se puede recorrer más de una vez
+
+    spill_file.append("último")
+    assert list(spill_file)[-1] == "último"
+
+    spill_file.close()
+    assert len(spill_file) == 0
+    assert list(tmp_path.iterdir()) == []
+
+def test_spilled_story_loads_parts_on_demand():
+    loaded = []
+
+    def parts():
+        for part in (["a", "b"], ["c"], ["d", "e"]):
+            loaded.append(part)
+            yield part
+
+    story = SpilledStory(parts(), 5)
+    assert len(story) == 5
+    assert loaded == []
+
+    # Como SimpleDocTemplate.build: leer y quitar el primero
+    assert story[0] == "a"
+    del story[0]
+    assert len(loaded) == 1
+    assert len(story) == 4
+
+    # Un flowable partido vuelve al principio
+    story.insert(0, "b2")
+    story[1] = "b1"
+    assert story[0:2] == ["b2", "b1"]
+    assert len(story) == 5
+    assert len(loaded) == 1
+
+    consumed = []
+    while len(story):
+        consumed.append(story[0])
+        del story[0]
+    assert consumed == ["b2", "b1", "c", "d", "e"]
+    assert len(loaded) == 3
@@ -5,7 +5,17 @@ Módulo para generar documentos PDF con los resultados de la compilación.
 import os
 import io
 import re
+import json
+import math
+import hashlib
+import itertools
+import contextlib
+import tempfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import reportlab
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image as ReportLabImage, PageBreak, Table, TableStyle
@@ -19,7 +29,166 @@ from reportlab.pdfbase.ttfonts import TTFont
 from PIL import Image as PILImage
 import traceback
 
-from config.settings import PDF_CONFIG, EXERCISE_TYPES, GUI_CONFIG
+# pypdf une los fragmentos renderizados en paralelo; sin él, el informe se
+# construye como un solo documento en este proceso
+try:
+    from pypdf import PdfReader, PdfWriter
+    USING_PYPDF = True
+except ImportError:
+    USING_PYPDF = False
+
+from config.settings import PDF_CONFIG, EXERCISE_TYPES, GUI_CONFIG, TEMP_DIR, CACHE_CONFIG
+from core import alloc_tracker, complexity, lexer
+from core.cache import FragmentCache
+from core.complexity import format_complexity
+from core.alloc_tracker import format_bytes
+from core.lexer import tokenize, code_view, summarize, uses_pointers as detect_pointers
+from utils import spill
+from utils.spill import SpillFile, SpilledStory
+
+# Colores del resaltado de sintaxis (tema oscuro de VS Code)
+SYNTAX_COLORS = {
+    "comment": "#6A9955",
+    "string": "#CE9178",
+    "preprocessor": "#C586C0",
+    "keyword": "#569CD6",
+    "stl": "#4EC9B0",
+    "number": "#B5CEA8"
+}
+
+# Líneas resaltadas que se recuerdan (se vacía al llenarse)
+HIGHLIGHT_MEMO_SIZE = 8192
+
+# Metadatos del informe (los fragmentos los repiten y el PDF unido los conserva)
+DOCUMENT_INFO = {
+    "title": "Recopilación de Programas C++",
+    "author": "Compilador C++ Avanzado",
+    "subject": "Programas C++ compilados",
+    "creator": "Compilador C++ Avanzado"
+}
+
+# Secciones del informe, en el orden de create_program_sections
+SECTION_NAMES = ("code", "results", "analysis")
+
+# Generador de cada proceso del pool (se crea con el primer fragmento)
+_chunk_generator = None
+
+def draw_page_number(canv, number):
+    """Dibuja el número de página centrado en el margen inferior."""
+    canv.saveState()
+    canv.setFont('Helvetica', 8)
+    canv.setFillColor(colors.grey)
+    canv.drawCentredString(A4[0] / 2, 0.25*inch, f"Página {number}")
+    canv.restoreState()
+
+def number_page(canv, doc):
+    """Numera cada página al construir el informe como un solo documento."""
+    draw_page_number(canv, doc.page)
+
+def map_in_order(pool, function, items, window):
+    """Como pool.map, pero sin leer todos los items de antemano.
+
+    Mantiene a lo sumo window tareas enviadas y genera los pares (item,
+    resultado) en el orden de los items.
+    """
+    pending = deque()
+    for item in items:
+        pending.append((item, pool.submit(function, item)))
+        if len(pending) >= window:
+            item, future = pending.popleft()
+            yield item, future.result()
+    while pending:
+        item, future = pending.popleft()
+        yield item, future.result()
+
+def get_renderer_version():
+    """Devuelve un hash del código y la configuración de los que depende el aspecto de un fragmento.
+
+    Cambia con cualquier modificación del generador, del resaltado, de los
+    formatos de complejidad y memoria o de los estilos configurados, e
+    invalida así los fragmentos guardados en la caché.
+    """
+    # jobs y streaming cambian cómo se construye el informe, no su aspecto; con
+    # chunk_programs cambian los programas de cada grupo, que ya forman su clave
+    styles = {key: value for key, value in PDF_CONFIG.items() if key not in ("jobs", "streaming", "chunk_programs")}
+    digest = hashlib.sha256()
+    digest.update(json.dumps([styles, EXERCISE_TYPES, reportlab.Version], sort_keys=True, default=str).encode('utf-8'))
+    for module_path in (__file__, lexer.__file__, complexity.__file__, alloc_tracker.__file__, spill.__file__):
+        with open(module_path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+def render_program_chunks(task):
+    """Renderiza en un proceso del pool los fragmentos de un grupo de programas, uno por sección.
+
+    Los programas del grupo comparten fragmento, así que dentro de cada
+    sección siguen uno tras otro en la misma página, como en el informe de un
+    solo documento.
+
+    Args:
+        task (tuple): (directorio, número del grupo, lista de (program_info,
+            style_type)). El fragmento de código del primer grupo empieza con
+            el título de la sección 1; los encabezados de las otras secciones
+            dependen de todos los programas y se renderizan aparte
+            (build_chunked), así que los fragmentos de un grupo solo
+            dependen de sus programas.
+
+    Returns:
+        tuple: (fragmentos, mensajes). fragmentos es la lista (ruta, páginas,
+            inicios) de cada sección, con ruta None y 0 páginas si la sección
+            está vacía; inicios es la página del fragmento donde empieza cada
+            programa del grupo (None si no aparece en la sección). mensajes
+            es el texto que el proceso habría escrito en la consola, para que
+            el proceso principal lo muestre en orden sin mezclarlo con el de
+            otros procesos
+    """
+    global _chunk_generator
+    directory, number, programs = task
+    messages = io.StringIO()
+    with contextlib.redirect_stdout(messages), contextlib.redirect_stderr(messages):
+        if _chunk_generator is None:
+            _chunk_generator = PDFGenerator(os.devnull)
+        generator = _chunk_generator
+        
+        sections = [[] for _ in SECTION_NAMES]
+        for offset, (program_info, style_type) in enumerate(programs):
+            program_sections = generator.create_program_sections(program_info, style_type)
+            for elements, program_elements in zip(sections, program_sections):
+                if program_elements:
+                    elements.append(ProgramMark(offset))
+                    elements.extend(program_elements)
+        if number == 0:
+            sections[0] = generator.create_section_intro("code") + sections[0]
+        
+        chunks = []
+        for name, elements in zip(SECTION_NAMES, sections):
+            starts = [None] * len(programs)
+            trim_chunk(elements)
+            if not elements:
+                chunks.append((None, 0, starts))
+                continue
+            path = os.path.join(directory, f"{number:06d}_{name}.pdf")
+            chunks.append((path, generator.render_chunk(elements, path, starts), starts))
+    return chunks, messages.getvalue()
+
+def trim_chunk(elements):
+    """Quita los espacios y saltos de página del final de un fragmento.
+
+    El fragmento siguiente empieza siempre en una página nueva: un salto o un
+    Spacer al final solo añadiría una página en blanco cuando el contenido
+    llena justo la última.
+    """
+    while elements and isinstance(elements[-1], (Spacer, PageBreak)):
+        elements.pop()
+    return elements
+
+def escape_markup(text):
+    """Escapa &, < y > para el marcado de los párrafos de ReportLab."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def colored_markup(text, color):
+    """Devuelve el texto escapado dentro de una etiqueta <font> del color indicado."""
+    return f'<font color="{color}">{escape_markup(text)}</font>' if text else ''
 
 class CppLogo(Flowable):
     """Un flowable personalizado para dibujar el logo de C++."""
@@ -51,6 +220,20 @@ class CppLogo(Flowable):
         # Restaurar estado
         self.canv.restoreState()
 
+class ProgramMark(Flowable):
+    """Marca invisible delante de los elementos de cada programa de un fragmento.
+
+    render_chunk anota la página del primer elemento que se dibuja después de
+    la marca, que es donde empieza el programa.
+    """
+    
+    def __init__(self, number):
+        Flowable.__init__(self)
+        self.number = number
+    
+    def draw(self):
+        pass
+
 class PDFGenerator:
     """Clase para generar documentos PDF con los resultados de la compilación."""
     
@@ -59,9 +242,12 @@ class PDFGenerator:
         self.output_path = output_path
         self.elements = []
         self.programs = []  # Lista para almacenar información de programas para el índice
-        self.code_elements = []  # Nueva lista para elementos de código
-        self.results_elements = []  # Nueva lista para elementos de resultados
-        self.analysis_elements = []  # Nueva lista para elementos de análisis
+        self.grading_results = []  # Veredictos de los casos de prueba (modo --grade)
+        self.benchmark_results = []  # Mediciones de rendimiento (modo --benchmark)
+        # (program_info, style_type) de cada programa, en orden; en modo
+        # streaming se vuelcan a disco en lugar de quedar en memoria
+        self.streaming = PDF_CONFIG['streaming']
+        self.program_records = SpillFile() if self.streaming else []
         self.setup_styles()
         
         # Patrones para la coloración de sintaxis de C++
@@ -83,19 +269,23 @@ class PDFGenerator:
                 'algorithm', 'iostream', 'fstream', 'sstream', 'iomanip', 'array', 'tuple'
             ]
         }
+        self._highlight_keywords = frozenset(self.cpp_syntax['keywords'])
+        self._highlight_stl = frozenset(item.rstrip(':') for item in self.cpp_syntax['stl'])
+        self._highlight_memo = {}  # {línea sin tokens de varias líneas: marcado}
         
         # Crear el documento con márgenes reducidos
-        self.doc = SimpleDocTemplate(
-            output_path,
+        self.doc = self.create_document(output_path)
+    
+    def create_document(self, path):
+        """Crea una plantilla de documento con el formato del informe (también para los fragmentos)."""
+        return SimpleDocTemplate(
+            path,
             pagesize=A4,  # A4 es ligeramente más alto que letter, optimizando espacio
             rightMargin=0.5*inch,  # Reducir márgenes
             leftMargin=0.5*inch,
             topMargin=0.5*inch,
             bottomMargin=0.5*inch,
-            title="Recopilación de Programas C++",
-            author="Compilador C++ Avanzado",
-            subject="Programas C++ compilados",
-            creator="Compilador C++ Avanzado"
+            **DOCUMENT_INFO
         )
     
     def setup_styles(self):
@@ -192,6 +382,21 @@ class PDFGenerator:
             borderRadius=3
         ))
         
+        self.styles.add(ParagraphStyle(
+            name='TerminalTranscript',
+            parent=self.styles['Code'],
+            fontName='Courier',
+            fontSize=8,
+            leading=10,
+            leftIndent=10,
+            rightIndent=10,
+            spaceBefore=6,
+            spaceAfter=6,
+            textColor=colors.HexColor("#F2F2F2"),
+            backColor=colors.HexColor("#1C1C1E"),
+            borderPadding=6
+        ))
+        
         self.styles.add(ParagraphStyle(
             name='TableHeader',
             parent=self.styles['Normal'],
@@ -222,6 +427,66 @@ class PDFGenerator:
             alignment=TA_CENTER
         ))
         
+        # Estilos de la sección de código y del análisis, compartidos por todos
+        # los programas (la hoja de estilos no crece con el lote)
+        self.styles.add(ParagraphStyle(
+            name='CodeHeader',
+            parent=self.styles['SectionHeader'],
+            fontSize=12,
+            fontName='Courier-Bold',
+            textColor=colors.black,
+            alignment=TA_LEFT,
+            spaceBefore=5,
+            spaceAfter=2,
+            backColor=colors.white,
+            borderWidth=0,
+            borderPadding=4
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='CopyInstructions',
+            parent=self.styles['ProgramInfo'],
+            fontSize=9,
+            alignment=TA_LEFT,
+            textColor=colors.HexColor('#777777'),
+            spaceBefore=0,
+            spaceAfter=3,
+            backColor=colors.white,
+            borderWidth=0,
+            borderPadding=0
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='SyntaxHighlightedCode',
+            parent=self.styles['CodeStyle'],
+            fontSize=11,
+            fontName='Courier',
+            spaceBefore=10,
+            spaceAfter=5,
+            leftIndent=10,
+            rightIndent=10,
+            backColor=colors.white,
+            borderWidth=1,
+            borderColor=colors.HexColor("#CCCCCC"),
+            borderPadding=8,
+            borderRadius=0,
+            leading=14,
+            wordWrap=False
+        ))
+        
+        self.styles.add(ParagraphStyle(
+            name='AnalysisText',
+            parent=self.styles['CustomBody'],
+            fontSize=10,
+            leading=14,
+            spaceBefore=4,
+            spaceAfter=4,
+            leftIndent=10
+        ))
+        
+        # Variantes de los estilos anteriores, una por combinación de parámetros
+        self._derived_styles = {}
+        
         # Configurar el documento
         self.doc = SimpleDocTemplate(
             self.output_path,
@@ -232,6 +497,56 @@ class PDFGenerator:
             bottomMargin=0.5*inch
         )
     
+    def derived_style(self, base_name, **overrides):
+        """Devuelve una variante de un estilo con otros parámetros, creándola una sola vez.
+        
+        Las variantes no se agregan a la hoja de estilos: se recuerdan por el
+        estilo base y los parámetros, así que hay tantas como combinaciones
+        distintas y no una por programa.
+        
+        Args:
+            base_name (str): Nombre del estilo base en la hoja de estilos
+            **overrides: Parámetros de ParagraphStyle que cambian
+            
+        Returns:
+            ParagraphStyle: El estilo base si no hay cambios, o la variante
+        """
+        if not overrides:
+            return self.styles[base_name]
+        key = (base_name, tuple(sorted(overrides.items())))
+        style = self._derived_styles.get(key)
+        if style is None:
+            style = ParagraphStyle(
+                name=f"{base_name}_{len(self._derived_styles) + 1}",
+                parent=self.styles[base_name],
+                **overrides
+            )
+            self._derived_styles[key] = style
+        return style
+    
+    def get_code_style(self, source_code):
+        """Devuelve el estilo del código de un programa.
+        
+        El código no se corta en varias líneas (wordWrap=False), así que si la
+        línea más larga no cabe en el ancho de la página se reduce la letra en
+        pasos de medio punto, hasta PDF_CONFIG['min_code_font_size'].
+        """
+        base = self.styles['SyntaxHighlightedCode']
+        # El párrafo junta los espacios seguidos, como al dibujarlo
+        longest = max((len(' '.join(line.split())) for line in source_code.split('\n')), default=0)
+        available = self.doc.width - base.leftIndent - base.rightIndent - 2 * base.borderPadding
+        char_width = pdfmetrics.stringWidth('M', base.fontName, base.fontSize)
+        if longest * char_width <= available:
+            return base
+        
+        font_size = math.floor(2 * base.fontSize * available / (longest * char_width)) / 2
+        font_size = max(font_size, PDF_CONFIG['min_code_font_size'])
+        return self.derived_style(
+            'SyntaxHighlightedCode',
+            fontSize=font_size,
+            leading=round(font_size * base.leading / base.fontSize, 1)
+        )
+    
     def create_cover_page(self):
         """Crea la página de portada y retorna los elementos."""
         elements = []
@@ -254,6 +569,14 @@ class PDFGenerator:
         
         # Resumen de contenido (más compacto)
         elements.append(Spacer(1, 0.2*inch))  # Reducido de 0.5 inch a 0.2 inch
+        if not self.programs and self.grading_results:
+            # Informe de calificación (--grade): solo la tabla de veredictos
+            n_graded = len(self.grading_results)
+            elements.append(Paragraph(
+                f"Este informe contiene los veredictos de {n_graded} programa{'s' if n_graded != 1 else ''} C++ calificado{'s' if n_graded != 1 else ''} con casos de prueba.",
+                self.styles['CustomBody']
+            ))
+            return elements
         n_programs = len(self.programs)
         elements.append(Paragraph(
             f"Este informe contiene {n_programs} programa{'s' if n_programs != 1 else ''} C++ con sus respectivos códigos fuente y resultados de ejecución.",
@@ -280,28 +603,38 @@ class PDFGenerator:
         
         return elements
     
-    def update_index(self):
-        """Crea o actualiza el índice con los programas procesados."""
+    def create_index(self, pages=None):
+        """Crea el índice con los programas procesados.
+
+        Args:
+            pages (list): Página donde empieza cada sección de cada programa
+                ((código, resultados, análisis), None si la sección no existe).
+                Sin pages el índice no lleva números de página.
+        """
         if not self.programs:
-            return
+            return []
+        
+        elements = []
         
         # Añadir título del índice (más compacto)
-        self.elements.append(Spacer(1, 0.1*inch))  # Añade un pequeño espacio
-        self.elements.append(Paragraph(
+        elements.append(Spacer(1, 0.1*inch))  # Añade un pequeño espacio
+        elements.append(Paragraph(
             "Índice de Programas",
             self.styles['CustomHeading']
         ))
         
         # Añadir descripción más compacta
-        self.elements.append(Paragraph(
+        elements.append(Paragraph(
             "La siguiente tabla muestra los programas incluidos en este informe:",
             self.styles['CustomBody']
         ))
         
-        self.elements.append(Spacer(1, 0.1*inch))  # Reducido de 0.2 inch a 0.1 inch
+        elements.append(Spacer(1, 0.1*inch))  # Reducido de 0.2 inch a 0.1 inch
         
         # Datos para la tabla de índice
         data = [["Nº", "Programa", "Tipo"]]
+        if pages:
+            data[0].extend(["Código", "Resultado", "Análisis"])
         
         for i, program in enumerate(self.programs, 1):
             row = [
@@ -309,10 +642,15 @@ class PDFGenerator:
                 program['name'],
                 program['type'].capitalize()
             ]
+            if pages:
+                row.extend(str(page) if page else "-" for page in pages[i - 1])
             data.append(row)
         
         # Crear tabla
-        col_widths = [0.5*inch, 4*inch, 1.5*inch]
+        if pages:
+            col_widths = [0.5*inch, 3.2*inch, 1.2*inch, 0.7*inch, 0.8*inch, 0.7*inch]
+        else:
+            col_widths = [0.5*inch, 4*inch, 1.5*inch]
         table = Table(data, colWidths=col_widths)
         
         # Estilo de tabla (igual que antes)
@@ -328,7 +666,7 @@ class PDFGenerator:
             ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
             ('ALIGN', (0, 1), (0, -1), 'CENTER'),
             ('ALIGN', (1, 1), (1, -1), 'LEFT'),
-            ('ALIGN', (2, 1), (2, -1), 'CENTER'),
+            ('ALIGN', (2, 1), (-1, -1), 'CENTER'),
             ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
             ('FONTSIZE', (0, 1), (-1, -1), 10),
             ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
@@ -340,21 +678,238 @@ class PDFGenerator:
         table.setStyle(table_style)
         
         # Añadir la tabla al documento
-        self.elements.append(table)
-        self.elements.append(Spacer(1, 0.2*inch))  # Reducido de 0.3 inch a 0.2 inch
+        elements.append(table)
+        elements.append(Spacer(1, 0.2*inch))  # Reducido de 0.3 inch a 0.2 inch
+        return elements
+    
+    def create_resources_table(self):
+        """Crea la tabla de recursos consumidos por cada programa (Sección 2)."""
+        measured = [program for program in self.programs if program.get('resources')]
+        if not measured:
+            return []
+        
+        elements = [Paragraph(
+            "Recursos consumidos por programa",
+            self.styles['SectionHeader']
+        )]
+        
+        def seconds(value):
+            return f"{value:.3f}" if value is not None else "-"
+        
+        data = [["Programa", "Reloj (s)", "CPU usuario (s)", "CPU sistema (s)", "Memoria máx. (MB)", "Señal"]]
+        for program in measured:
+            resources = program['resources']
+            max_rss = resources.get('max_rss_kb')
+            data.append([
+                program['name'],
+                seconds(resources.get('wall_time')),
+                seconds(resources.get('user_time')),
+                seconds(resources.get('sys_time')),
+                f"{max_rss / 1024:.1f}" if max_rss is not None else "-",
+                resources.get('exit_signal') or "-"
+            ])
+        
+        col_widths = [2.2*inch, 0.8*inch, 1.1*inch, 1.1*inch, 1.2*inch, 0.9*inch]
+        table = Table(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#3498DB")),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+            ('ALIGN', (-1, 1), (-1, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        
+        elements.append(table)
+        elements.append(Spacer(1, 15))
+        return elements
+    
+    def add_benchmark(self, name, benchmark):
+        """Registra la medición de rendimiento de un programa."""
+        self.benchmark_results.append({"name": name, **benchmark})
+    
+    def create_benchmark_table(self):
+        """Crea la tabla comparativa de rendimiento (Sección 2)."""
+        if not self.benchmark_results:
+            return []
+        
+        elements = [Paragraph(
+            "Rendimiento medido (ejecuciones repetidas)",
+            self.styles['SectionHeader']
+        )]
+        
+        measured = [result for result in self.benchmark_results if result.get('success')]
+        fastest = min((result['wall']['median'] for result in measured), default=None)
+        
+        data = [["Programa", "Ejecuciones", "Mínimo (s)", "Mediana (s)", "IQR (s)", "CPU med. (s)", "Atípicos", "Relativo"]]
+        for result in self.benchmark_results:
+            if not result.get('success'):
+                data.append([result['name'], "-", "-", "-", "-", "-", "-", result.get('status') or "-"])
+                continue
+            wall = result['wall']
+            cpu_time = result.get('cpu_time')
+            data.append([
+                result['name'],
+                f"{result['runs']} (+{result['warmups']})",
+                f"{wall['min']:.4f}",
+                f"{wall['median']:.4f}",
+                f"{wall['iqr']:.4f}",
+                f"{cpu_time['median']:.4f}" if cpu_time else "-",
+                str(wall['outliers_low'] + wall['outliers_high']),
+                f"{wall['median'] / fastest:.2f}×" if fastest else "-"
+            ])
+        
+        col_widths = [1.9*inch, 0.8*inch, 0.75*inch, 0.8*inch, 0.7*inch, 0.8*inch, 0.65*inch, 0.7*inch]
+        table = Table(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#3498DB")),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (0, 1), (0, -1), 'LEFT'),
+            ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]))
+        
+        elements.append(table)
+        elements.append(Paragraph(
+            "Tiempos de reloj de cada ejecución con la misma entrada. Los atípicos "
+            "quedan fuera de Q1 - 1.5·IQR y Q3 + 1.5·IQR; la columna Relativo compara "
+            "la mediana con la del programa más rápido.",
+            self.styles['CustomBody']
+        ))
+        elements.append(Spacer(1, 15))
+        return elements
+    
+    def add_grading(self, grading_result):
+        """Registra los veredictos de un programa calificado con casos de prueba."""
+        self.grading_results.append(grading_result)
+    
+    def create_grading_table(self):
+        """Crea la tabla de veredictos por caso de prueba (Sección 2)."""
+        if not self.grading_results:
+            return []
+        
+        verdict_colors = {
+            "AC": colors.HexColor("#34C759"),
+            "WA": colors.HexColor("#FF3B30"),
+            "TLE": colors.HexColor("#FF9500"),
+            "RE": colors.HexColor("#AF52DE"),
+            "CE": colors.HexColor("#8E8E93"),
+            "MLE": colors.HexColor("#FF2D55"),
+            "OLE": colors.HexColor("#5856D6")
+        }
+        
+        elements = [Paragraph(
+            "Veredictos de los casos de prueba",
+            self.styles['SectionHeader']
+        )]
+        
+        data = [["Programa", "Caso", "Veredicto", "Tiempo (s)", "Detalle"]]
+        commands = []
+        for result in self.grading_results:
+            accepted = result['summary'].get("AC", 0)
+            first_row = len(data)
+            for index, verdict in enumerate(result['verdicts']):
+                execution_time = verdict.get('execution_time')
+                data.append([
+                    f"{result['name']} ({accepted}/{len(result['verdicts'])})" if index == 0 else "",
+                    verdict['case'],
+                    verdict['verdict'],
+                    f"{execution_time:.3f}" if execution_time is not None else "-",
+                    Paragraph(
+                        (verdict.get('detail') or "").replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;'),
+                        self.styles['Normal']
+                    )
+                ])
+                color = verdict_colors.get(verdict['verdict'])
+                if color:
+                    commands.append(('TEXTCOLOR', (2, len(data) - 1), (2, len(data) - 1), color))
+            if len(data) - 1 > first_row:
+                commands.append(('SPAN', (0, first_row), (0, len(data) - 1)))
+        
+        col_widths = [1.8*inch, 0.9*inch, 0.8*inch, 0.8*inch, 3*inch]
+        table = Table(data, colWidths=col_widths, repeatRows=1)
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#3498DB")),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 9),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTNAME', (2, 1), (2, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('ALIGN', (2, 1), (3, -1), 'CENTER'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ] + commands))
+        
+        elements.append(table)
+        elements.append(Spacer(1, 15))
+        return elements
+    
+    def format_transcript(self, transcript):
+        """Convierte la transcripción de la pty en el marcado de un párrafo.
+        
+        La salida se muestra tal cual y cada entrada escrita, resaltada y con
+        el instante (en segundos desde el inicio) en que se envió.
+        """
+        def escape(text):
+            text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+            return text.replace('  ', '&nbsp; ').replace('\t', '&nbsp;' * 4).replace('\n', '<br/>')
+        
+        parts = []
+        for event in transcript:
+            if event['stream'] == 'in':
+                parts.append(
+                    f'<font color="#34C759"><b>{escape(event["text"].rstrip(chr(10)))}</b></font>'
+                    f' <font color="#8E8E93" size="6">[{event["time"]:.2f} s]</font><br/>'
+                )
+            else:
+                parts.append(escape(event['text']))
+        return ''.join(parts) or '(sin salida)'
     
     def add_program(self, program_info, style_type=None):
-        """Añade un programa al PDF con su código y captura de pantalla."""
+        """Añade un programa al PDF con su código y captura de pantalla.
+
+        Solo se registra el programa; sus elementos se crean al guardar, en
+        este proceso o en los del pool de renderizado (ver save).
+        """
+        program_name = program_info.get('name', 'Programa sin nombre')
+        print(f"\nAgregando programa: {program_name}")
+        
+        # Agregar a la lista de programas para el índice
+        self.programs.append({
+            'name': program_name,
+            'type': style_type or 'general',
+            'resources': program_info.get('resources')
+        })
+        self.program_records.append((program_info, style_type))
+        print(f"Programa agregado al índice. Total programas: {len(self.programs)}")
+    
+    def create_program_sections(self, program_info, style_type=None):
+        """Crea los elementos de un programa para cada sección del informe.
+
+        Returns:
+            tuple: Listas de elementos (código, resultados, análisis)
+        """
         try:
             program_name = program_info.get('name', 'Programa sin nombre')
-            print(f"\nAgregando programa: {program_name}")
-            
-            # Agregar a la lista de programas para el índice
-            self.programs.append({
-                'name': program_name,
-                'type': style_type or 'general'
-            })
-            print(f"Programa agregado al índice. Total programas: {len(self.programs)}")
             
             # Crear elementos para la sección de código (más compactos)
             code_elements = []
@@ -376,95 +931,32 @@ class PDFGenerator:
             source_code = program_info['source_code']
             print(f"Código fuente obtenido: {len(source_code)} caracteres")
             
-            # Crear un estilo para el encabezado del código (con menos espacio)
-            self.styles.add(ParagraphStyle(
-                name=f'CodeHeader_{program_name}',  # Estilo único por programa
-                parent=self.styles['SectionHeader'],
-                fontSize=12,
-                fontName='Courier-Bold',
-                textColor=colors.black,
-                alignment=TA_LEFT,
-                spaceBefore=5,
-                spaceAfter=2,
-                backColor=colors.white,
-                borderWidth=0,
-                borderPadding=4
-            ))
-            
-            # Crear un estilo para las instrucciones de copia (con menos espacio)
-            self.styles.add(ParagraphStyle(
-                name=f'CopyInstructions_{program_name}',  # Estilo único por programa
-                parent=self.styles['ProgramInfo'],
-                fontSize=9,
-                alignment=TA_LEFT,
-                textColor=colors.HexColor('#777777'),
-                spaceBefore=0,
-                spaceAfter=3,
-                backColor=colors.white,
-                borderWidth=0,
-                borderPadding=0
-            ))
-            
-            # Estilo para código con formato de syntax highlighting (más compacto)
-            self.styles.add(ParagraphStyle(
-                name=f'SyntaxHighlightedCode_{program_name}',  # Estilo único por programa
-                parent=self.styles['CodeStyle'],
-                fontSize=11,
-                fontName='Courier',
-                spaceBefore=10,
-                spaceAfter=5,
-                leftIndent=10,
-                rightIndent=10,
-                backColor=colors.white,
-                borderWidth=1,
-                borderColor=colors.HexColor("#CCCCCC"),
-                borderPadding=8,
-                borderRadius=0,
-                leading=14,
-                wordWrap=False
-            ))
-            
             # Aplicar syntax highlighting al código
-            lines = source_code.split('\n')
-            highlighted_lines = []
-            
-            for line in lines:
-                # Escapar HTML
-                escaped_line = line.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                # Aplicar coloración de sintaxis 
-                highlighted_line = self.apply_cpp_syntax_highlighting(escaped_line)
-                highlighted_lines.append(highlighted_line)
-            
-            # Unir líneas con breaks HTML
-            highlighted_code = '<br/>'.join(highlighted_lines)
+            highlighted_code = self.highlight_cpp_code(source_code)
             print(f"Código procesado con syntax highlighting: {len(highlighted_code)} caracteres")
             
             # Título distintivo para la sección de código
             code_elements.append(Paragraph(
                 "/* Código Fuente */",
-                self.styles[f'CodeHeader_{program_name}']
+                self.styles['CodeHeader']
             ))
             
             # Instrucciones claras para copiar
             code_elements.append(Paragraph(
                 "Para usar este código: Seleccione todo (Ctrl+A / Cmd+A) → Copie (Ctrl+C / Cmd+C)",
-                self.styles[f'CopyInstructions_{program_name}']
+                self.styles['CopyInstructions']
             ))
             
             # Crear párrafo con el código con syntax highlighting
             code_para = Paragraph(
                 highlighted_code,
-                self.styles[f'SyntaxHighlightedCode_{program_name}']
+                self.get_code_style(source_code)
             )
             
             # Añadir el código a la sección de códigos
             code_elements.append(code_para)
             code_elements.append(Spacer(1, 10))
             
-            # Añadir los elementos de código a la lista de códigos
-            self.code_elements.extend(code_elements)
-            print(f"Elementos de código agregados. Total elementos: {len(self.code_elements)}")
-            
             # Crear elementos para la sección de resultados (más compactos)
             results_elements = []
             
@@ -621,28 +1113,35 @@ class PDFGenerator:
                 
                 # Envolver los elementos en KeepTogether para mantenerlos en la misma página
                 results_elements.append(KeepTogether(output_elements))
+                
+                # Sesión en la pseudo-terminal (reemplaza a la captura de pantalla)
+                if program_info.get('transcript'):
+                    results_elements.append(Paragraph(
+                        "🖥️ Sesión en la terminal:",
+                        self.styles['SectionHeader']
+                    ))
+                    results_elements.append(Paragraph(
+                        self.format_transcript(program_info['transcript']),
+                        self.styles['TerminalTranscript']
+                    ))
+                
                 results_elements.append(PageBreak())
             
-            # Añadir los elementos de resultados a la lista de resultados
-            self.results_elements.extend(results_elements)
-            print(f"Elementos de resultados agregados. Total elementos: {len(self.results_elements)}")
-            
             # Generar análisis del programa para la Sección 3
-            self.generate_program_analysis(program_info, style_type)
-            print(f"Análisis generado. Total elementos de análisis: {len(self.analysis_elements)}")
+            analysis_elements = self.generate_program_analysis(program_info, style_type)
             
-            print(f"Programa {program_name} agregado completamente al PDF")
+            return code_elements, results_elements, analysis_elements
             
         except Exception as e:
             print(f"Error al añadir programa al PDF: {str(e)}")
             traceback.print_exc()
-            self.code_elements.append(Paragraph(
+            return [Paragraph(
                 f"Error al procesar el programa: {str(e)}",
                 self.styles['Normal']
-            ))
+            )], [], []
     
     def generate_program_analysis(self, program_info, style_type=None):
-        """Genera un análisis del programa para la sección 3."""
+        """Genera los elementos del análisis del programa para la sección 3."""
         try:
             program_name = program_info.get('name', 'Programa sin nombre')
             source_code = program_info.get('source_code', '')
@@ -662,30 +1161,25 @@ class PDFGenerator:
             code_lines = source_code.split('\n')
             total_lines = len(code_lines)
             
-            # Detectar características del código
-            uses_includes = '#include' in source_code
-            uses_classes = 'class' in source_code
-            uses_vectors = 'vector' in source_code or 'Vector' in source_code
-            uses_loops = any(loop in source_code for loop in ['for', 'while', 'do'])
-            uses_functions = bool(re.findall(r'\w+\s+\w+\s*\([^)]*\)\s*{', source_code))
-            uses_pointers = '*' in source_code or '&' in source_code
-            uses_templates = 'template' in source_code
-            uses_inheritance = ':' in source_code and ('public' in source_code or 'private' in source_code or 'protected' in source_code)
-            uses_exceptions = 'try' in source_code or 'catch' in source_code or 'throw' in source_code
-            uses_smart_pointers = 'unique_ptr' in source_code or 'shared_ptr' in source_code or 'weak_ptr' in source_code
-            
-            # Crear estilo único para el análisis de este programa
-            style_name = f'AnalysisText_{program_name}'
-            if style_name not in self.styles:
-                self.styles.add(ParagraphStyle(
-                    name=style_name,
-                    parent=self.styles['CustomBody'],
-                    fontSize=10,
-                    leading=14,
-                    spaceBefore=4,
-                    spaceAfter=4,
-                    leftIndent=10
-                ))
+            # Detectar características del código a partir de sus tokens: las
+            # palabras dentro de comentarios y cadenas no cuentan
+            summary = summarize(source_code)
+            view = code_view(source_code)
+            keywords = summary['keywords']
+            identifiers = summary['identifiers']
+            uses_includes = '#include' in summary['directives']
+            uses_classes = 'class' in keywords
+            uses_vectors = 'vector' in identifiers or 'Vector' in identifiers
+            uses_loops = bool(keywords & {'for', 'while', 'do'})
+            uses_functions = bool(re.search(r'\w+\s+\w+\s*\([^)]*\)\s*{', view))
+            uses_pointers = detect_pointers(source_code)
+            uses_templates = 'template' in keywords
+            uses_inheritance = bool(re.search(r'\b(?:class|struct)\s+\w+\s*:(?!:)', view))
+            uses_exceptions = bool(keywords & {'try', 'catch', 'throw'})
+            uses_smart_pointers = bool(identifiers & {'unique_ptr', 'shared_ptr', 'weak_ptr'})
+            
+            # Estilo compartido por el texto del análisis de todos los programas
+            style_name = 'AnalysisText'
             
             # Crear tabla de características
             analysis_elements.append(Paragraph(
@@ -761,6 +1255,36 @@ class PDFGenerator:
                 self.styles[style_name]
             ))
             
+            # Complejidad medida con un barrido de tamaños (modo --complexity)
+            empirical_complexity = program_info.get('empirical_complexity')
+            if empirical_complexity:
+                analysis_elements.append(Paragraph(
+                    f"• Complejidad medida: {format_complexity(empirical_complexity)}",
+                    self.styles[style_name]
+                ))
+            
+            # Memoria dinámica contada por el shim de LD_PRELOAD (modo --track-alloc)
+            allocations = program_info.get('allocations')
+            if allocations:
+                analysis_elements.append(Paragraph(
+                    "🧮 Memoria Dinámica:",
+                    self.styles['SectionHeader']
+                ))
+                for line in [
+                    f"• Reservas (new/malloc): {allocations['allocations']}",
+                    f"• Liberaciones (delete/free): {allocations['frees']}",
+                    f"• Bytes reservados en total: {format_bytes(allocations['bytes'])}",
+                    f"• Pico de memoria reservada: {format_bytes(allocations['peak_bytes'])}",
+                    f"• Sin liberar al terminar: {format_bytes(allocations['leaked_bytes'])} "
+                    f"en {allocations['leaked_blocks']} bloques"
+                ]:
+                    analysis_elements.append(Paragraph(line, self.styles[style_name]))
+                if allocations['leaked_blocks']:
+                    analysis_elements.append(Paragraph(
+                        "• ⚠️ El programa termina sin liberar toda la memoria que reservó (falta delete o free)",
+                        self.styles[style_name]
+                    ))
+            
             # Análisis de buenas prácticas
             analysis_elements.append(Paragraph(
                 "✅ Buenas Prácticas:",
@@ -773,10 +1297,10 @@ class PDFGenerator:
             if uses_functions:
                 good_practices.append("Modularización mediante funciones")
             
-            if "const" in source_code:
+            if 'const' in keywords:
                 good_practices.append("Uso de constantes para valores inmutables")
             
-            if "&" in source_code and "const" in source_code:
+            if '&' in summary['operators'] and 'const' in keywords:
                 good_practices.append("Paso de parámetros por referencia constante (optimización)")
             
             if uses_exceptions:
@@ -791,7 +1315,7 @@ class PDFGenerator:
             if uses_smart_pointers:
                 good_practices.append("Uso de smart pointers para gestión segura de memoria")
             
-            comments_ratio = len(re.findall(r'(/\*|\*/|//)', source_code)) / max(total_lines, 1)
+            comments_ratio = summary['comments'] / max(total_lines, 1)
             if comments_ratio > 0.1:
                 good_practices.append("Documentación mediante comentarios")
             
@@ -817,7 +1341,7 @@ class PDFGenerator:
             if not uses_functions and total_lines > 30:
                 improvement_opportunities.append("Considerar modularizar el código en funciones")
             
-            if "using namespace std;" in source_code:
+            if re.search(r'\busing\s+namespace\s+std\s*;', view):
                 improvement_opportunities.append("Evitar 'using namespace std;' en el ámbito global")
             
             if comments_ratio < 0.1:
@@ -850,16 +1374,15 @@ class PDFGenerator:
             ))
             analysis_elements.append(Spacer(1, 5))
             
-            # Añadir análisis a la sección
-            self.analysis_elements.extend(analysis_elements)
+            return analysis_elements
             
         except Exception as e:
             print(f"Error al generar análisis del programa: {str(e)}")
             traceback.print_exc()
-            self.analysis_elements.append(Paragraph(
+            return [Paragraph(
                 f"Error al analizar el programa {program_info.get('name', '')}: {str(e)}",
                 self.styles['Normal']
-            ))
+            )]
     
     def generate_summary_analysis(self):
         """Genera un resumen general de todos los programas."""
@@ -950,79 +1473,99 @@ class PDFGenerator:
         
         return summary_elements
     
-    def save(self):
-        """Guarda el documento PDF final con la estructura reorganizada."""
-        try:
-            print(f"\nGenerando PDF en: {self.output_path}")
-            print(f"Total de programas a incluir: {len(self.programs)}")
-            
-            # Generar la portada y el índice
-            self.elements.extend(self.create_cover_page())
-            
-            # Actualizar el índice antes de construirlo
-            self.update_index()
-            self.elements.append(PageBreak())
-            
+    def create_section_intro(self, section):
+        """Crea el encabezado de una sección: su título y las tablas o el resumen que la abren.
+
+        Args:
+            section (str): "code", "results" o "analysis" (ver SECTION_NAMES)
+        """
+        if section == "code":
             # Sección 1: Todos los códigos fuente
-            self.elements.append(Paragraph(
-                "SECCIÓN 1: CÓDIGOS FUENTE",
-                self.styles['ChapterTitle']
-            ))
-            self.elements.append(Spacer(1, 5))
-            
-            # Verificar que tenemos elementos de código
-            if not self.code_elements:
-                print("Advertencia: No hay elementos de código para incluir")
-            else:
-                print(f"Agregando {len(self.code_elements)} elementos de código")
-            
-            # Añadir todos los códigos
-            self.elements.extend(self.code_elements)
-            self.elements.append(PageBreak())
-            
+            return [
+                Paragraph("SECCIÓN 1: CÓDIGOS FUENTE", self.styles['ChapterTitle']),
+                Spacer(1, 5)
+            ]
+        
+        if section == "results":
             # Sección 2: Todos los resultados de ejecución
-            self.elements.append(Paragraph(
-                "SECCIÓN 2: RESULTADOS DE EJECUCIÓN",
-                self.styles['ChapterTitle']
-            ))
-            self.elements.append(Spacer(1, 5))
-            
-            # Verificar que tenemos elementos de resultados
-            if not self.results_elements:
-                print("Advertencia: No hay elementos de resultados para incluir")
-            else:
-                print(f"Agregando {len(self.results_elements)} elementos de resultados")
-                
-                # Añadir todos los resultados
-                self.elements.extend(self.results_elements)
-            
-            # Sección 3: Análisis de programas
-            self.elements.append(Paragraph(
-                "SECCIÓN 3: ANÁLISIS TÉCNICO",
-                self.styles['ChapterTitle']
-            ))
-            self.elements.append(Spacer(1, 5))
+            elements = [
+                Paragraph("SECCIÓN 2: RESULTADOS DE EJECUCIÓN", self.styles['ChapterTitle']),
+                Spacer(1, 5)
+            ]
             
-            # Verificar que tenemos elementos de análisis
-            if not self.analysis_elements:
-                print("Advertencia: No hay elementos de análisis para incluir")
-            else:
-                print(f"Agregando {len(self.analysis_elements)} elementos de análisis")
+            # Tabla comparativa de tiempos y memoria
+            elements.extend(self.create_resources_table())
             
-            # Añadir resumen general primero
-            self.elements.extend(self.generate_summary_analysis())
+            # Comparación de rendimiento (si se midió)
+            elements.extend(self.create_benchmark_table())
             
-            # Añadir análisis individuales
-            self.elements.extend(self.analysis_elements)
+            # Veredictos de los casos de prueba (si se calificó)
+            elements.extend(self.create_grading_table())
+            return elements
+        
+        # Sección 3: Análisis de programas, con el resumen general primero
+        elements = [
+            Paragraph("SECCIÓN 3: ANÁLISIS TÉCNICO", self.styles['ChapterTitle']),
+            Spacer(1, 5)
+        ]
+        elements.extend(self.generate_summary_analysis())
+        return elements
+    
+    def render_chunk(self, elements, path, starts=None):
+        """Construye un fragmento del informe en su propio PDF y devuelve su número de páginas.
+
+        Los fragmentos se comprimen solo con zlib (sin ASCII85): la unión
+        vuelve a leer su contenido para estampar los números de página y
+        decodificar ASCII85 en Python es lento.
+
+        Args:
+            starts (list): Si se indica, recibe en la posición de cada
+                ProgramMark la página del fragmento donde empieza su programa
+        """
+        doc = self.create_document(path)
+        if starts is not None:
+            pending = []
+            
+            def note_start(flowable):
+                if isinstance(flowable, ProgramMark):
+                    pending.append(flowable.number)
+                    return
+                for number in pending:
+                    starts[number] = doc.page
+                pending.clear()
+            
+            doc.afterFlowable = note_start
+        use_a85 = rl_config.useA85
+        rl_config.useA85 = 0
+        try:
+            doc.build(elements)
+        finally:
+            rl_config.useA85 = use_a85
+        return doc.page
+    
+    def save(self):
+        """Guarda el documento PDF final con la estructura reorganizada."""
+        try:
+            print(f"\nGenerando PDF en: {self.output_path}")
+            print(f"Total de programas a incluir: {len(self.programs)}")
             
             # Asegurar que el directorio de salida existe
             os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
             
             # Intentar generar el PDF
             try:
-                print("Construyendo PDF con todos los elementos...")
-                print(f"Total de elementos a incluir: {len(self.elements)}")
-                self.doc.build(self.elements)
+                if USING_PYPDF and self.program_records:
+                    try:
+                        self.build_chunked()
+                    except Exception as chunk_error:
+                        print(f"Error al renderizar los fragmentos del PDF: {chunk_error}")
+                        traceback.print_exc()
+                        print("Construyendo el PDF en un solo proceso...")
+                        self.build_single()
+                else:
+                    if not USING_PYPDF:
+                        print("pypdf no está instalado: el PDF se construye en un solo proceso")
+                    self.build_single()
                 
                 # Verificar si el PDF se creó correctamente
                 if os.path.exists(self.output_path) and os.path.getsize(self.output_path) > 0:
@@ -1042,53 +1585,297 @@ class PDFGenerator:
             print(f"Error al generar el PDF: {e}")
             traceback.print_exc()
             return False
+    
+    def build_single(self):
+        """Construye el informe completo como un solo documento en este proceso.
+
+        Sin programas agregados pero con veredictos (modo --grade), el informe
+        solo tiene la portada y la tabla de veredictos. En modo streaming los elementos de cada programa se vuelcan a disco,
+        sección por sección, en cuanto se crean, y el documento los vuelve a
+        leer a medida que los coloca: en memoria solo están los de un
+        programa a la vez.
+        """
+        if not self.program_records and self.grading_results:
+            # Solo calificación: portada y veredictos, sin secciones de código y análisis vacías
+            print("Construyendo el informe de veredictos...")
+            story = self.create_cover_page() + [PageBreak()] + self.create_grading_table()
+            self.doc.build(story, onFirstPage=number_page, onLaterPages=number_page)
+            return
+        
+        sections = {name: SpillFile() if self.streaming else [] for name in SECTION_NAMES}
+        counts = dict.fromkeys(SECTION_NAMES, 0)
+        try:
+            for program_info, style_type in self.program_records:
+                for name, elements in zip(SECTION_NAMES, self.create_program_sections(program_info, style_type)):
+                    sections[name].append(elements)
+                    counts[name] += len(elements)
+            
+            # Generar la portada y el índice
+            self.elements.extend(self.create_cover_page())
+            self.elements.extend(self.create_index())
+            self.elements.append(PageBreak())
+            
+            # Verificar que tenemos elementos de código
+            if not counts["code"]:
+                print("Advertencia: No hay elementos de código para incluir")
+            else:
+                print(f"Agregando {counts['code']} elementos de código")
+            self.elements.extend(self.create_section_intro("code"))
+            
+            # Verificar que tenemos elementos de resultados
+            results_intro = [PageBreak()] + self.create_section_intro("results")
+            if not counts["results"]:
+                print("Advertencia: No hay elementos de resultados para incluir")
+            else:
+                print(f"Agregando {counts['results']} elementos de resultados")
+            
+            # Verificar que tenemos elementos de análisis
+            analysis_intro = self.create_section_intro("analysis")
+            if not counts["analysis"]:
+                print("Advertencia: No hay elementos de análisis para incluir")
+            else:
+                print(f"Agregando {counts['analysis']} elementos de análisis")
+            
+            # Los códigos, los resultados y los análisis se leen sección por sección
+            parts = itertools.chain(
+                [self.elements], sections["code"],
+                [results_intro], sections["results"],
+                [analysis_intro], sections["analysis"]
+            )
+            total = len(self.elements) + len(results_intro) + len(analysis_intro) + sum(counts.values())
+            
+            print("Construyendo PDF con todos los elementos...")
+            print(f"Total de elementos a incluir: {total}")
+            self.doc.build(SpilledStory(parts, total), onFirstPage=number_page, onLaterPages=number_page)
+        finally:
+            if self.streaming:
+                for spill_file in sections.values():
+                    spill_file.close()
+    
+    def build_chunked(self):
+        """Renderiza el informe en fragmentos independientes y los une en el PDF final.
+
+        Los programas se reparten en grupos de PDF_CONFIG['chunk_programs'] y
+        cada grupo se renderiza en un fragmento por sección (código,
+        resultados y análisis) en un pool de PDF_CONFIG['jobs'] procesos, así
+        que el tiempo de construcción se reparte entre los núcleos. Solo los
+        grupos empiezan en una página nueva: dentro de un grupo los programas
+        se siguen como en el informe de un solo documento. Los encabezados de
+        las secciones 2 y 3 (tablas de recursos, rendimiento y veredictos y
+        resumen general) dependen de todos los programas: se renderizan en
+        sus propios fragmentos, fuera de la caché. Con las páginas de cada
+        fragmento se calcula dónde empieza cada programa; la portada y el
+        índice se renderizan al final con esos números y la unión numera
+        todas las páginas.
+        """
+        group_size = max(1, PDF_CONFIG['chunk_programs'])
+        group_count = math.ceil(len(self.program_records) / group_size)
+        jobs = max(1, min(PDF_CONFIG['jobs'], group_count))
+        os.makedirs(TEMP_DIR, exist_ok=True)
+        
+        cache = FragmentCache() if CACHE_CONFIG['enabled'] else None
+        version = get_renderer_version()
+        
+        with tempfile.TemporaryDirectory(prefix="pdf_chunks_", dir=TEMP_DIR) as directory:
+            chunks = [None] * group_count
+            keys = {}
+            
+            def pending_tasks():
+                """Genera las tareas de los grupos sin fragmentos en la caché.
 
+                Se crean a medida que el pool las pide (en modo streaming los
+                programas se leen de la zona de volcado).
+                """
+                records = iter(self.program_records)
+                for number in range(group_count):
+                    programs = list(itertools.islice(records, group_size))
+                    if cache is not None:
+                        program_keys = [cache.make_key(program_info, style_type, version)
+                                        for program_info, style_type in programs]
+                        key = cache.make_group_key(program_keys, number == 0)
+                        chunks[number] = cache.get(key, directory, number, SECTION_NAMES)
+                        if chunks[number] is not None:
+                            continue
+                        keys[number] = key
+                    yield (directory, number, programs)
+            
+            print(f"Renderizando {len(self.program_records)} programas en {group_count} grupos de fragmentos ({jobs} procesos)...")
+            with ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else contextlib.nullcontext() as pool:
+                if pool is not None:
+                    rendered = map_in_order(pool, render_program_chunks, pending_tasks(), 2 * jobs)
+                else:
+                    rendered = ((task, render_program_chunks(task)) for task in pending_tasks())
+                
+                rendered_count = 0
+                for task, (group_chunks, messages) in rendered:
+                    print(messages, end='')
+                    number = task[1]
+                    chunks[number] = group_chunks
+                    rendered_count += len(task[2])
+                    if cache is not None:
+                        cache.put(keys.pop(number), SECTION_NAMES, group_chunks)
+            
+            if cache is not None:
+                print(f"Programas: {len(self.program_records) - rendered_count} de la caché, {rendered_count} renderizados")
+            
+            # Encabezados de las secciones 2 y 3 (el título de la sección 1 va
+            # con el primer grupo)
+            intros = {}
+            for name in SECTION_NAMES[1:]:
+                path = os.path.join(directory, f"intro_{name}.pdf")
+                intros[name] = (path, self.render_chunk(trim_chunk(self.create_section_intro(name)), path))
+            
+            # La portada y el índice ocupan siempre las mismas páginas, pero
+            # hasta renderizarlos no se sabe cuántas son
+            front_path = os.path.join(directory, "front.pdf")
+            front_pages = 1
+            for _ in range(3):
+                pages = self.chunk_start_pages(chunks, intros, front_pages + 1)
+                rendered = self.render_chunk(self.create_cover_page() + self.create_index(pages), front_path)
+                if rendered == front_pages:
+                    break
+                front_pages = rendered
+            
+            # Primero todos los códigos, después los resultados y al final los análisis
+            paths = [front_path]
+            for section, name in enumerate(SECTION_NAMES):
+                if name in intros:
+                    paths.append(intros[name][0])
+                paths.extend(group[section][0] for group in chunks if group[section][0])
+            print(f"Uniendo {len(paths)} fragmentos...")
+            self.merge_chunks(paths)
+    
+    def chunk_start_pages(self, chunks, intros, first_page):
+        """Calcula la página donde empieza cada sección de cada programa.
+
+        Args:
+            chunks (list): Resultado de render_program_chunks para cada grupo
+            intros (dict): (ruta, páginas) del encabezado de cada sección que lo
+                tiene en su propio fragmento
+            first_page (int): Página donde empieza el primer fragmento tras el índice
+
+        Returns:
+            list: (código, resultados, análisis) por programa; None si la sección está vacía
+        """
+        starts = [[None] * len(SECTION_NAMES) for _ in self.program_records]
+        page = first_page
+        for section, name in enumerate(SECTION_NAMES):
+            page += intros.get(name, (None, 0))[1]
+            number = 0
+            for group in chunks:
+                path, pages, group_starts = group[section]
+                for start in group_starts:
+                    if start:
+                        starts[number][section] = page + start - 1
+                    number += 1
+                page += pages
+        return starts
+    
+    def merge_chunks(self, paths):
+        """Une los fragmentos en el PDF final, numera sus páginas y lo escribe de forma atómica."""
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        
+        # Los números se dibujan en un PDF aparte y se estampan sobre cada página
+        numbers = io.BytesIO()
+        canv = canvas.Canvas(numbers, pagesize=A4)
+        for number in range(1, len(writer.pages) + 1):
+            draw_page_number(canv, number)
+            canv.showPage()
+        canv.save()
+        numbers.seek(0)
+        for page, stamp in zip(writer.pages, PdfReader(numbers).pages):
+            page.merge_page(stamp)
+            page.compress_content_streams()  # merge_page deja el contenido sin comprimir
+        
+        writer.add_metadata({f"/{key.capitalize()}": value for key, value in DOCUMENT_INFO.items()})
+        tmp_path = f"{self.output_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            writer.write(f)
+        os.replace(tmp_path, self.output_path)
+        print(f"PDF unido: {len(writer.pages)} páginas")
+    
     def save_pdf(self):
         """Alias para el método save para mantener compatibilidad."""
         return self.save()
 
-    def apply_cpp_syntax_highlighting(self, code_line):
-        """Aplica coloración de sintaxis a una línea de código C++.
+    def highlight_cpp_code(self, source_code):
+        """Aplica coloración de sintaxis al código C++ línea por línea.
+        
+        Los tokens salen de tokenize, el análisis del archivo completo (y en
+        caché) que también usan el analizador y el resumen, y se reparten por
+        líneas. Un token que ocupa varias líneas (comentario /* */, cadena
+        cruda R"(...)", comentario // continuado con \) colorea cada uno de
+        sus trozos según su tipo. El marcado de una línea sin trozos de esos
+        tokens solo depende de su texto y se recuerda, así que las líneas
+        repetidas (llaves, "return 0;", "using namespace std;"...) se
+        resaltan una sola vez por documento.
         
         Args:
-            code_line (str): Línea de código C++ escapada para HTML
+            source_code (str): Código C++ sin escapar
             
         Returns:
-            str: Línea con coloración de sintaxis aplicada
+            str: Código escapado para HTML, con las líneas unidas por <br/>
         """
-        # Ya debe estar escapada para HTML (& < >)
-        
-        # Colorear comentarios (tienen prioridad sobre todo lo demás)
-        if '//' in code_line:
-            comment_pos = code_line.find('//')
-            comment = code_line[comment_pos:]
-            code_line = code_line[:comment_pos] + f'<font color="#6A9955">{comment}</font>'
-            return code_line
-            
-        # Colorear strings
-        code_line = re.sub(r'(".*?")', r'<font color="#CE9178">\1</font>', code_line)
-        
-        # Colorear caracteres
-        code_line = re.sub(r"('.')", r'<font color="#CE9178">\1</font>', code_line)
-        
-        # Colorear directivas de preprocesador
-        for directive in self.cpp_syntax['preprocessor']:
-            if directive in code_line:
-                code_line = code_line.replace(directive, f'<font color="#C586C0">{directive}</font>')
-                break
-        
-        # Colorear palabras clave
-        for keyword in self.cpp_syntax['keywords']:
-            # Asegurar que no se colorean partes de otras palabras
-            pattern = r'\b' + keyword + r'\b'
-            code_line = re.sub(pattern, f'<font color="#569CD6">{keyword}</font>', code_line)
-        
-        # Colorear tipos/clases de STL
-        for stl_item in self.cpp_syntax['stl']:
-            if stl_item in code_line:
-                code_line = code_line.replace(stl_item, f'<font color="#4EC9B0">{stl_item}</font>')
-        
-        # Colorear números
-        code_line = re.sub(r'\b(\d+)\b', r'<font color="#B5CEA8">\1</font>', code_line)
-        
-        return code_line
+        lines = [[]]
+        spanning = set()  # Líneas con trozos de tokens de varias líneas
+        for token in tokenize(source_code):
+            if token.kind == "newline":
+                lines.append([])
+                continue
+            pieces = token.text.split('\n')
+            if len(pieces) > 1:
+                spanning.update(range(len(lines) - 1, len(lines) + len(pieces) - 1))
+            for number, piece in enumerate(pieces):
+                if number:
+                    lines.append([])
+                if piece:
+                    lines[-1].append(token._replace(text=piece))
+        
+        highlighted_lines = []
+        for number, tokens in enumerate(lines):
+            if number in spanning:
+                highlighted_lines.append(self.line_markup(tokens))
+                continue
+            text = ''.join(token.text for token in tokens)
+            markup = self._highlight_memo.get(text)
+            if markup is None:
+                markup = self.line_markup(tokens)
+                if len(self._highlight_memo) >= HIGHLIGHT_MEMO_SIZE:
+                    self._highlight_memo.clear()
+                self._highlight_memo[text] = markup
+            highlighted_lines.append(markup)
+        return '<br/>'.join(highlighted_lines)
+    
+    def line_markup(self, tokens):
+        """Devuelve el marcado de una línea a partir de sus tokens (ver highlight_cpp_code)."""
+        parts = []
+        previous = None
+        for token in tokens:
+            parts.append(self.token_markup(token, previous))
+            previous = token
+        return ''.join(parts)
+    
+    def token_markup(self, token, previous=None):
+        """Devuelve el marcado de un token según su tipo (previous es el token anterior de la línea)."""
+        kind, text = token.kind, token.text
+        if kind == "comment":
+            return colored_markup(text, SYNTAX_COLORS['comment'])
+        if kind in ("string", "char") or (kind == "header" and text.startswith('"')):
+            return colored_markup(text, SYNTAX_COLORS['string'])
+        if kind == "preprocessor":
+            return colored_markup(text, SYNTAX_COLORS['preprocessor'])
+        if kind == "header":
+            name = text[1:-1]
+            inner = colored_markup(name, SYNTAX_COLORS['stl']) if name in self._highlight_stl else escape_markup(name)
+            return f'&lt;{inner}&gt;'
+        if kind == "number":
+            return colored_markup(text, SYNTAX_COLORS['number'])
+        if text in self._highlight_keywords:
+            return colored_markup(text, SYNTAX_COLORS['keyword'])
+        if kind == "identifier" and text in self._highlight_stl:
+            return colored_markup(text, SYNTAX_COLORS['stl'])
+        if kind == "operator" and text == "::" and previous is not None and previous.text == "std":
+            return colored_markup(text, SYNTAX_COLORS['stl'])  # std:: completo
+        return escape_markup(text)
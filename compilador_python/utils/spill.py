@@ -0,0 +1,96 @@
+"""
+Módulo con la zona de volcado en disco del generador de PDF (modo de memoria acotada).
+"""
+
+import os
+import pickle
+import tempfile
+
+from config.settings import TEMP_DIR
+
+class SpillFile:
+    """Lista de objetos que se guardan con pickle en un archivo temporal en lugar de en memoria.
+
+    Solo admite añadir al final y recorrer en orden; al recorrerla cada objeto
+    se vuelve a cargar, así que en memoria queda solo el que se está usando.
+    El archivo se crea con el primer objeto y desaparece al cerrarlo.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or TEMP_DIR
+        self.offsets = []  # Posición de cada objeto en el archivo
+        self._file = None
+
+    def append(self, item):
+        """Vuelca un objeto al final del archivo."""
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = tempfile.TemporaryFile(prefix="pdf_spill_", dir=self.directory)
+        self._file.seek(0, os.SEEK_END)
+        self.offsets.append(self._file.tell())
+        pickle.dump(item, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        for offset in self.offsets:
+            self._file.seek(offset)
+            yield pickle.load(self._file)
+
+    def close(self):
+        """Borra el archivo y olvida los objetos."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.offsets = []
+
+class SpilledStory:
+    """Lista de flowables para SimpleDocTemplate.build que se carga a medida que se consume.
+
+    build solo lee y quita elementos del principio de la lista (y devuelve al
+    principio los trozos de un flowable partido), así que basta con tener en
+    memoria los flowables de la parte actual: la siguiente se carga cuando se
+    pide un elemento que todavía no está.
+
+    Args:
+        parts (iterable): Listas de flowables, en orden (por ejemplo, un SpillFile)
+        total (int): Número total de flowables de todas las partes
+    """
+
+    def __init__(self, parts, total):
+        self._parts = iter(parts)
+        self._items = []
+        self._pending = total  # Flowables de las partes que aún no se cargaron
+
+    def _load(self, index):
+        """Carga partes hasta que exista el elemento index o no queden partes."""
+        while len(self._items) <= index and self._pending:
+            part = next(self._parts)
+            self._pending -= len(part)
+            self._items.extend(part)
+
+    def _last_index(self, index):
+        """Último índice que necesita una operación con index (entero o slice [a:b])."""
+        if isinstance(index, slice):
+            return (len(self) if index.stop is None else index.stop) - 1
+        return index
+
+    def __len__(self):
+        return len(self._items) + self._pending
+
+    def __getitem__(self, index):
+        self._load(self._last_index(index))
+        return self._items[index]
+
+    def __setitem__(self, index, value):
+        self._load(self._last_index(index))
+        self._items[index] = value
+
+    def __delitem__(self, index):
+        self._load(self._last_index(index))
+        del self._items[index]
+
+    def insert(self, index, value):
+        self._load(index - 1)
+        self._items.insert(index, value)